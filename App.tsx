@@ -10,7 +10,7 @@ import { AnalyticsDashboard } from './components/AnalyticsDashboard';
 import { SettingsPage } from './components/SettingsPage';
 import { LoginPage } from './components/LoginPage';
 import { BlogPost } from './types';
-import { api } from './services/api';
+import { api, DuplicateTopicError, TopicReuse } from './services/api';
 import { useAuth } from './context/AuthContext';
 
 const AppContent: React.FC = () => {
@@ -18,6 +18,7 @@ const AppContent: React.FC = () => {
   const [posts, setPosts] = useState<BlogPost[]>([]);
   const [editingPost, setEditingPost] = useState<BlogPost | null>(null);
   const [isGenerating, setIsGenerating] = useState(false);
+  const [streamingStage, setStreamingStage] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState<'dashboard' | 'published' | 'news' | 'analytics' | 'settings'>('dashboard');
   const [topicInput, setTopicInput] = useState('');
   const [showTopicInput, setShowTopicInput] = useState(false);
@@ -92,20 +93,49 @@ const AppContent: React.FC = () => {
     }
   };
 
-  const handleGenerate = async () => {
+  const handleGenerate = async (reuse: TopicReuse = 'auto') => {
     if (!topicInput.trim()) return;
     
     setIsGenerating(true);
     setShowTopicInput(false);
+    // Open the editor on a placeholder right away and fill it in as tokens arrive
+    setStreamingStage('researcher');
+    setEditingPost({
+        id: 'streaming', title: topicInput, excerpt: '', content: '', author: 'AI Agent', category: 'Tech',
+        imageUrl: 'https://picsum.photos/800/600', viralScore: 0, sentiment: 'Neutral', targetAudience: '',
+        readingTimeMin: 0, seoKeywords: [], metaDescription: '', imagePrompt: '', critiqueNotes: '',
+        status: 'draft', createdAt: new Date().toISOString(), tags: []
+    });
     try {
-        const newPost = await api.generatePost(topicInput);
+        const newPost = await api.generatePostStream(topicInput, {
+            onStage: (node) => setStreamingStage(node),
+            onDraftStart: (node) => {
+                setStreamingStage(node);
+                setEditingPost(prev => prev && { ...prev, content: '' });
+            },
+            onToken: (text) => setEditingPost(prev => prev && { ...prev, content: prev.content + text }),
+        }, reuse);
         setPosts(prev => [newPost, ...prev]);
+        setEditingPost(prev => prev && newPost); // stays closed if the user backed out mid-stream
         setTopicInput('');
     } catch (e) {
+        if (e instanceof DuplicateTopicError) {
+            // A near-identical topic was generated recently: open that post, or generate anyway on its research
+            const hours = Math.max(1, Math.round((Date.now() / 1000 - e.match.created_at) / 3600));
+            if (window.confirm(`You generated "${e.match.topic}" about ${hours}h ago. Open that post instead?`)) {
+                setEditingPost(e.post);
+                setTopicInput('');
+            } else {
+                await handleGenerate('research');
+            }
+            return;
+        }
         console.error(e);
+        setEditingPost(null);
         alert("Failed to generate content. Ensure backend is running.");
     } finally {
         setIsGenerating(false);
+        setStreamingStage(null);
     }
   };
 
@@ -229,7 +259,7 @@ const AppContent: React.FC = () => {
                                     onKeyDown={(e) => e.key === 'Enter' && handleGenerate()}
                                 />
                                 <button 
-                                    onClick={handleGenerate}
+                                    onClick={() => handleGenerate()}
                                     disabled={isGenerating}
                                     className="h-12 px-6 rounded-full font-bold text-white bg-purple-600 hover:bg-purple-500 transition-colors disabled:opacity-50"
                                 >
@@ -335,6 +365,7 @@ const AppContent: React.FC = () => {
         {editingPost && (
             <PostEditor 
                 post={editingPost} 
+                streamingStage={streamingStage}
                 onSave={handleSavePost}
                 onCancel={handleCancelEdit} 
             />
@@ -0,0 +1,213 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# --- ARTICLE RECORD ---
+@dataclass(slots=True)
+class Article:
+    """
+    One news item, whatever provider it came from. Both the research
+    aggregator (agents.fetch_tech_news) and the /news feed (news_fetcher)
+    build these, so dedupe, ranking and trimming work on fields instead of
+    re-parsing prompt text. Slotted: no per-instance __dict__.
+    """
+    provider: str
+    title: str
+    url: str = ""
+    source: str = ""
+    summary: str = ""
+    published_at: str = ""
+    image_url: Optional[str] = None
+    sentiment: Any = None  # MarketAux entity sentiment score, when present
+
+    def as_news_item(self) -> dict:
+        """Shape served by GET /news."""
+        return {
+            "title": self.title,
+            "url": self.url,
+            "source": self.source,
+            "summary": self.summary,
+            "published_at": self.published_at,
+            "image_url": self.image_url,
+        }
+
+    def corpus_line(self) -> str:
+        """How the article appears in the research corpus handed to the LLM."""
+        fmt = CORPUS_FORMATS.get(self.provider)
+        return fmt(self) if fmt else f"[{self.source or self.provider}] {self.title}: {self.summary}"
+
+
+CORPUS_FORMATS: Dict[str, Callable[[Article], str]] = {
+    "gnews": lambda a: f"[GNews] {a.title} ({a.source}): {a.summary}",
+    "marketaux": lambda a: f"[MarketAux - Sentiment: {a.sentiment}] {a.title}: {a.summary}",
+    "nyt": lambda a: f"[NYT - {a.published_at[:10]}] {a.title}: {a.summary}",
+    "newsdata": lambda a: f"[NewsData] {a.title}: {a.summary}",
+    "guardian": lambda a: f"[The Guardian] {a.title}: {a.summary}",
+    "google_news": lambda a: f"[Google News] {a.title} ({a.source}): {a.url}",
+    "duckduckgo": lambda a: f"[Web Search] {a.title}: {a.summary}",
+    "rss": lambda a: f"[RSS - {a.source}] {a.title}: {a.summary}",
+}
+
+
+def is_reliable_source(url: str, title: str) -> bool:
+    """Filters out opinion platforms and known low-quality sources."""
+    blocked_domains = [
+        "medium.com", "linkedin.com", "substack.com",
+        "wordpress.com", "blogspot.com", "tumblr.com"
+    ]
+    # Check URL
+    if any(domain in url.lower() for domain in blocked_domains):
+        return False
+    # Check Title for clickbait markers (optional but helpful)
+    if "opinion:" in title.lower() or "sponsored" in title.lower():
+        return False
+    return True
+
+
+def reliable(articles: Iterable[Article]) -> Iterator[Article]:
+    return (a for a in articles if is_reliable_source(a.url, a.title))
+
+
+# --- PROVIDER ADAPTERS ---
+# Each takes the decoded provider response and yields Articles lazily, so callers
+# can filter and cap (itertools.islice) without materialising the whole payload.
+def iter_gnews(payload: dict) -> Iterator[Article]:
+    for item in payload.get("articles") or []:
+        yield Article(
+            provider="gnews",
+            title=item["title"],
+            url=item["url"],
+            source=item["source"]["name"],
+            summary=item.get("description") or "",
+            published_at=item.get("publishedAt") or "",
+            image_url=item.get("image"),
+        )
+
+
+def iter_marketaux(payload: dict) -> Iterator[Article]:
+    for item in payload.get("data") or []:
+        entities = item.get("entities") or []
+        yield Article(
+            provider="marketaux",
+            title=item["title"],
+            url=item["url"],
+            source=item.get("source") or "",
+            summary=item.get("description") or "",
+            published_at=item.get("published_at") or "",
+            image_url=item.get("image_url"),
+            sentiment=entities[0].get("sentiment_score", "N/A") if entities else "N/A",
+        )
+
+
+def iter_nyt(payload: dict) -> Iterator[Article]:
+    docs = (payload.get("response") or {}).get("docs") or []
+    for doc in docs:
+        headline = doc.get("headline") or {}
+        if "main" not in headline:
+            continue
+        yield Article(
+            provider="nyt",
+            title=headline["main"],
+            url=doc.get("web_url") or "",
+            source="The New York Times",
+            summary=doc.get("abstract", "No summary"),
+            published_at=doc.get("pub_date") or "",
+        )
+
+
+def iter_newsdata(payload: dict) -> Iterator[Article]:
+    for item in payload.get("results") or []:
+        yield Article(
+            provider="newsdata",
+            title=item.get("title") or "",
+            url=item.get("link") or "",
+            source=item.get("source_id") or "",
+            summary=item.get("description") or "",
+            published_at=item.get("pubDate") or "",
+            image_url=item.get("image_url"),
+        )
+
+
+def iter_guardian(payload: dict) -> Iterator[Article]:
+    for item in (payload.get("response") or {}).get("results") or []:
+        yield Article(
+            provider="guardian",
+            title=item["webTitle"],
+            url=item.get("webUrl") or "",
+            source="The Guardian",
+            summary=(item.get("fields") or {}).get("trailText", ""),
+            published_at=item.get("webPublicationDate") or "",
+        )
+
+
+def iter_google_news(results: list) -> Iterator[Article]:
+    """`results` is what the gnews scraper's get_news() returns."""
+    for item in results or []:
+        yield Article(
+            provider="google_news",
+            title=item["title"],
+            url=item["url"],
+            source=(item.get("publisher") or {}).get("title", ""),
+            summary="Read full article on Google News...",
+            published_at=item.get("published date") or "",
+        )
+
+
+def iter_duckduckgo(results: list) -> Iterator[Article]:
+    for item in results or []:
+        yield Article(
+            provider="duckduckgo",
+            title=item["title"],
+            url=item.get("href") or "",
+            summary=item.get("body") or "",
+        )
+
+
+ADAPTERS: Dict[str, Callable[[Any], Iterator[Article]]] = {
+    "gnews": iter_gnews,
+    "marketaux": iter_marketaux,
+    "nyt": iter_nyt,
+    "newsdata": iter_newsdata,
+    "guardian": iter_guardian,
+    "google_news": iter_google_news,
+    "duckduckgo": iter_duckduckgo,
+}
+
+
+# --- CORPUS ASSEMBLY ---
+_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+
+def dedupe_key(article: Article) -> str:
+    """Same story syndicated across providers: match on URL, else on the normalised title."""
+    if article.url:
+        return article.url.split("?")[0].rstrip("/").lower()
+    return _KEY_RE.sub(" ", article.title.lower()).strip()
+
+
+def unique(articles: Iterable[Article]) -> Iterator[Article]:
+    seen = set()
+    for article in articles:
+        key = dedupe_key(article)
+        if key not in seen:
+            seen.add(key)
+            yield article
+
+
+def render_corpus(articles: Iterable[Article], max_chars: Optional[int] = None) -> str:
+    """
+    Renders articles into the prompt text, in order, skipping duplicates.
+    With `max_chars`, stops before the first article that would overflow the
+    budget (whole articles only; the LLM never sees a cut-off line).
+    """
+    lines: List[str] = []
+    size = 0
+    for article in unique(articles):
+        line = article.corpus_line()
+        cost = len(line) + (2 if lines else 0)
+        if max_chars is not None and size + cost > max_chars:
+            break
+        lines.append(line)
+        size += cost
+    return "\n\n".join(lines)
@@ -0,0 +1,375 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+try:
+    from backend import llm_scheduler, topic_index, trends
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.telemetry import log_event, metrics
+except ImportError:
+    import llm_scheduler
+    import topic_index
+    import trends
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from telemetry import log_event, metrics
+
+# --- CONFIGURATION ---
+AUTOPILOT = os.getenv("TRENDFLOW_AUTOPILOT", "1") == "1"
+# Off-peak windows, local to TRENDFLOW_AUTOPILOT_TZ; a window may wrap past midnight
+WINDOWS_SPEC = os.getenv("TRENDFLOW_AUTOPILOT_WINDOWS", "22:00-06:00")
+TIMEZONE = os.getenv("TRENDFLOW_AUTOPILOT_TZ", "UTC")
+DAILY_LIMIT = int(os.getenv("TRENDFLOW_AUTOPILOT_DAILY_LIMIT", "100"))          # generations per day, all users
+USER_DAILY_LIMIT = int(os.getenv("TRENDFLOW_AUTOPILOT_USER_DAILY_LIMIT", "5"))  # generations per day, per user
+MAX_SCHEDULES = int(os.getenv("TRENDFLOW_AUTOPILOT_MAX_SCHEDULES", "20"))       # per user
+CONCURRENCY = int(os.getenv("TRENDFLOW_AUTOPILOT_CONCURRENCY", "2"))
+AUTOPILOT_DB_PATH = os.getenv("TRENDFLOW_AUTOPILOT_DB")  # default: autopilot.sqlite3 in the data dir
+TICK_S = 60.0
+RETRY_S = 1800.0              # a failed or skipped run is tried again this much later (inside a window)
+TREND_CANDIDATES = 20         # rising trends a subscription picks from
+RUN_HISTORY_S = 30 * 86400
+
+
+def parse_windows(spec: str) -> List[Tuple[int, int]]:
+    """"22:00-06:00,12:30-13:30" -> [(1320, 360), (750, 810)] in minutes after midnight."""
+    windows = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        start, end = (datetime.strptime(t.strip(), "%H:%M") for t in part.split("-"))
+        windows.append((start.hour * 60 + start.minute, end.hour * 60 + end.minute))
+    return windows
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    topic TEXT,
+    match TEXT,
+    every_s REAL NOT NULL,
+    next_run_at REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedules_due ON schedules (next_run_at);
+CREATE INDEX IF NOT EXISTS schedules_user ON schedules (user_id);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    schedule_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    topic TEXT,
+    status TEXT NOT NULL,
+    post_id TEXT,
+    error TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_schedule ON runs (schedule_id, started_at);
+"""
+
+
+class ScheduleStore:
+    """
+    Recurring generations registered by users, and every run the autopilot
+    made for them. Runs double as the quota ledger: a day's generations are
+    the runs started since local midnight that were not skipped.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def add(self, user_id: str, kind: str, topic: Optional[str], match: Optional[str], every_s: float,
+            now: Optional[float] = None) -> Optional[dict]:
+        """Registers a schedule, due at the next window. None when the user already has MAX_SCHEDULES."""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            count = self._conn.execute("SELECT COUNT(*) FROM schedules WHERE user_id = ?", (user_id,)).fetchone()[0]
+            if count >= MAX_SCHEDULES:
+                return None
+            cur = self._conn.execute(
+                "INSERT INTO schedules (user_id, kind, topic, match, every_s, next_run_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (user_id, kind, topic, match, every_s, now, now))
+            row = self._conn.execute("SELECT * FROM schedules WHERE id = ?", (cur.lastrowid,)).fetchone()
+        return dict(row)
+
+    def list(self, user_id: str) -> List[dict]:
+        """The user's schedules, each with its latest run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.*, r.status AS last_status, r.topic AS last_topic, r.post_id AS last_post_id, "
+                "r.started_at AS last_run_at FROM schedules s LEFT JOIN runs r ON r.id = "
+                "(SELECT id FROM runs WHERE schedule_id = s.id ORDER BY started_at DESC LIMIT 1) "
+                "WHERE s.user_id = ? ORDER BY s.created_at", (user_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, user_id: str, schedule_id: int) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM schedules WHERE id = ? AND user_id = ?",
+                                      (schedule_id, user_id)).rowcount > 0
+
+    def due(self, now: float) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM schedules WHERE next_run_at <= ? ORDER BY next_run_at",
+                                      (now,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def start_run(self, schedule: dict, now: float) -> int:
+        """Opens a run and moves the schedule to its next occurrence."""
+        next_run_at = schedule["next_run_at"] + schedule["every_s"]
+        if next_run_at <= now:
+            next_run_at = now + schedule["every_s"]
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE schedules SET next_run_at = ? WHERE id = ?", (next_run_at, schedule["id"]))
+            return self._conn.execute(
+                "INSERT INTO runs (schedule_id, user_id, status, started_at) VALUES (?, ?, 'running', ?)",
+                (schedule["id"], schedule["user_id"], now)).lastrowid
+
+    def finish_run(self, run_id: int, status: str, topic: Optional[str] = None, post_id: Optional[str] = None,
+                   error: Optional[str] = None, retry_at: Optional[float] = None, now: Optional[float] = None):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET status = ?, topic = ?, post_id = ?, error = ?, finished_at = ? "
+                               "WHERE id = ?", (status, topic, post_id, error, time.time() if now is None else now,
+                                                run_id))
+            if retry_at is not None:
+                self._conn.execute("UPDATE schedules SET next_run_at = MIN(next_run_at, ?) "
+                                   "WHERE id = (SELECT schedule_id FROM runs WHERE id = ?)", (retry_at, run_id))
+
+    def interrupt_running(self, retry_at: float) -> int:
+        """Fails the runs left 'running' by a worker that died mid-run, and makes their schedules due again."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE schedules SET next_run_at = MIN(next_run_at, ?) WHERE id IN "
+                               "(SELECT schedule_id FROM runs WHERE status = 'running')", (retry_at,))
+            return self._conn.execute("UPDATE runs SET status = 'failed', error = 'interrupted', finished_at = ? "
+                                      "WHERE status = 'running'", (time.time(),)).rowcount
+
+    def usage(self, since: float) -> Dict[str, int]:
+        """Generations started since `since` per user (skipped runs cost nothing)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT user_id, COUNT(*) FROM runs WHERE started_at >= ? AND status != 'skipped' "
+                                      "GROUP BY user_id", (since,)).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def prune(self, max_age_s: float = RUN_HISTORY_S) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM runs WHERE started_at < ?", (time.time() - max_age_s,)).rowcount
+
+    def stats(self, since: float) -> dict:
+        with self._lock:
+            schedules = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT user_id), MIN(next_run_at) "
+                                           "FROM schedules").fetchone()
+            runs = self._conn.execute("SELECT status, COUNT(*) FROM runs WHERE started_at >= ? GROUP BY status",
+                                      (since,)).fetchall()
+        return {"path": self.path, "schedules": schedules[0], "users": schedules[1], "next_due_at": schedules[2],
+                "today": {row[0]: row[1] for row in runs}}
+
+
+def pick_trend(schedule: dict) -> Optional[str]:
+    """Top rising trend (containing the subscription's `match`, if any) the user has not written about lately."""
+    for trend in trends.trend_engine.rising(TREND_CANDIDATES):
+        topic = trend["topic"]
+        if schedule.get("match") and schedule["match"].lower() not in topic.lower():
+            continue
+        match = topic_index.topic_index.find(topic, schedule["user_id"])
+        if match and match["own"]:
+            continue
+        return topic
+    return None
+
+
+class Autopilot:
+    """
+    Runs due schedules through the regular pipeline during the off-peak
+    windows, a few at a time, at "background" LLM priority, within a daily
+    budget for all users and per user. It also waits while interactive calls
+    are queued for a model. Drafts land in posts as needs_review.
+    Only the worker holding the background lease runs it. Runs are tasks of
+    their own, so ticks go on while they generate; stop() cancels them and
+    hands their schedules back for a retry.
+    """
+
+    def __init__(self, store: ScheduleStore, generate: Callable[[str, str], Awaitable[dict]],
+                 windows: Optional[List[Tuple[int, int]]] = None, tz: str = TIMEZONE,
+                 daily_limit: int = DAILY_LIMIT, user_daily_limit: int = USER_DAILY_LIMIT,
+                 concurrency: int = CONCURRENCY, tick_s: float = TICK_S,
+                 pick_topic: Callable[[dict], Optional[str]] = pick_trend):
+        self.store = store
+        self.generate = generate
+        self.windows = parse_windows(WINDOWS_SPEC) if windows is None else windows
+        self.tz = ZoneInfo(tz)
+        self.daily_limit = daily_limit
+        self.user_daily_limit = user_daily_limit
+        self.concurrency = concurrency
+        self.tick_s = tick_s
+        self.pick_topic = pick_topic
+        self._credit = 0.0     # runs owed by the pacing in plan(), carried between ticks
+        self._task: Optional[asyncio.Task] = None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._runs: Set[asyncio.Task] = set()
+
+    def window_left_s(self, now: float) -> Optional[float]:
+        """Seconds until the current off-peak window closes, or None outside every window."""
+        local = datetime.fromtimestamp(now, self.tz)
+        minute = local.hour * 60 + local.minute + local.second / 60
+        left = [(end - minute) % 1440 or 1440 for start, end in self.windows
+                if (start <= minute < end if start <= end else minute >= start or minute < end)]
+        return max(left) * 60 if left else None
+
+    def in_window(self, now: float) -> bool:
+        return self.window_left_s(now) is not None
+
+    def day_start(self, now: float) -> float:
+        local = datetime.fromtimestamp(now, self.tz)
+        return local.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+    def next_window_at(self, now: float) -> Optional[float]:
+        """Start of the next off-peak window (now, if inside one)."""
+        if self.in_window(now):
+            return now
+        local = datetime.fromtimestamp(now, self.tz)
+        starts = []
+        for start, _ in self.windows:
+            at = local.replace(hour=start // 60, minute=start % 60, second=0, microsecond=0)
+            starts.append(at if at > local else at + timedelta(days=1))
+        return min(starts).timestamp() if starts else None
+
+    def plan(self, now: float, free: Optional[int] = None) -> Tuple[List[dict], int]:
+        """
+        Due schedules to start now, and how many due ones wait. Starts are paced
+        to spread what is due evenly over the rest of the window (a burst at
+        its opening would only move the peak), at most `concurrency` per tick,
+        no more than `free` slots and within today's budgets.
+        """
+        used = self.store.usage(self.day_start(now))
+        budget = self.daily_limit - sum(used.values())
+        due = self.store.due(now)
+        eligible = []
+        for schedule in due:
+            user = schedule["user_id"]
+            if used.get(user, 0) < self.user_daily_limit:
+                used[user] = used.get(user, 0) + 1
+                eligible.append(schedule)
+        ticks_left = max(1.0, (self.window_left_s(now) or 0.0) / self.tick_s)
+        self._credit = min(self._credit + len(eligible) / ticks_left, self.concurrency)
+        free = self.concurrency if free is None else free
+        take = max(0, min(int(self._credit), free, budget, len(eligible)))
+        self._credit -= take
+        return eligible[:take], len(due) - take
+
+    async def run_schedule(self, schedule: dict, now: float) -> str:
+        run_id = await asyncio.to_thread(self.store.start_run, schedule, now)
+        topic = schedule["topic"]
+        try:
+            if schedule["kind"] == "trends":
+                topic = await asyncio.to_thread(self.pick_topic, schedule)
+            if not topic:
+                await asyncio.to_thread(self.store.finish_run, run_id, "skipped", error="no new trend",
+                                        retry_at=now + RETRY_S)
+                return "skipped"
+            result = await self.generate(topic, schedule["user_id"])
+            await asyncio.to_thread(self.store.finish_run, run_id, "ok", topic, (result.get("data") or {}).get("id"))
+            return "ok"
+        except asyncio.CancelledError:
+            # Stopped mid-run (shutdown or lost lease): due again as soon as the autopilot is back
+            self.store.finish_run(run_id, "failed", topic, error="interrupted", retry_at=now)
+            raise
+        except Exception as e:
+            log_event("autopilot_run_failed", schedule=schedule["id"], topic=topic, error=str(e)[:200])
+            await asyncio.to_thread(self.store.finish_run, run_id, "failed", topic, error=str(e)[:500],
+                                    retry_at=now + RETRY_S)
+            return "failed"
+
+    async def tick(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Starts what is due, if the window, the budgets and interactive load allow. Returns {outcome: count}."""
+        now = time.time() if now is None else now
+        if not self.in_window(now):
+            self._credit = 0.0
+            return {}
+        if any(model["queued"] for model in llm_scheduler.snapshot().values()):
+            metrics.inc("trendflow_autopilot_ticks_total", help="Autopilot ticks that found due schedules",
+                        outcome="deferred_interactive")
+            return {"deferred": 1}
+        chosen, waiting = await asyncio.to_thread(self.plan, now, self.concurrency - len(self._runs))
+        counts: Dict[str, int] = {"waiting": waiting} if waiting else {}
+        for schedule in chosen:
+            task = asyncio.create_task(self._run(schedule, now))
+            self._runs.add(task)
+            task.add_done_callback(self._runs.discard)
+        if chosen:
+            counts["started"] = len(chosen)
+        if self._runs:
+            counts["running"] = len(self._runs)
+        return counts
+
+    async def _run(self, schedule: dict, now: float):
+        async with self._slots:
+            outcome = await self.run_schedule(schedule, now)
+        metrics.inc("trendflow_autopilot_runs_total", help="Scheduled generations by outcome", outcome=outcome)
+        log_event("autopilot_run", schedule=schedule["id"], outcome=outcome)
+
+    async def join(self):
+        """Waits for the runs in flight."""
+        while self._runs:
+            await asyncio.gather(*self._runs, return_exceptions=True)
+
+    async def run(self):
+        last_prune = 0.0
+        interrupted = await asyncio.to_thread(self.store.interrupt_running, time.time())
+        if interrupted:
+            log_event("autopilot_interrupted_runs", count=interrupted)
+        while True:
+            try:
+                counts = await self.tick()
+                if counts:
+                    log_event("autopilot_tick", **counts)
+                if time.time() - last_prune > 86400:
+                    await asyncio.to_thread(self.store.prune)
+                    last_prune = time.time()
+            except Exception as e:
+                log_event("autopilot_error", error=str(e)[:200])
+            await asyncio.sleep(self.tick_s)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._runs):
+            task.cancel()
+        await self.join()
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            **self.store.stats(self.day_start(now)),
+            "windows": [f"{s // 60:02d}:{s % 60:02d}-{e // 60:02d}:{e % 60:02d}" for s, e in self.windows],
+            "timezone": str(self.tz),
+            "in_window": self.in_window(now),
+            "next_window_at": self.next_window_at(now),
+            "daily_limit": self.daily_limit,
+            "user_daily_limit": self.user_daily_limit,
+            "running": self._task is not None,
+            "in_flight": len(self._runs),
+        }
+
+
+# Opened on first use so importing the API never touches the disk
+schedule_store = LazyObject(lambda: ScheduleStore(AUTOPILOT_DB_PATH or data_path("autopilot.sqlite3")),
+                            label="schedule_store")
@@ -0,0 +1,144 @@
+"""
+Normalisation benchmark for the article records (backend/articles.py).
+
+Replays the recorded provider payloads (fixtures/providers.json), repeated
+to `--items` articles per provider, through:
+
+- dicts: the previous approach, one dict per item (per-provider shape for
+  /news) plus an f-string per item for the research corpus;
+- records: the provider generator adapters yielding slotted Article records,
+  rendered to text only once, at the end.
+
+Reports time and tracemalloc peak for both, and checks that the corpus text
+rendered from the fixtures is byte-identical to the old format.
+
+    python -m backend.benchmarks.articles_bench
+    python -m backend.benchmarks.articles_bench --items 50000 --repeat 5
+"""
+import argparse
+import copy
+import json
+import statistics
+import time
+import tracemalloc
+
+try:
+    from backend import articles
+    from backend.benchmarks.replay import load_fixture
+except ImportError:
+    import articles
+    from benchmarks.replay import load_fixture
+
+
+def scale_payloads(providers: dict, items: int) -> dict:
+    """Repeats each provider's recorded items until there are `items` of them, with unique URLs."""
+    def grow(rows, url_key):
+        out = []
+        for i in range(items):
+            row = copy.copy(rows[i % len(rows)])
+            if url_key in row:
+                row[url_key] = f"{row[url_key].rstrip('/')}/{i}"
+            out.append(row)
+        return out
+
+    return {
+        "gnews": {"articles": grow(providers["gnews"]["json"]["articles"], "url")},
+        "newsdata": {"results": grow(providers["newsdata"]["json"]["results"], "link")},
+        "google_news": grow(providers["google_news"], "url"),
+    }
+
+
+# --- previous approach ---
+def legacy_news_items(payloads: dict) -> list:
+    items = [{
+        "title": a["title"], "url": a["url"], "source": a["source"]["name"], "summary": a["description"],
+        "published_at": a["publishedAt"], "image_url": a.get("image"),
+    } for a in payloads["gnews"]["articles"]]
+    items += [{
+        "title": a["title"], "url": a["link"], "source": a["source_id"], "summary": a["description"],
+        "published_at": a["pubDate"], "image_url": a.get("image_url"),
+    } for a in payloads["newsdata"]["results"]]
+    items += [{
+        "title": r["title"], "url": r["url"], "source": r["publisher"]["title"],
+        "summary": "Read full article on Google News...", "published_at": r["published date"], "image_url": None,
+    } for r in payloads["google_news"]]
+    return items
+
+
+def legacy_corpus(payloads: dict) -> str:
+    lines = [f"[GNews] {a['title']} ({a['source']['name']}): {a['description']}" for a in payloads["gnews"]["articles"]]
+    lines += [f"[NewsData] {a['title']}: {a['description']}" for a in payloads["newsdata"]["results"]]
+    lines += [f"[Google News] {r['title']} ({r['publisher']['title']}): {r['url']}" for r in payloads["google_news"]]
+    return "\n\n".join(lines)
+
+
+def legacy(payloads: dict):
+    return legacy_news_items(payloads), legacy_corpus(payloads)
+
+
+# --- article records ---
+def records(payloads: dict):
+    collected = list(articles.iter_gnews(payloads["gnews"]))
+    collected += articles.iter_newsdata(payloads["newsdata"])
+    collected += articles.iter_google_news(payloads["google_news"])
+    return collected, articles.render_corpus(collected)
+
+
+def measure(fn, payloads: dict, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payloads)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(payloads)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"median_ms": round(statistics.median(times) * 1000, 2), "peak_kb": round(peak / 1024, 1)}
+
+
+def golden_check(providers: dict) -> bool:
+    """The corpus rendered through the adapters must match the old f-string format exactly."""
+    expected = legacy_corpus({
+        "gnews": providers["gnews"]["json"], "newsdata": providers["newsdata"]["json"],
+        "google_news": providers["google_news"],
+    })
+    collected = list(articles.iter_gnews(providers["gnews"]["json"]))
+    collected += articles.iter_newsdata(providers["newsdata"]["json"])
+    collected += articles.iter_google_news(providers["google_news"])
+    return articles.render_corpus(collected) == expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000, help="Articles per provider")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    providers = load_fixture("providers.json")
+    payloads = scale_payloads(providers, args.items)
+    results = {
+        "golden_match": golden_check(providers),
+        "dicts": measure(legacy, payloads, args.repeat),
+        "records": measure(records, payloads, args.repeat),
+    }
+
+    total = 3 * args.items
+    print(f"\n{total} articles (3 providers x {args.items}), median of {args.repeat}")
+    print(f"{'approach':<10} {'ms':>9} {'peak KB':>10}")
+    for name in ("dicts", "records"):
+        r = results[name]
+        print(f"{name:<10} {r['median_ms']:>9.1f} {r['peak_kb']:>10.0f}")
+    change = results["records"]["peak_kb"] / results["dicts"]["peak_kb"] - 1
+    print(f"\nPeak memory {change:+.0%} with records (which also dedupe); corpus golden check: "
+          f"{'ok' if results['golden_match'] else 'MISMATCH'}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
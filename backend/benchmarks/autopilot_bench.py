@@ -0,0 +1,159 @@
+"""
+Off-peak autopilot benchmark (backend/autopilot.py).
+
+A day of recurring posts (`--users` x `--topics` daily topics) produced two
+ways, each running the full app_graph against recordings:
+
+- interactive: every post is generated when someone clicks "generate",
+  at a time drawn from a business-hours profile (peaks late morning and
+  mid-afternoon);
+- autopilot: the same topics registered as daily schedules. An Autopilot
+  with the configured windows and daily limits is ticked on a virtual clock
+  every `--tick-min` minutes, from noon (when the schedules are registered)
+  to noon the next day.
+
+Reports LLM calls per hour for both: the peak hour, its ratio to the hourly
+mean, the share made in 09:00-17:00, and how many drafts were waiting by 09:00.
+
+    python -m backend.benchmarks.autopilot_bench
+    python -m backend.benchmarks.autopilot_bench --users 20 --topics 3 --daily-limit 40
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend import autopilot
+    from backend.benchmarks.replay import replay_environment
+    from backend.llm_scheduler import llm_priority
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    import autopilot
+    from benchmarks.replay import replay_environment
+    from llm_scheduler import llm_priority
+    from telemetry import logger as telemetry_logger, trace_run
+
+TOPICS = ["AI chips", "Nvidia Q3 earnings", "OpenAI GPT-5 launch", "Stripe IPO valuation", "Apple Vision Pro sales",
+          "EU AI Act compliance", "Bitcoin ETF inflows", "Rust in the Linux kernel", "quantum computing startups",
+          "cloud GPU prices", "fusion energy research", "robotics funding"]
+
+# Relative "generate" clicks per hour of the working day
+CLICK_PROFILE = {9: 2, 10: 4, 11: 5, 12: 2, 13: 2, 14: 4, 15: 4, 16: 3, 17: 1}
+BUSINESS_HOURS = range(9, 17)
+
+
+def run_pipeline(agents, topic: str, priority: str) -> int:
+    """LLM calls made by one generation."""
+    with llm_priority(priority), trace_run() as run:
+        agents.app_graph.invoke({"topic": topic, "revision_count": 0, "is_approved": False})
+    return sum(s["calls"] for s in run.summary()["llm"].values())
+
+
+def workload(users: int, topics: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [(f"user{u}", rng.choice(TOPICS)) for u in range(users) for _ in range(topics)]
+
+
+def bench_interactive(agents, jobs: list, seed: int) -> list:
+    rng = random.Random(seed)
+    hours, weights = zip(*CLICK_PROFILE.items())
+    calls = [0] * 24
+    for _, topic in jobs:
+        calls[rng.choices(hours, weights)[0]] += run_pipeline(agents, topic, "interactive")
+    return calls
+
+
+async def bench_autopilot(agents, jobs: list, day_start: float, tick_min: float, args) -> tuple:
+    calls = [0] * 24
+    ready_by_nine = 0
+    start = day_start - 12 * 3600   # noon the day before
+    clock = {"now": start}
+
+    async def generate(topic: str, user_id: str) -> dict:
+        nonlocal ready_by_nine
+        hour = int((clock["now"] - day_start) // 3600) % 24
+        made = await asyncio.to_thread(run_pipeline, agents, topic, "background")
+        calls[hour] += made
+        ready_by_nine += clock["now"] < day_start + 9 * 3600
+        return {"status": "success", "data": {"id": f"{user_id}:{topic}"}}
+
+    store = autopilot.ScheduleStore()
+    for user_id, topic in jobs:
+        store.add(user_id, "topic", topic, None, 86400, now=start)
+    runner = autopilot.Autopilot(store, generate, windows=autopilot.parse_windows(args.windows), tz="UTC",
+                                 daily_limit=args.daily_limit, user_daily_limit=args.user_daily_limit,
+                                 concurrency=args.concurrency, tick_s=tick_min * 60)
+    for i in range(int(24 * 60 / tick_min)):
+        clock["now"] = start + i * tick_min * 60
+        await runner.tick(now=clock["now"])
+        await runner.join()   # the simulated clock only moves between ticks
+    return calls, ready_by_nine, len(store.due(start + 86400 - 1))
+
+
+def summarize(calls: list) -> dict:
+    total = sum(calls)
+    peak = max(range(24), key=lambda h: calls[h])
+    return {
+        "llm_calls": total,
+        "peak_hour": peak,
+        "peak_calls": calls[peak],
+        "peak_to_mean": round(calls[peak] / (total / 24), 2) if total else 0.0,
+        "business_hours_share": round(sum(calls[h] for h in BUSINESS_HOURS) / total, 4) if total else 0.0,
+        "per_hour": calls,
+    }
+
+
+def print_report(results: dict, ready_by_nine: int, jobs: int, waiting: int):
+    width = max(max(r["per_hour"]) for r in results.values()) or 1
+    print(f"\n{'hour':>4}  {'interactive':<32} {'autopilot':<32}")
+    for h in range(24):
+        row = [results[m]["per_hour"][h] for m in ("interactive", "autopilot")]
+        bars = [f"{'#' * round(c / width * 24):<24}{c:>6}" for c in row]
+        print(f"{h:>4}  {bars[0]:<32} {bars[1]:<32}")
+    print(f"\n{'mode':<12} {'LLM calls':>10} {'peak hour':>10} {'peak/mean':>10} {'09-17 share':>12}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['llm_calls']:>10} {r['peak_calls']:>10} {r['peak_to_mean']:>10.2f} "
+              f"{r['business_hours_share']:>12.1%}")
+    print(f"\nautopilot drafts waiting by 09:00: {ready_by_nine}/{jobs}; still due at noon: {waiting}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=12)
+    parser.add_argument("--topics", type=int, default=3, help="Daily topics per user")
+    parser.add_argument("--windows", default=autopilot.WINDOWS_SPEC)
+    parser.add_argument("--daily-limit", type=int, default=autopilot.DAILY_LIMIT)
+    parser.add_argument("--user-daily-limit", type=int, default=autopilot.USER_DAILY_LIMIT)
+    parser.add_argument("--concurrency", type=int, default=autopilot.CONCURRENCY)
+    parser.add_argument("--tick-min", type=float, default=5.0, help="Virtual minutes between autopilot ticks")
+    parser.add_argument("--scale", type=float, default=0.02,
+                        help="Multiplier on recorded latencies (1.0 = production-like)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    telemetry_logger.setLevel(logging.WARNING)
+    jobs = workload(args.users, args.topics, args.seed)
+    day_start = datetime(2024, 6, 3, tzinfo=timezone.utc).timestamp()
+    with replay_environment(scale=args.scale, seed=args.seed) as agents, contextlib.redirect_stdout(io.StringIO()):
+        interactive = bench_interactive(agents, jobs, args.seed)
+        scheduled, ready_by_nine, waiting = asyncio.run(bench_autopilot(agents, jobs, day_start, args.tick_min, args))
+
+    results = {"interactive": summarize(interactive), "autopilot": summarize(scheduled)}
+    print_report(results, ready_by_nine, len(jobs), waiting)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results, "ready_by_nine": ready_by_nine,
+                       "still_due": waiting}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark for blob references in graph state (backend/blob_store.py).
+
+Runs the full app_graph against recordings, `--concurrency` runs at a time,
+with TRENDFLOW_BLOB_STATE on and off, and reports per run:
+
+- state size: the final state serialized as JSON, and the sum over every
+  step's state (what a checkpointer saving each step would write);
+- memory: tracemalloc peak while the runs are in flight, per concurrent run;
+- dedup: values stashed vs. distinct blobs stored.
+
+Replayed responses repeat across runs, so cross-run dedup here is an upper
+bound; draft and best_draft sharing one blob happens in every run.
+
+    python -m backend.benchmarks.blob_state_bench
+    python -m backend.benchmarks.blob_state_bench --runs 16 --concurrency 8
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend.benchmarks.replay import replay_environment
+    from backend import blob_store
+    from backend.telemetry import logger as telemetry_logger
+except ImportError:
+    from benchmarks.replay import replay_environment
+    import blob_store
+    from telemetry import logger as telemetry_logger
+
+
+def run_once(graph, topic: str) -> dict:
+    steps = []
+    for state in graph.stream({"topic": topic, "revision_count": 0, "is_approved": False}, stream_mode="values"):
+        steps.append(len(json.dumps(state, default=str)))
+    return {"final_bytes": steps[-1], "checkpoint_bytes": sum(steps), "steps": len(steps)}
+
+
+def measure(agents, topic: str, runs: int, concurrency: int, enabled: bool) -> dict:
+    blob_store.BLOB_STATE = enabled
+    blob_store.blob_store.prune(0)
+    before = blob_store.blob_store.stats()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: run_once(agents.app_graph, topic), range(runs)))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    after = blob_store.blob_store.stats()
+    return {
+        "blob_state": enabled,
+        "runs": runs,
+        "final_bytes": round(sum(r["final_bytes"] for r in results) / runs),
+        "checkpoint_bytes": round(sum(r["checkpoint_bytes"] for r in results) / runs),
+        "peak_kb_per_run": round(peak / concurrency / 1024, 1),
+        "stashed": after["puts"] - before["puts"],
+        "blobs": after["blobs"],
+        "blob_bytes": after["bytes"],
+        "stored_bytes": after["stored_bytes"],
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="AI chips")
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies (1.0 = production-like)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+    telemetry_logger.setLevel(logging.WARNING)
+
+    results = []
+    with replay_environment(scale=args.scale, seed=args.seed) as agents, contextlib.redirect_stdout(io.StringIO()):
+        run_once(agents.app_graph, args.topic)  # compile the graph and warm the clients outside the measurement
+        for enabled in (False, True):
+            results.append(measure(agents, args.topic, args.runs, args.concurrency, enabled))
+
+    print(f"\n{'blob state':<11} {'final B':>9} {'checkpoints B':>14} {'peak KB/run':>12} {'stashed':>8} {'blobs':>6} "
+          f"{'stored B':>9}")
+    for r in results:
+        print(f"{'on' if r['blob_state'] else 'off':<11} {r['final_bytes']:>9} {r['checkpoint_bytes']:>14} "
+              f"{r['peak_kb_per_run']:>12.1f} {r['stashed']:>8} {r['blobs']:>6} {r['stored_bytes']:>9}")
+    on = results[1]
+    if on["blob_bytes"]:
+        print(f"\nblobs: {on['blob_bytes']} bytes of text stored as {on['stored_bytes']} "
+              f"({on['stored_bytes'] / on['blob_bytes']:.0%} after compression)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
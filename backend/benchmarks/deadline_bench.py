@@ -0,0 +1,118 @@
+"""
+Deadline benchmark (BlogRequest.deadline_s, backend/deadline.py).
+
+Runs the full app_graph against recordings under a series of time budgets
+and reports, per budget, p50/p95 wall time, how often the run finished
+inside the budget, the degradations applied and the final draft's score.
+A budget that runs out before the first draft fails the run (no_draft).
+Budgets and the thresholds in deadline.py are in production seconds; both
+are multiplied by --scale together with the recorded latencies, so the
+same degradations trigger at any scale. Fully offline.
+
+    python -m backend.benchmarks.deadline_bench --runs 10
+    python -m backend.benchmarks.deadline_bench --budgets 0,30,15,8 --scale 0.1 --json deadline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend import deadline
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import replay_environment
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    import deadline
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import replay_environment
+    from telemetry import logger as telemetry_logger, trace_run
+
+THRESHOLDS = ("FULL_RESEARCH_S", "PRO_MODEL_S", "REFINE_S", "PROVIDER_TIMEOUT_S", "MIN_TIMEOUT_S")
+
+
+@contextlib.contextmanager
+def scaled_thresholds(scale: float):
+    saved = {name: getattr(deadline, name) for name in THRESHOLDS}
+    try:
+        for name, value in saved.items():
+            setattr(deadline, name, value * scale)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(deadline, name, value)
+
+
+def bench_budget(agents, topic: str, budget_s: float, runs: int, scale: float) -> dict:
+    elapsed, scores, steps = [], [], Counter()
+    met = failed = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        with trace_run() as run, deadline.time_budget(budget_s * scale):
+            try:
+                state = agents.app_graph.invoke({"topic": topic, "revision_count": 0, "is_approved": False})
+            except deadline.DeadlineExceeded:
+                state = {}
+                failed += 1
+        took = time.perf_counter() - start
+        elapsed.append(took)
+        met += not budget_s or took <= budget_s * scale
+        scores.append(state.get("score") or 0)
+        steps.update(d["step"] for d in run.summary()["degradations"])
+    return {
+        "budget_s": budget_s or None,
+        "runs": runs,
+        "p50_s": round(percentile(elapsed, 50), 4),
+        "p95_s": round(percentile(elapsed, 95), 4),
+        "within_budget": round(met / runs, 4),
+        "score": round(sum(scores) / runs, 1),
+        "no_draft": round(failed / runs, 4),
+        "degradations": {step: round(count / runs, 2) for step, count in sorted(steps.items())},
+    }
+
+
+def print_report(results: list, scale: float):
+    print(f"\n{'budget (s)':>10} {'p50 (s)':>9} {'p95 (s)':>9} {'in budget':>10} {'no draft':>9} {'score':>6}  "
+          f"degradations per run")
+    for r in results:
+        budget = f"{r['budget_s'] * scale:.2f}" if r["budget_s"] else "none"
+        steps = ", ".join(f"{step} {count:g}" for step, count in r["degradations"].items()) or "-"
+        print(f"{budget:>10} {r['p50_s']:>9.3f} {r['p95_s']:>9.3f} {r['within_budget']:>10.0%} {r['no_draft']:>9.0%} "
+              f"{r['score']:>6.1f}  {steps}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="AI chips")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budgets", default="0,60,40,25,15",
+                        help="Comma-separated budgets in production seconds (0 = no deadline)")
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies and budgets (1.0 = production-like)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Keep node prints and telemetry logs")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+    budgets = [float(b) for b in args.budgets.split(",")]
+
+    if not args.verbose:
+        telemetry_logger.setLevel(logging.WARNING)
+    with replay_environment(scale=args.scale, seed=args.seed) as agents, scaled_thresholds(args.scale):
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            results = [bench_budget(agents, args.topic, budget, args.runs, args.scale) for budget in budgets]
+
+    print_report(results, args.scale)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Local stand-ins for the services the FastAPI backend talks to.
+
+- InMemorySupabase: implements the subset of the supabase-py query builder
+  used by main.py (select/eq/order/insert/update/upsert/delete/execute). Calls
+  block for a configurable round-trip time, like the real synchronous client.
+- mock_platform_app: one FastAPI app that answers as dev.to, Hashnode, GNews
+  and NewsData. Run it with uvicorn and point DEVTO_API_URL, HASHNODE_API_URL,
+  GNEWS_API_URL and NEWSDATA_API_URL at it. GET /__calls reports how many
+  requests each stand-in answered.
+"""
+import asyncio
+import copy
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+
+BENCH_JWT_SECRET = "bench-secret"
+
+# Fixed identities so the load driver can mint JWTs without talking to the server
+BENCH_USERS = [
+    {"id": f"00000000-0000-4000-8000-{i:012d}", "email": f"user{i}@bench.local",
+     "full_name": f"Bench User {i}", "avatar_url": "",
+     "devto_api_key": "bench-devto", "hashnode_token": "bench-hashnode", "hashnode_pub_id": "bench-pub"}
+    for i in range(16)
+]
+
+
+class _Query:
+    def __init__(self, db: "InMemorySupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._payload = None
+        self._filters = []
+        self._order = None
+
+    def select(self, *columns):
+        self._op = "select"
+        return self
+
+    def insert(self, payload):
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload):
+        self._op, self._payload = "upsert", payload
+        return self
+
+    def update(self, payload):
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self._filters.append((column, value))
+        return self
+
+    def in_(self, column, values):
+        self._filters.append((column, tuple(values)))
+        return self
+
+    def order(self, column, desc=False):
+        self._order = (column, desc)
+        return self
+
+    def _matches(self, row):
+        return all(str(row.get(col)) in map(str, val) if isinstance(val, tuple) else str(row.get(col)) == str(val)
+                   for col, val in self._filters)
+
+    def execute(self):
+        if self._db.latency_s:
+            time.sleep(self._db.latency_s)
+        with self._db.lock:
+            rows = self._db.tables.setdefault(self._table, [])
+            if self._op in ("insert", "upsert"):
+                items = self._payload if isinstance(self._payload, list) else [self._payload]
+                out = []
+                for item in items:
+                    row = {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **item}
+                    existing = next((r for r in rows if r["id"] == row["id"]), None)
+                    if existing is not None:
+                        if self._op == "insert":
+                            raise RuntimeError(f"duplicate key value violates unique constraint ({row['id']})")
+                        existing.update(row)
+                    else:
+                        rows.append(row)
+                    out.append(copy.deepcopy(row))
+                self._db._touch(self._table, out)
+                return SimpleNamespace(data=out)
+            matched = [r for r in rows if self._matches(r)]
+            if self._op == "update":
+                for r in matched:
+                    r.update(self._payload)
+            elif self._op == "delete":
+                self._db.tables[self._table] = [r for r in rows if not self._matches(r)]
+            if self._op in ("update", "delete"):
+                self._db._touch(self._table, matched)
+            if self._order:
+                col, desc = self._order
+                matched = sorted(matched, key=lambda r: r.get(col) or "", reverse=desc)
+            return SimpleNamespace(data=copy.deepcopy(matched))
+
+
+class InMemorySupabase:
+    """
+    Thread-safe in-memory replacement for supabase.Client. With
+    `post_versions`, writes to posts bump the user's post_stats.version the
+    way the post_stats_touch trigger does (migration_post_stats.sql).
+    """
+
+    def __init__(self, latency_s: float = 0.0, post_versions: bool = False):
+        self.latency_s = latency_s
+        self.post_versions = post_versions
+        self.lock = threading.Lock()
+        self.tables = {"users": [], "posts": []}
+
+    def _touch(self, table: str, rows: list):
+        """Called with the lock held."""
+        if not self.post_versions or table != "posts":
+            return
+        stats = self.tables.setdefault("post_stats", [])
+        for user_id in {r.get("user_id") for r in rows}:
+            row = next((s for s in stats if s["user_id"] == user_id), None)
+            if row is None:
+                stats.append({"user_id": user_id, "version": 1})
+            else:
+                row["version"] = row.get("version", 0) + 1
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def seed(self, posts_per_user: int = 20, body_words: int = 800):
+        body = " ".join(["benchmark"] * body_words)
+        with self.lock:
+            self.tables["users"] = copy.deepcopy(BENCH_USERS)
+            self.tables["posts"] = [
+                {"id": str(uuid.uuid4()), "user_id": user["id"], "title": f"Post {n}",
+                 "content_markdown": body, "status": "needs_review", "viral_score": 70 + n % 30,
+                 "sentiment": "Neutral", "target_audience": "General Tech", "reading_time_min": 4,
+                 "seo_keywords": ["ai", "bench"], "meta_description": "", "critique_notes": "",
+                 "image_prompt": "", "created_at": f"2025-01-{1 + n % 28:02d}T00:00:00+00:00"}
+                for user in BENCH_USERS for n in range(posts_per_user)
+            ]
+        return self
+
+
+# --- MOCK PLATFORM SERVER ---
+MOCK_LATENCY_S = float(os.getenv("MOCK_LATENCY_S", "0.05"))
+
+mock_platform_app = FastAPI(title="TrendFlow platform stand-in")
+upstream_calls = Counter()
+
+
+@mock_platform_app.middleware("http")
+async def count_upstream_calls(request: Request, call_next):
+    service = request.url.path.strip("/").split("/")[0]
+    if service in ("devto", "hashnode", "gnews", "newsdata"):
+        upstream_calls[service] += 1
+    return await call_next(request)
+
+
+@mock_platform_app.get("/__calls")
+async def mock_upstream_calls(reset: bool = False):
+    calls = dict(upstream_calls)
+    if reset:
+        upstream_calls.clear()
+    return calls
+
+
+def _articles(n: int):
+    return [{"title": f"Stand-in article {i}", "url": f"https://standin.local/a/{i}",
+             "description": "Recorded stand-in article body.", "publishedAt": "2025-06-10T10:00:00Z",
+             "image": None, "source": {"name": "Stand-in", "url": "https://standin.local"}}
+            for i in range(n)]
+
+
+@mock_platform_app.get("/devto/articles/me/published")
+async def mock_devto_published():
+    await asyncio.sleep(MOCK_LATENCY_S)
+    return [{"title": f"Published {i}", "url": f"https://dev.to/bench/{i}", "page_views_count": 100 + i,
+             "public_reactions_count": i, "comments_count": i % 3, "published_at": "2025-06-01T00:00:00Z"}
+            for i in range(10)]
+
+
+@mock_platform_app.post("/devto/articles", status_code=201)
+async def mock_devto_publish():
+    await asyncio.sleep(MOCK_LATENCY_S)
+    return {"url": f"https://dev.to/bench/{uuid.uuid4().hex[:8]}"}
+
+
+@mock_platform_app.post("/hashnode")
+async def mock_hashnode(request: Request):
+    await asyncio.sleep(MOCK_LATENCY_S)
+    body = await request.json()
+    if "publishPost" in body.get("query", ""):
+        return {"data": {"publishPost": {"post": {"url": "https://bench.hashnode.dev/x", "slug": "x"}}}}
+    edges = [{"node": {"title": f"Hashnode {i}", "url": f"https://bench.hashnode.dev/{i}",
+                       "publishedAt": "2025-06-01T00:00:00Z", "views": 50 + i,
+                       "reactionCount": i, "responseCount": 0}} for i in range(10)]
+    return {"data": {"publication": {"posts": {"edges": edges}}}}
+
+
+@mock_platform_app.get("/gnews/search")
+async def mock_gnews(max: int = 5):
+    await asyncio.sleep(MOCK_LATENCY_S)
+    return {"totalArticles": max, "articles": _articles(max)}
+
+
+@mock_platform_app.get("/newsdata/news")
+async def mock_newsdata():
+    await asyncio.sleep(MOCK_LATENCY_S)
+    return {"status": "success", "results": [
+        {"title": a["title"], "link": a["url"], "source_id": "standin", "description": a["description"],
+         "pubDate": "2025-06-10 10:00:00", "image_url": None} for a in _articles(5)]}
@@ -0,0 +1,193 @@
+"""
+Benchmark for the RSS/Atom feed store and poller (backend/feeds.py).
+
+- polling: `--feeds` synthetic feeds behind an in-process HTTP stand-in that
+  honours ETag / If-Modified-Since. Polls them all three times: cold, with
+  nothing changed (304s), and after a quarter of the feeds published new
+  items. Reports wall time, bytes downloaded and the outcome of each poll.
+- search: topic lookups against a store of `--entries` entries.
+- research: `fetch_tech_news` under the replay environment, with an empty
+  store (every paid API is called) vs. a store that already holds coverage.
+
+    python -m backend.benchmarks.feeds_bench
+    python -m backend.benchmarks.feeds_bench --feeds 200 --entries 100000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+import httpx
+
+try:
+    from backend import feeds
+    from backend.articles import Article
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import load_fixture, replay_environment
+    from backend.telemetry import trace_run
+except ImportError:
+    import feeds
+    from articles import Article
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import load_fixture, replay_environment
+    from telemetry import trace_run
+
+WORDS = ("nvidia amd intel gpu chips inference training datacenter cloud model open source rust python "
+         "kernel security startup funding quantum battery robotics apple google microsoft meta").split()
+
+
+def headline(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(7)).capitalize()
+
+
+class FeedServer:
+    """Serves synthetic RSS documents; answers 304 when the client's validators still match."""
+
+    def __init__(self, feeds_count: int, items: int, latency_s: float, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.latency_s = latency_s
+        self.items = items
+        self.docs = {}
+        self.bytes_sent = 0
+        for i in range(feeds_count):
+            self.publish(f"https://feeds.bench/{i}.xml", items)
+
+    def publish(self, url: str, count: int):
+        """Prepends `count` new items to the feed at `url` and bumps its validators."""
+        now = datetime.now(timezone.utc)
+        old = self.docs.get(url, {}).get("items", [])
+        version = self.docs.get(url, {}).get("version", 0) + 1
+        new = [(headline(self.rng), f"{url}/item/{version}-{n}", now - timedelta(minutes=n)) for n in range(count)]
+        items = (new + old)[: self.items]
+        body = "".join(
+            f"<item><title>{escape(t)}</title><link>{escape(link)}</link>"
+            f"<description>{escape(t)} in depth.</description><pubDate>{format_datetime(ts)}</pubDate></item>"
+            for t, link, ts in items)
+        self.docs[url] = {
+            "items": items, "version": version, "etag": f'"v{version}"',
+            "modified": format_datetime(now, usegmt=True),
+            "body": f'<?xml version="1.0"?><rss version="2.0"><channel><title>{url}</title>{body}</channel></rss>'.encode(),
+        }
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency_s)
+        doc = self.docs.get(str(request.url))
+        if doc is None:
+            return httpx.Response(404)
+        if request.headers.get("if-none-match") == doc["etag"]:
+            return httpx.Response(304, headers={"etag": doc["etag"]})
+        self.bytes_sent += len(doc["body"])
+        return httpx.Response(200, content=doc["body"],
+                              headers={"etag": doc["etag"], "last-modified": doc["modified"]})
+
+
+async def bench_polling(args) -> list:
+    server = FeedServer(args.feeds, args.items, args.latency)
+    store = feeds.FeedStore(":memory:")
+    poller = feeds.FeedPoller(store, {f"feed-{i}": url for i, url in enumerate(server.docs)},
+                              concurrency=args.concurrency)
+    rounds = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server.handle)) as client:
+        for label in ("cold", "unchanged", "25% updated"):
+            if label == "25% updated":
+                for url in list(server.docs)[: max(1, args.feeds // 4)]:
+                    server.publish(url, 3)
+            store.mark_due()
+            sent_before = server.bytes_sent
+            start = time.perf_counter()
+            counts = await poller.poll_due(client)
+            rounds.append({"round": label, "wall_s": round(time.perf_counter() - start, 3),
+                           "kb_downloaded": round((server.bytes_sent - sent_before) / 1024, 1),
+                           "outcomes": counts, "entries": store.stats()["entries"]})
+    return rounds
+
+
+def bench_search(args) -> dict:
+    rng = random.Random(11)
+    store = feeds.FeedStore(":memory:")
+    now = datetime.now(timezone.utc)
+    batch = [Article(provider="rss", title=headline(rng), url=f"https://bench/{i}", source="Bench",
+                     summary=headline(rng), published_at=(now - timedelta(minutes=i)).isoformat())
+             for i in range(args.entries)]
+    start = time.perf_counter()
+    store.add_entries("https://bench/feed.xml", batch)
+    load_s = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(args.queries):
+        topic = f"{rng.choice(WORDS)} {rng.choice(WORDS)}"
+        start = time.perf_counter()
+        store.search(topic, limit=8, max_age_s=feeds.FEED_MAX_AGE_S)
+        latencies.append(time.perf_counter() - start)
+    return {"entries": args.entries, "load_s": round(load_s, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2), "p95_ms": round(percentile(latencies, 95) * 1000, 2)}
+
+
+def bench_research(args) -> dict:
+    topic = "AI chips"
+    populated = feeds.FeedStore(":memory:")
+    now = datetime.now(timezone.utc)
+    populated.add_entries("https://bench/feed.xml", [
+        Article(provider="rss", title=f"{t} and the AI chips race", url=f"https://bench/research/{i}",
+                source="Bench", summary="Coverage of AI chips.", published_at=(now - timedelta(hours=i)).isoformat())
+        for i, t in enumerate(a["title"] for a in load_fixture("providers.json")["gnews"]["json"]["articles"] * 2)
+    ])
+    results = {}
+    for label, store in (("empty store", None), ("populated store", populated)):
+        with replay_environment(scale=args.scale, feed_store=store) as agents:
+            times, calls = [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                with trace_run() as run, contextlib.redirect_stdout(io.StringIO()):
+                    agents.fetch_tech_news(topic)
+                times.append(time.perf_counter() - start)
+                providers = run.summary()["providers"]
+                calls.append(sum(p["calls"] for name, p in providers.items() if name != "feed_store"))
+        results[label] = {"median_ms": round(statistics.median(times) * 1000, 1),
+                          "api_calls": statistics.median(calls)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=100)
+    parser.add_argument("--items", type=int, default=30, help="Items per feed document")
+    parser.add_argument("--latency", type=float, default=0.05, help="Feed server round trip, seconds")
+    parser.add_argument("--concurrency", type=int, default=feeds.POLL_CONCURRENCY)
+    parser.add_argument("--entries", type=int, default=50000, help="Store size for the search benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5, help="fetch_tech_news runs per store")
+    parser.add_argument("--scale", type=float, default=0.1, help="Replay latency scale for the research runs")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = {
+        "polling": asyncio.run(bench_polling(args)),
+        "search": bench_search(args),
+        "research": bench_research(args),
+    }
+
+    print(f"\nPolling {args.feeds} feeds ({args.concurrency} at a time, {args.latency * 1000:.0f} ms round trip)")
+    print(f"{'round':<14} {'wall s':>7} {'KB':>9} {'entries':>8}  outcomes")
+    for r in results["polling"]:
+        print(f"{r['round']:<14} {r['wall_s']:>7.2f} {r['kb_downloaded']:>9.1f} {r['entries']:>8}  {r['outcomes']}")
+    s = results["search"]
+    print(f"\nSearch over {s['entries']} entries: p50 {s['p50_ms']:.2f} ms, p95 {s['p95_ms']:.2f} ms (loaded in {s['load_s']:.2f}s)")
+    print(f"\nfetch_tech_news (replay x{args.scale}):")
+    for label, r in results["research"].items():
+        print(f"  {label:<16} {r['median_ms']:>8.1f} ms, {r['api_calls']:.0f} API calls")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
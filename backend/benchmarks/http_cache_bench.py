@@ -0,0 +1,167 @@
+"""
+Benchmark for conditional responses and compression on the read endpoints
+(backend/http_cache.py).
+
+Seeds one user with a library of `--posts` posts (markdown bodies of
+roughly `--words` words mixing recorded news sentences with Zipf-distributed
+filler) and polls GET /posts in-process
+through the real app, as the dashboard does on every refresh:
+
+- identity: full JSON body, no compression (what every poll cost before);
+- gzip / br: full body, compressed (first load, or after a change);
+- 304: repeat poll with If-None-Match, nothing changed, answered from the
+  post_stats change counter before the posts are read;
+- 304 hash: the same, without the counter (migration not run), so the list
+  is still loaded and serialized and only the content hash decides.
+
+Reports bytes on the wire, server time per request and the transfer time
+those bytes would take at `--mbps`. Also checks that editing one post
+changes the ETag, so a stale dashboard gets the new list.
+
+    python -m backend.benchmarks.http_cache_bench
+    python -m backend.benchmarks.http_cache_bench --posts 1000 --words 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+os.environ.setdefault("DB_LATENCY_S", "0")
+
+import httpx
+
+try:
+    from backend.benchmarks import standin_app  # noqa: F401 (sets the stand-in config before main loads)
+    from backend import http_cache, main
+    from backend.benchmarks.fakes import BENCH_USERS, InMemorySupabase
+    from backend.benchmarks.load_test import _token
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import load_fixture
+except ImportError:
+    from benchmarks import standin_app  # noqa: F401
+    import http_cache
+    import main
+    from benchmarks.fakes import BENCH_USERS, InMemorySupabase
+    from benchmarks.load_test import _token
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import load_fixture
+
+VOCAB = ("the model inference latency gpu cluster training data pipeline open source release benchmark "
+         "developers cloud cost tokens context window agents framework python rust kernel memory cache "
+         "throughput api startup funding research paper results performance security update").split()
+
+
+def fixture_sentences() -> list:
+    """Longer strings from the recorded provider responses, for prose-like bodies."""
+    out = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+        elif isinstance(node, str) and len(node.split()) > 8:
+            out.append(node)
+
+    walk(load_fixture("providers.json"))
+    return out
+
+
+def paragraph(rng: random.Random, sentences: list, weights: list) -> str:
+    """A few recorded sentences around ~100 words drawn with Zipf-like frequencies."""
+    filler = " ".join(rng.choices(VOCAB, weights=weights, k=100))
+    return " ".join(rng.sample(sentences, 2)) + " " + filler.capitalize() + ". " + rng.choice(sentences)
+
+
+def seed_library(posts: int, words: int, seed: int = 13) -> InMemorySupabase:
+    rng = random.Random(seed)
+    sentences = fixture_sentences()
+    weights = [1 / (rank + 1) for rank in range(len(VOCAB))]
+    user = BENCH_USERS[0]
+    db = InMemorySupabase(latency_s=0, post_versions=True).seed(posts_per_user=0)
+    db.tables["post_stats"] = [{"user_id": user["id"], "version": 1}]
+    db.tables["posts"] = [
+        {"id": str(uuid.uuid4()), "user_id": user["id"], "title": f"Deep Dive #{n}: {rng.choice(VOCAB).title()}",
+         "content_markdown": "\n\n".join(paragraph(rng, sentences, weights) for _ in range(words // 150)),
+         "status": "needs_review", "viral_score": 85, "sentiment": "Neutral", "target_audience": "General Tech",
+         "reading_time_min": words // 200, "seo_keywords": rng.sample(VOCAB, 5), "meta_description": "",
+         "critique_notes": "", "image_prompt": "", "created_at": f"2025-{1 + n % 12:02d}-{1 + n % 28:02d}T00:00:00+00:00"}
+        for n in range(posts)
+    ]
+    return db
+
+
+async def poll(client: httpx.AsyncClient, headers: dict, runs: int) -> dict:
+    times, response, raw = [], None, b""
+    for _ in range(runs):
+        start = time.perf_counter()
+        async with client.stream("GET", "/posts", headers=headers) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        times.append(time.perf_counter() - start)
+    return {"status": response.status_code, "bytes": len(raw),
+            "encoding": response.headers.get("content-encoding", "identity"), "etag": response.headers.get("etag"),
+            "p50_ms": round(percentile(times, 50) * 1000, 2), "p95_ms": round(percentile(times, 95) * 1000, 2)}
+
+
+async def run(args) -> dict:
+    main.supabase = seed_library(args.posts, args.words)
+    auth = {"Authorization": f"Bearer {_token(0)}"}
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results["identity"] = await poll(client, {**auth, "Accept-Encoding": "identity"}, args.runs)
+        results["gzip"] = await poll(client, {**auth, "Accept-Encoding": "gzip"}, args.runs)
+        if http_cache.brotli is not None:
+            results["br"] = await poll(client, {**auth, "Accept-Encoding": "br, gzip"}, args.runs)
+        etag = results["identity"]["etag"]
+        results["304"] = await poll(client, {**auth, "Accept-Encoding": "br, gzip", "If-None-Match": etag}, args.runs)
+        versions, main.supabase.tables["post_stats"] = main.supabase.tables["post_stats"], []
+        hashed = (await client.get("/posts", headers=auth)).headers["etag"]
+        results["304 hash"] = await poll(client, {**auth, "Accept-Encoding": "br, gzip", "If-None-Match": hashed}, args.runs)
+        main.supabase.tables["post_stats"] = versions
+
+        post_id = main.supabase.tables["posts"][0]["id"]
+        await client.put(f"/posts/{post_id}", headers=auth, json={"title": "Edited"})
+        after = await client.get("/posts", headers={**auth, "If-None-Match": etag})
+        results["after_edit"] = {"status": after.status_code, "etag_changed": after.headers.get("etag") != etag}
+    return results
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=300, help="Posts in the user's library")
+    parser.add_argument("--words", type=int, default=1200, help="Words per post body")
+    parser.add_argument("--runs", type=int, default=30, help="Polls per variant")
+    parser.add_argument("--mbps", type=float, default=20.0, help="Client bandwidth for the transfer estimate")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    full = results["identity"]["bytes"]
+    print(f"\nGET /posts, library of {args.posts} posts x {args.words} words")
+    print(f"{'variant':<10} {'status':>6} {'bytes':>11} {'vs full':>8} {'server p50':>11} {'p95':>8} {'transfer':>9}")
+    for name in ("identity", "gzip", "br", "304", "304 hash"):
+        if name not in results:
+            continue
+        r = results[name]
+        transfer_ms = r["bytes"] * 8 / (args.mbps * 1e6) * 1000
+        print(f"{name:<10} {r['status']:>6} {r['bytes']:>11,} {r['bytes'] / full:>8.1%} {r['p50_ms']:>9.2f}ms "
+              f"{r['p95_ms']:>6.2f}ms {transfer_ms:>7.1f}ms")
+    a = results["after_edit"]
+    print(f"\nafter editing one post: {a['status']} (ETag changed: {a['etag_changed']})")
+    if "br" not in results:
+        print("(brotli not installed: gzip only)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,108 @@
+"""
+Cold-start import benchmark for the API process.
+
+Imports `backend.main` in fresh interpreters under `python -X importtime` and
+reports the median total import time, the heaviest packages by self time,
+and whether any module that should load lazily (LLM SDK, LangGraph,
+scrapers, Supabase) was imported at startup anyway.
+
+    python -m backend.benchmarks.import_time
+    python -m backend.benchmarks.import_time --baseline backend/benchmarks/fixtures/import_time_baseline.json
+    python -m backend.benchmarks.import_time --write-baseline backend/benchmarks/fixtures/import_time_baseline.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Must not be imported by `import backend.main`; they load on first generation / DB call
+LAZY_MODULES = ["langgraph", "langchain_google_genai", "google.genai", "duckduckgo_search", "gnews", "supabase", "feedparser", "numpy"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def measure_once(target: str) -> dict:
+    env = {**os.environ, "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "import-bench")}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                          cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    modules, total_us = {}, 0
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, _, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        modules[name] = self_us
+        if name == target:
+            total_us = cumulative_us
+    return {"wall_ms": wall * 1000, "import_ms": total_us / 1000, "modules": modules}
+
+
+def summarize(samples, top: int) -> dict:
+    by_package = {}
+    for name, self_us in samples[-1]["modules"].items():
+        root = name.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    imported = set(samples[-1]["modules"])
+    eager = sorted(m for m in LAZY_MODULES if any(n == m or n.startswith(m + ".") for n in imported))
+    return {
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "modules": len(imported),
+        "heaviest": [{"package": p, "self_ms": round(us / 1000, 1)}
+                     for p, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]],
+        "eager_lazy_modules": eager,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--baseline", help="Fail if import time regresses vs. this JSON (or a lazy module loads eagerly)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed import-time regression vs. baseline")
+    parser.add_argument("--write-baseline", help="Write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    measure_once(args.target)  # warm the bytecode cache
+    samples = [measure_once(args.target) for _ in range(args.runs)]
+    summary = summarize(samples, args.top)
+
+    print(f"\nimport {args.target}: {summary['import_ms']:.0f} ms import, {summary['wall_ms']:.0f} ms "
+          f"interpreter wall, {summary['modules']} modules (median of {args.runs})")
+    print(f"\n{'package':<28} {'self ms':>8}")
+    for row in summary["heaviest"]:
+        print(f"{row['package']:<28} {row['self_ms']:>8.1f}")
+    if summary["eager_lazy_modules"]:
+        print(f"\n⚠️ Imported at startup but meant to be lazy: {', '.join(summary['eager_lazy_modules'])}")
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target, **summary}, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        change = (summary["import_ms"] - baseline["import_ms"]) / baseline["import_ms"]
+        ok = change <= args.tolerance and not summary["eager_lazy_modules"]
+        print(f"\nBaseline: {baseline['import_ms']:.0f} ms -> {summary['import_ms']:.0f} ms ({change:+.1%}) "
+              f"{'ok' if ok else 'REGRESSION'}")
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
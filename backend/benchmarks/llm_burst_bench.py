@@ -0,0 +1,176 @@
+"""
+Burst benchmark for the LLM scheduler (backend/llm_scheduler.py).
+
+Fires a burst of concurrent calls at a simulated Gemini endpoint that only
+admits `--quota` calls at a time and answers the rest with 429. Compares:
+
+- ungoverned: every caller retries on its own with exponential backoff
+  (what the SDK does per request);
+- governed: the same model class behind the shared AIMD limiter.
+
+Reports completed calls/s against the quota ceiling (quota / latency), 429s,
+failures and latency percentiles, plus queue time per priority class for a
+mixed interactive/background burst.
+
+    python -m backend.benchmarks.llm_burst_bench
+    python -m backend.benchmarks.llm_burst_bench --calls 400 --quota 8 --latency 0.2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.exceptions import ModelRateLimitError
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+try:
+    from backend import llm_scheduler
+    from backend.benchmarks.pipeline_bench import percentile
+except ImportError:
+    import llm_scheduler
+    from benchmarks.pipeline_bench import percentile
+
+
+class QuotaServer:
+    """Admits `quota` concurrent calls; anything above that is rejected with a 429."""
+
+    def __init__(self, quota: int, latency_s: float):
+        self.quota = quota
+        self.latency_s = latency_s
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.served = 0
+
+    def call(self):
+        with self.lock:
+            admitted = self.in_flight < self.quota
+            if admitted:
+                self.in_flight += 1
+            else:
+                self.rejected += 1
+        if not admitted:
+            time.sleep(0.005)
+            raise ModelRateLimitError("429 RESOURCE_EXHAUSTED: quota exceeded")
+        time.sleep(self.latency_s * random.uniform(0.9, 1.1))
+        with self.lock:
+            self.in_flight -= 1
+            self.served += 1
+
+
+class QuotaChatModel(BaseChatModel):
+    model: str = "quota-model"
+    server: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "quota-stand-in"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.server.call()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+def ungoverned_call(model: QuotaChatModel, attempts: int, backoff_s: float):
+    """SDK-style independent retries: exponential backoff, then give up."""
+    for attempt in range(attempts):
+        try:
+            return model.invoke([HumanMessage(content="hi")])
+        except ModelRateLimitError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(backoff_s * 2 ** attempt * random.uniform(0.5, 1.0))
+
+
+def run_burst(call, calls: int, priorities=None) -> dict:
+    latencies, failures = [], 0
+    by_priority = {}
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal failures
+        priority = priorities[i % len(priorities)] if priorities else "interactive"
+        start = time.perf_counter()
+        try:
+            with llm_scheduler.llm_priority(priority):
+                call()
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+                by_priority.setdefault(priority, []).append(elapsed)
+            else:
+                failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=calls) as pool:
+        list(pool.map(one, range(calls)))
+    wall = time.perf_counter() - start
+    return {
+        "calls": calls,
+        "completed": len(latencies),
+        "failed": failures,
+        "wall_s": round(wall, 3),
+        "completed_per_s": round(len(latencies) / wall, 2),
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+        "by_priority_p50_s": {p: round(percentile(v, 50), 3) for p, v in by_priority.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="Calls in the burst")
+    parser.add_argument("--quota", type=int, default=8, help="Concurrent calls the endpoint admits")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per admitted call")
+    parser.add_argument("--max-limit", type=int, default=32, help="Scheduler ceiling (starts at half)")
+    parser.add_argument("--retries", type=int, default=6, help="Attempts per call when ungoverned")
+    parser.add_argument("--backoff", type=float, default=0.25, help="Initial backoff when ungoverned, seconds")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    ceiling = args.quota / args.latency
+    results = {"ceiling_per_s": round(ceiling, 2)}
+
+    server = QuotaServer(args.quota, args.latency)
+    plain = QuotaChatModel(model="quota-ungoverned", server=server)
+    results["ungoverned"] = run_burst(lambda: ungoverned_call(plain, args.retries, args.backoff), args.calls)
+    results["ungoverned"]["rate_limited"] = server.rejected
+
+    llm_scheduler.MAX_CONCURRENCY["quota-governed"] = args.max_limit
+    server = QuotaServer(args.quota, args.latency)
+    governed_model = llm_scheduler.governed(QuotaChatModel)(model="quota-governed", server=server)
+    results["governed"] = run_burst(lambda: governed_model.invoke([HumanMessage(content="hi")]), args.calls)
+    results["governed"]["rate_limited"] = server.rejected
+    results["governed"]["final_limit"] = llm_scheduler.snapshot()["quota-governed"]["limit"]
+
+    # Same burst, half of it background work: interactive calls should not wait behind it
+    server.rejected = 0
+    results["governed_mixed"] = run_burst(lambda: governed_model.invoke([HumanMessage(content="hi")]), args.calls,
+                                          priorities=["interactive", "background"])
+    results["governed_mixed"]["rate_limited"] = server.rejected
+
+    print(f"\nQuota ceiling: {ceiling:.1f} calls/s ({args.quota} concurrent x {args.latency}s)")
+    print(f"{'mode':<16} {'done':>5} {'failed':>6} {'429s':>6} {'calls/s':>8} {'of ceiling':>10} {'p50 s':>7} {'p95 s':>7}")
+    for mode in ("ungoverned", "governed", "governed_mixed"):
+        r = results[mode]
+        print(f"{mode:<16} {r['completed']:>5} {r['failed']:>6} {r['rate_limited']:>6} {r['completed_per_s']:>8.1f} "
+              f"{r['completed_per_s'] / ceiling:>9.0%} {r['p50_s']:>7.2f} {r['p95_s']:>7.2f}")
+    print("\nMixed burst, p50 latency by priority: "
+          + ", ".join(f"{p} {v:.2f}s" for p, v in results["governed_mixed"]["by_priority_p50_s"].items()))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Load test for the FastAPI endpoints against local stand-ins.
+
+Starts the mock platform server (dev.to, Hashnode, GNews, NewsData) and the
+real app wired to an in-memory Supabase (see standin_app.py), then drives each
+endpoint at increasing concurrency. Reports requests/s, latency percentiles
+and the server's event-loop lag for every level.
+
+    python -m backend.benchmarks.load_test
+    python -m backend.benchmarks.load_test --endpoints posts,news --concurrency 1,8,32 --requests 400
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from jose import jwt
+
+try:
+    from backend.benchmarks.fakes import BENCH_JWT_SECRET, BENCH_USERS
+    from backend.benchmarks.pipeline_bench import percentile
+except ImportError:
+    from benchmarks.fakes import BENCH_JWT_SECRET, BENCH_USERS
+    from benchmarks.pipeline_bench import percentile
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+ENDPOINTS = {
+    # name: (method, path, json body factory or None, needs auth)
+    "news": ("GET", "/news?topic=AI&limit=5", None, False),
+    "posts": ("GET", "/posts", None, True),
+    "analytics": ("GET", "/analytics", None, True),
+    "auth": ("POST", "/auth/google", lambda i: {"credential": f"bench:{i}"}, False),
+    "generate": ("POST", "/generate-pro-blog", lambda i: {"topic": "AI chips"}, True),
+}
+
+
+def _token(i: int) -> str:
+    user = BENCH_USERS[i % len(BENCH_USERS)]
+    return jwt.encode({"sub": user["id"], "email": user["email"], "exp": int(time.time()) + 3600},
+                      BENCH_JWT_SECRET, algorithm="HS256")
+
+
+def _spawn(app_path: str, port: int, env: dict, workers: int = 1) -> subprocess.Popen:
+    # Server logs go to a temp file: a PIPE nobody drains would eventually block the server
+    log = tempfile.TemporaryFile()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env={**os.environ, **env},
+        stdout=log, stderr=log,
+    )
+    proc.log = log
+    return proc
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                proc.log.seek(0)
+                raise RuntimeError(f"server exited early:\n{proc.log.read().decode()[-2000:]}")
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+async def run_level(base_url: str, endpoint: str, concurrency: int, total: int) -> dict:
+    method, path, body, needs_auth = ENDPOINTS[endpoint]
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300,
+                                 limits=httpx.Limits(max_connections=concurrency)) as client:
+        await client.get("/__bench/loop-lag")  # reset the probe
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                headers = {"Authorization": f"Bearer {_token(i)}"} if needs_auth else {}
+                start = time.perf_counter()
+                try:
+                    resp = await client.request(method, path, json=body(i) if body else None, headers=headers)
+                    if resp.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - wall_start
+        lag = (await client.get("/__bench/loop-lag")).json()
+
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / wall, 2),
+        "p50_ms": round(1000 * percentile(latencies, 50), 1),
+        "p95_ms": round(1000 * percentile(latencies, 95), 1),
+        "p99_ms": round(1000 * percentile(latencies, 99), 1),
+        "loop_lag_p95_ms": lag["p95_ms"],
+        "loop_lag_max_ms": lag["max_ms"],
+    }
+
+
+def print_report(results):
+    print(f"\n{'endpoint':<10} {'conc':>5} {'req':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'lag p95':>8} {'lag max':>8}")
+    for r in results:
+        print(f"{r['endpoint']:<10} {r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['loop_lag_p95_ms']:>8.1f} {r['loop_lag_max_ms']:>8.1f}")
+
+
+async def main_async(args):
+    env = {
+        "MOCK_LATENCY_S": str(args.mock_latency),
+        "MOCK_BASE_URL": f"http://127.0.0.1:{args.mock_port}",
+        "DB_LATENCY_S": str(args.db_latency),
+        "AUTH_LATENCY_S": str(args.auth_latency),
+        "REPLAY_SCALE": str(args.replay_scale),
+    }
+    mock = _spawn("backend.benchmarks.fakes:mock_platform_app", args.mock_port, env)
+    server = _spawn(args.app, args.port, env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+    try:
+        await _wait_ready(f"http://127.0.0.1:{args.mock_port}/docs", mock)
+        await _wait_ready(f"{base_url}/__bench/loop-lag", server)
+        for endpoint in args.endpoints.split(","):
+            total = args.generate_requests if endpoint == "generate" else args.requests
+            for conc in [int(c) for c in args.concurrency.split(",")]:
+                result = await run_level(base_url, endpoint, conc, max(total, conc))
+                results.append(result)
+                print(f"   {endpoint} @ {conc}: {result['rps']} req/s, p95 {result['p95_ms']} ms")
+    finally:
+        for proc in (server, mock):
+            proc.terminate()
+            proc.wait(timeout=10)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default="news,posts,analytics,auth,generate")
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per level")
+    parser.add_argument("--generate-requests", type=int, default=16, help="Requests per level for /generate-pro-blog")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Supabase round trip (blocking), seconds")
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="dev.to/Hashnode/news round trip, seconds")
+    parser.add_argument("--auth-latency", type=float, default=0.05, help="Google token verification (blocking), seconds")
+    parser.add_argument("--replay-scale", type=float, default=0.01, help="Latency multiplier for the replayed graph")
+    parser.add_argument("--app", default="backend.benchmarks.standin_app:app")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mock-port", type=int, default=8101)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(main_async(args))
+    print_report(results)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark for the live news hub behind /news/stream (backend/news_stream.py).
+
+`--clients` dashboards spread over `--topics` topics watch the news for
+`--duration` seconds against a stand-in upstream that publishes
+`--new-per-refresh` new stories per topic per refresh interval (and takes
+`--upstream-latency` to answer). Compares:
+
+- polling: every client re-requests its topic each `--interval`, like the
+  old NewsFeed; each request is a full upstream fan-out.
+- stream: every client subscribes to the hub; one refresher per topic.
+
+Reports upstream fetches, items sent to clients, and for the stream whether
+any client received a story twice or missed one.
+
+    python -m backend.benchmarks.news_stream_bench
+    python -m backend.benchmarks.news_stream_bench --clients 1000 --topics 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+try:
+    from backend import news_stream
+except ImportError:
+    import news_stream
+
+
+class Upstream:
+    """Per-topic story feed that grows with time; counts every fetch."""
+
+    def __init__(self, new_per_refresh: int, interval_s: float, latency_s: float):
+        self.new_per_refresh = new_per_refresh
+        self.interval_s = interval_s
+        self.latency_s = latency_s
+        self.start = time.monotonic()
+        self.calls = Counter()
+
+    def published(self, topic: str) -> int:
+        return (1 + int((time.monotonic() - self.start) / self.interval_s)) * self.new_per_refresh
+
+    async def fetch(self, topic: str, limit: int) -> list:
+        self.calls[topic] += 1
+        await asyncio.sleep(self.latency_s)
+        newest = self.published(topic)
+        return [{"title": f"{topic} story {n}", "url": f"https://upstream.bench/{topic}/{n}", "source": "Bench",
+                 "summary": "", "published_at": "", "image_url": None}
+                for n in range(newest - 1, max(-1, newest - 1 - limit), -1)]
+
+
+async def run_polling(args) -> dict:
+    upstream = Upstream(args.new_per_refresh, args.interval, args.upstream_latency)
+    sent = 0
+
+    async def client(i: int):
+        nonlocal sent
+        topic = f"topic-{i % args.topics}"
+        while time.monotonic() - upstream.start < args.duration:
+            items = await upstream.fetch(topic, args.limit)
+            sent += len(items)
+            await asyncio.sleep(args.interval)
+
+    await asyncio.gather(*(client(i) for i in range(args.clients)))
+    return {"upstream_fetches": sum(upstream.calls.values()), "items_sent": sent}
+
+
+async def run_stream(args) -> dict:
+    upstream = Upstream(args.new_per_refresh, args.interval, args.upstream_latency)
+    hub = news_stream.TopicHub(fetch=upstream.fetch, interval_s=args.interval, max_topics=args.topics)
+    received = [Counter() for _ in range(args.clients)]
+
+    async def client(i: int):
+        async for event, items in news_stream.news_events(hub, f"topic-{i % args.topics}", args.limit):
+            received[i].update(item["url"] for item in items or [])
+
+    tasks = [asyncio.create_task(client(i)) for i in range(args.clients)]
+    await asyncio.sleep(args.duration)
+    # Every client should now hold every story its topic published since it joined
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await hub.close()
+
+    duplicates = sum(n - 1 for counts in received for n in counts.values() if n > 1)
+    missing = 0
+    for counts in received:
+        newest = max(int(url.rsplit("/", 1)[1]) for url in counts) if counts else -1
+        oldest = min(int(url.rsplit("/", 1)[1]) for url in counts) if counts else 0
+        missing += (newest - oldest + 1) - len(counts)
+    return {"upstream_fetches": sum(upstream.calls.values()), "items_sent": sum(sum(c.values()) for c in received),
+            "duplicates": duplicates, "gaps": missing}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--topics", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds to watch")
+    parser.add_argument("--interval", type=float, default=0.25, help="Poll / refresh interval, seconds")
+    parser.add_argument("--new-per-refresh", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--upstream-latency", type=float, default=0.05)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"polling": asyncio.run(run_polling(args)), "stream": asyncio.run(run_stream(args))}
+
+    print(f"\n{args.clients} clients on {args.topics} topics for {args.duration:.0f}s (refresh every {args.interval}s)")
+    print(f"{'mode':<8} {'upstream fetches':>17} {'items sent':>11}")
+    for mode, r in results.items():
+        print(f"{mode:<8} {r['upstream_fetches']:>17,} {r['items_sent']:>11,}")
+    s = results["stream"]
+    print(f"\nstream: {s['duplicates']} duplicate deliveries, {s['gaps']} gaps")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark for the post outbox (backend/outbox.py).
+
+Saves `--posts` generated posts against the in-memory Supabase stand-in with
+`--db-latency` per round trip, a fraction `--failure-rate` of which fail
+(half of those after the write went through, as when the acknowledgement is
+lost). Compares:
+
+- direct: the old path, one blocking insert per post inside the request;
+  a failed insert means the post is lost.
+- outbox: enqueue inside the request, then the flusher drains the queue in
+  batches, retrying failures.
+
+Reports the latency the request pays, how long the flusher takes to drain,
+and how many posts end up in the database (and whether any twice). A last
+run enqueues during a full outage, reopens the outbox from disk as after a
+restart, and checks every post still lands.
+
+    python -m backend.benchmarks.outbox_bench
+    python -m backend.benchmarks.outbox_bench --posts 2000 --failure-rate 0.3
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+try:
+    from backend import outbox
+    from backend.benchmarks.fakes import InMemorySupabase
+    from backend.benchmarks.pipeline_bench import percentile
+except ImportError:
+    import outbox
+    from benchmarks.fakes import InMemorySupabase
+    from benchmarks.pipeline_bench import percentile
+
+
+class FlakySupabase:
+    """Wraps the stand-in so that a fraction of round trips fail, before or after they are applied."""
+
+    def __init__(self, db: InMemorySupabase, failure_rate: float, seed: int = 5):
+        self.db = db
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+
+    def table(self, name):
+        builder = self.db.table(name)
+        execute = builder.execute
+
+        def flaky_execute():
+            roll = self.rng.random()
+            if roll < self.failure_rate / 2:
+                raise ConnectionError("injected: connection reset")
+            response = execute()
+            if roll < self.failure_rate:
+                raise TimeoutError("injected: acknowledgement lost")
+            return response
+
+        builder.execute = flaky_execute
+        return builder
+
+
+def post(i: int) -> dict:
+    return {"user_id": f"user-{i % 7}", "title": f"Deep Dive #{i}", "content_markdown": "# Draft\n" + "Body. " * 400,
+            "status": "needs_review", "seo_keywords": ["ai", "bench"], "reading_time_min": 5}
+
+
+def stored(db: InMemorySupabase) -> dict:
+    titles = Counter(r["title"] for r in db.tables.get("posts", []))
+    return {"stored": len(titles), "duplicates": sum(n - 1 for n in titles.values())}
+
+
+def bench_direct(args) -> dict:
+    db = InMemorySupabase(latency_s=args.db_latency)
+    client = FlakySupabase(db, args.failure_rate)
+    latencies, errors = [], 0
+    for i in range(args.posts):
+        start = time.perf_counter()
+        try:
+            client.table("posts").insert(post(i)).execute()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return {"p50_ms": round(percentile(latencies, 50) * 1000, 2), "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "errors": errors, "drain_s": 0.0, **stored(db)}
+
+
+def drain(box: outbox.PostOutbox, timeout_s: float = 120.0) -> float:
+    start = time.perf_counter()
+    while box.stats()["pending"]:
+        if time.perf_counter() - start > timeout_s:
+            raise RuntimeError(f"outbox did not drain: {box.stats()}")
+        if box.flush_once()["flushed"] == 0:
+            time.sleep(min(box.next_attempt_in() or 0.0, 0.05))
+    return time.perf_counter() - start
+
+
+def bench_outbox(args, path: str) -> dict:
+    db = InMemorySupabase(latency_s=args.db_latency)
+    client = FlakySupabase(db, args.failure_rate)
+    box = outbox.PostOutbox(path, lambda: client, batch=args.batch)
+    latencies = []
+    for i in range(args.posts):
+        start = time.perf_counter()
+        box.enqueue(post(i))
+        latencies.append(time.perf_counter() - start)
+    drain_s = drain(box)
+    return {"p50_ms": round(percentile(latencies, 50) * 1000, 2), "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "errors": 0, "drain_s": round(drain_s, 2), **stored(db)}
+
+
+def bench_restart(args, path: str) -> dict:
+    """Enqueue while Supabase is down, drop the outbox, reopen it from disk and flush."""
+    down = outbox.PostOutbox(path, lambda: None, batch=args.batch)
+    for i in range(args.posts):
+        down.enqueue(post(i))
+    pending = down.stats()["pending"]
+    del down
+    db = InMemorySupabase(latency_s=args.db_latency)
+    reopened = outbox.PostOutbox(path, lambda: FlakySupabase(db, args.failure_rate), batch=args.batch)
+    return {"pending_after_restart": pending, "drain_s": round(drain(reopened), 2), **stored(db)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Supabase round trip, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Fraction of round trips that fail")
+    parser.add_argument("--batch", type=int, default=outbox.FLUSH_BATCH)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    outbox.MAX_BACKOFF_S = 0.05   # retry quickly; production backs off up to minutes
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {
+            "direct": bench_direct(args),
+            "outbox": bench_outbox(args, os.path.join(tmp, "outbox.sqlite3")),
+            "restart": bench_restart(args, os.path.join(tmp, "restart.sqlite3")),
+        }
+
+    print(f"\n{args.posts} posts, {args.db_latency * 1000:.0f} ms DB round trip, {args.failure_rate:.0%} failing")
+    print(f"{'path':<8} {'p50 ms':>8} {'p95 ms':>8} {'drain s':>8} {'stored':>7} {'lost':>5} {'dupes':>6}")
+    for name in ("direct", "outbox"):
+        r = results[name]
+        print(f"{name:<8} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['drain_s']:>8.2f} {r['stored']:>7} "
+              f"{args.posts - r['stored']:>5} {r['duplicates']:>6}")
+    r = results["restart"]
+    print(f"\nrestart: {r['pending_after_restart']} posts queued during the outage, "
+          f"{r['stored']} stored after reopening ({r['duplicates']} duplicates, {r['drain_s']:.2f}s)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
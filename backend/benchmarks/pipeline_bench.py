@@ -0,0 +1,166 @@
+"""
+Replay benchmark for the full generation pipeline (app_graph).
+
+Runs the real StateGraph against recorded provider and Gemini responses with
+artificial latencies, then reports end-to-end p50/p95, per-node timings and
+throughput at increasing concurrency. Fully offline.
+
+    python -m backend.benchmarks.pipeline_bench --runs 20 --concurrency 1,2,4,8
+    python -m backend.benchmarks.pipeline_bench --json out.json --baseline base.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend.benchmarks.replay import replay_environment
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    from benchmarks.replay import replay_environment
+    from telemetry import logger as telemetry_logger, trace_run
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def run_once(graph, topic: str):
+    start = time.perf_counter()
+    with trace_run() as run:
+        state = graph.invoke({"topic": topic, "revision_count": 0, "is_approved": False})
+    return time.perf_counter() - start, run.summary(), state
+
+
+def bench_level(graph, topic: str, concurrency: int, runs: int) -> dict:
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: run_once(graph, topic), range(runs)))
+    wall = time.perf_counter() - wall_start
+
+    e2e = [elapsed for elapsed, _, _ in results]
+    per_node = {}
+    routes = {}
+    for _, summary, _ in results:
+        for node, stats in summary["nodes"].items():
+            per_node.setdefault(node, []).append(stats["total_s"])
+        for decision in summary.get("routing", []):
+            if not decision["escalated"]:
+                key = f"{decision['site']}:{decision['tier']}"
+                routes[key] = routes.get(key, 0) + 1
+    return {
+        "concurrency": concurrency,
+        "runs": runs,
+        "p50_s": round(percentile(e2e, 50), 4),
+        "p95_s": round(percentile(e2e, 95), 4),
+        "throughput_rps": round(runs / wall, 3),
+        "approval_rate": round(sum(1 for _, _, state in results if state.get("is_approved")) / runs, 3),
+        "routes": routes,
+        "nodes": {
+            node: {"p50_s": round(percentile(v, 50), 4), "p95_s": round(percentile(v, 95), 4)}
+            for node, v in per_node.items()
+        },
+    }
+
+
+def print_report(levels):
+    print("\n=== End-to-end ===")
+    print(f"{'conc':>5} {'runs':>5} {'p50 (s)':>9} {'p95 (s)':>9} {'runs/s':>8} {'approved':>9}")
+    for lvl in levels:
+        print(f"{lvl['concurrency']:>5} {lvl['runs']:>5} {lvl['p50_s']:>9.3f} {lvl['p95_s']:>9.3f} "
+              f"{lvl['throughput_rps']:>8.2f} {lvl['approval_rate']:>8.0%}")
+
+    base = levels[0]
+    print(f"\n=== Per node (concurrency {base['concurrency']}) ===")
+    print(f"{'node':<12} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for node, stats in sorted(base["nodes"].items(), key=lambda kv: -kv[1]["p50_s"]):
+        print(f"{node:<12} {stats['p50_s']:>9.3f} {stats['p95_s']:>9.3f}")
+
+    if base["routes"]:
+        print(f"\n=== Accepted model tier per call site (concurrency {base['concurrency']}) ===")
+        for key, count in sorted(base["routes"].items()):
+            print(f"{key:<20} {count:>5}")
+
+    print("\n=== Scaling curve (throughput vs. concurrency 1) ===")
+    for lvl in levels:
+        speedup = lvl["throughput_rps"] / base["throughput_rps"] if base["throughput_rps"] else 0
+        print(f"{lvl['concurrency']:>5}x  {speedup:5.2f}  {'#' * int(speedup * 10)}")
+
+
+def compare_to_baseline(levels, baseline_path: str, tolerance: float) -> bool:
+    """Returns False if any level's p95 regressed by more than `tolerance`."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {lvl["concurrency"]: lvl for lvl in json.load(f)["levels"]}
+    ok = True
+    for lvl in levels:
+        ref = baseline.get(lvl["concurrency"])
+        if not ref:
+            continue
+        change = (lvl["p95_s"] - ref["p95_s"]) / ref["p95_s"] if ref["p95_s"] else 0
+        flag = "REGRESSION" if change > tolerance else "ok"
+        ok &= change <= tolerance
+        print(f"   conc {lvl['concurrency']}: p95 {ref['p95_s']:.3f}s -> {lvl['p95_s']:.3f}s ({change:+.1%}) {flag}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="AI chips")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per concurrency level")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies (1.0 = production-like)")
+    parser.add_argument("--latencies", help="Alternative latency profile (JSON, same shape as fixtures/latencies.json)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare p95 against a previous --json output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 regression vs. baseline")
+    parser.add_argument("--verbose", action="store_true", help="Keep node prints and telemetry logs")
+    parser.add_argument("--model-policy", help="Routing policy JSON, as in TRENDFLOW_MODEL_POLICY (see model_router.py)")
+    parser.add_argument("--speculative-seo", action="store_true", help="Run SEO alongside the Editor (TRENDFLOW_SPECULATIVE_SEO)")
+    args = parser.parse_args(argv)
+
+    latencies = None
+    if args.latencies:
+        with open(args.latencies, encoding="utf-8") as f:
+            latencies = json.load(f)
+    if not args.verbose:
+        telemetry_logger.setLevel(logging.WARNING)
+
+    levels = []
+    with replay_environment(scale=args.scale, latencies=latencies, seed=args.seed) as agents:
+        agents.SPECULATIVE_SEO = args.speculative_seo
+        if args.model_policy:
+            os.environ["TRENDFLOW_MODEL_POLICY"] = args.model_policy
+            agents.model_router.policy = agents.model_router.load_policy()
+        for conc in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+            quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with quiet:
+                levels.append(bench_level(agents.app_graph, args.topic, conc, max(args.runs, conc)))
+
+    print_report(levels)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "levels": levels}, f, indent=2)
+    if args.baseline:
+        print("\n=== Baseline comparison ===")
+        if not compare_to_baseline(levels, args.baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Query benchmark for migration_post_stats.sql at dashboard scale.
+
+Builds `--posts` posts spread over `--users` users twice in SQLite: once as
+schema.sql leaves them (no index, no statistics), once with the migration's
+composite and partial indexes and its trigger-maintained post_stats table
+(translated to SQLite; the query plans it compares, a scan vs. an index range
+vs. a primary-key lookup, are the same in Postgres). Then times, for random
+users:
+
+- list: GET /posts (user's posts, newest first);
+- review: the needs_review queue;
+- stats: counts by status, average viral score and last publish time, by
+  aggregating the user's posts vs. reading their post_stats row (and, for
+  reference, aggregating over the indexed posts);
+- writes: inserting and publishing posts, to show what the triggers cost.
+
+Finally applies random inserts, status changes and deletes and checks that
+post_stats still matches a full recount.
+
+    python -m backend.benchmarks.post_stats_bench
+    python -m backend.benchmarks.post_stats_bench --posts 500000 --users 2000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+import uuid
+
+try:
+    from backend.benchmarks.pipeline_bench import percentile
+except ImportError:
+    from benchmarks.pipeline_bench import percentile
+
+STATUSES = ("draft", "needs_review", "approved", "published")
+
+SCHEMA = """
+CREATE TABLE posts (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    title TEXT NOT NULL,
+    content_markdown TEXT,
+    status TEXT DEFAULT 'draft',
+    viral_score INTEGER,
+    created_at TEXT NOT NULL,
+    published_at TEXT
+);
+"""
+
+MIGRATION = """
+CREATE INDEX posts_user_created_idx ON posts (user_id, created_at DESC);
+CREATE INDEX posts_user_needs_review_idx ON posts (user_id, created_at DESC) WHERE status = 'needs_review';
+CREATE INDEX posts_user_published_idx ON posts (user_id, published_at DESC) WHERE status = 'published';
+
+CREATE TABLE post_stats (
+    user_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    drafts INTEGER NOT NULL DEFAULT 0,
+    needs_review INTEGER NOT NULL DEFAULT 0,
+    approved INTEGER NOT NULL DEFAULT 0,
+    published INTEGER NOT NULL DEFAULT 0,
+    viral_score_sum INTEGER NOT NULL DEFAULT 0,
+    viral_score_count INTEGER NOT NULL DEFAULT 0,
+    last_published_at TEXT
+);
+
+CREATE TRIGGER post_stats_insert AFTER INSERT ON posts WHEN new.user_id IS NOT NULL BEGIN
+    INSERT INTO post_stats (user_id) VALUES (new.user_id) ON CONFLICT DO NOTHING;
+    UPDATE post_stats SET
+        total = total + 1,
+        drafts = drafts + (new.status = 'draft'),
+        needs_review = needs_review + (new.status = 'needs_review'),
+        approved = approved + (new.status = 'approved'),
+        published = published + (new.status = 'published'),
+        viral_score_sum = viral_score_sum + coalesce(new.viral_score, 0),
+        viral_score_count = viral_score_count + (new.viral_score IS NOT NULL),
+        last_published_at = CASE WHEN new.status = 'published'
+            THEN max(coalesce(last_published_at, ''), new.published_at) ELSE last_published_at END
+    WHERE user_id = new.user_id;
+END;
+
+CREATE TRIGGER post_stats_delete AFTER DELETE ON posts WHEN old.user_id IS NOT NULL BEGIN
+    UPDATE post_stats SET
+        total = total - 1,
+        drafts = drafts - (old.status = 'draft'),
+        needs_review = needs_review - (old.status = 'needs_review'),
+        approved = approved - (old.status = 'approved'),
+        published = published - (old.status = 'published'),
+        viral_score_sum = viral_score_sum - coalesce(old.viral_score, 0),
+        viral_score_count = viral_score_count - (old.viral_score IS NOT NULL),
+        last_published_at = CASE WHEN old.status = 'published'
+            THEN (SELECT max(published_at) FROM posts WHERE user_id = old.user_id AND status = 'published')
+            ELSE last_published_at END
+    WHERE user_id = old.user_id;
+END;
+
+CREATE TRIGGER post_stats_update AFTER UPDATE OF status, viral_score, published_at ON posts
+WHEN new.user_id IS NOT NULL AND new.user_id = old.user_id BEGIN
+    UPDATE post_stats SET
+        drafts = drafts - (old.status = 'draft') + (new.status = 'draft'),
+        needs_review = needs_review - (old.status = 'needs_review') + (new.status = 'needs_review'),
+        approved = approved - (old.status = 'approved') + (new.status = 'approved'),
+        published = published - (old.status = 'published') + (new.status = 'published'),
+        viral_score_sum = viral_score_sum - coalesce(old.viral_score, 0) + coalesce(new.viral_score, 0),
+        viral_score_count = viral_score_count - (old.viral_score IS NOT NULL) + (new.viral_score IS NOT NULL),
+        last_published_at = CASE WHEN old.status = 'published'
+            THEN (SELECT max(published_at) FROM posts WHERE user_id = new.user_id AND status = 'published')
+            WHEN new.status = 'published' THEN max(coalesce(last_published_at, ''), new.published_at)
+            ELSE last_published_at END
+    WHERE user_id = new.user_id;
+END;
+"""
+
+QUERIES = {
+    "list": "SELECT * FROM posts WHERE user_id = ? ORDER BY created_at DESC LIMIT 50",
+    "review": "SELECT * FROM posts WHERE user_id = ? AND status = 'needs_review' ORDER BY created_at DESC LIMIT 50",
+}
+STATS_BY_SCAN = ("SELECT count(*), sum(status = 'draft'), sum(status = 'needs_review'), sum(status = 'approved'), "
+                 "sum(status = 'published'), sum(viral_score), count(viral_score), "
+                 "max(CASE WHEN status = 'published' THEN published_at END) FROM posts WHERE user_id = ?")
+STATS_BY_ROW = ("SELECT total, drafts, needs_review, approved, published, viral_score_sum, viral_score_count, "
+                "last_published_at FROM post_stats WHERE user_id = ?")
+
+
+def make_post(rng: random.Random, user_id: str, n: int, body: str) -> tuple:
+    status = rng.choices(STATUSES, weights=(1, 4, 1, 4))[0]
+    created = f"2025-{1 + n % 12:02d}-{1 + n % 28:02d}T{n % 24:02d}:{n % 60:02d}:{rng.randrange(60):02d}+00:00"
+    return (str(uuid.uuid4()), user_id, f"Post {n}", body, status, rng.randrange(40, 100),
+            created, created if status == "published" else None)
+
+
+def build(path: str, posts: int, users: list, body: str, migrated: bool, seed: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    if migrated:
+        conn.executescript(MIGRATION)
+    rng = random.Random(seed)
+    with conn:
+        conn.executemany("INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (make_post(rng, rng.choice(users), n, body) for n in range(posts)))
+    conn.execute("ANALYZE")
+    return conn
+
+
+def timed(conn: sqlite3.Connection, sql: str, users: list, runs: int) -> dict:
+    times = []
+    for user in users[:runs]:
+        start = time.perf_counter()
+        conn.execute(sql, (user,)).fetchall()
+        times.append(time.perf_counter() - start)
+    plan = " / ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (users[0],)))
+    return {"p50_ms": round(percentile(times, 50) * 1000, 3), "p95_ms": round(percentile(times, 95) * 1000, 3),
+            "plan": plan}
+
+
+def timed_writes(conn: sqlite3.Connection, users: list, n: int, body: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    rows = [make_post(rng, rng.choice(users), 10_000_000 + i, body) for i in range(n)]
+    start = time.perf_counter()
+    for row in rows:
+        with conn:
+            conn.execute("INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+    insert_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for row in rows:
+        with conn:
+            conn.execute("UPDATE posts SET status = 'published', published_at = ? WHERE id = ?",
+                         ("2026-01-01T00:00:00+00:00", row[0]))
+    publish_s = time.perf_counter() - start
+    return {"insert_us": round(insert_s / n * 1e6, 1), "publish_us": round(publish_s / n * 1e6, 1)}
+
+
+def check_consistency(conn: sqlite3.Connection, users: list, changes: int, body: str, seed: int) -> int:
+    """Random inserts, status/score changes and deletes; returns users whose post_stats row disagrees with a recount."""
+    rng = random.Random(seed)
+    ids = [r[0] for r in conn.execute("SELECT id FROM posts ORDER BY random() LIMIT ?", (changes,))]
+    with conn:
+        for i, post_id in enumerate(ids):
+            op = i % 3
+            if op == 0:
+                conn.execute("INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             make_post(rng, rng.choice(users), 20_000_000 + i, body))
+            elif op == 1:
+                status = rng.choice(STATUSES)
+                conn.execute("UPDATE posts SET status = ?, viral_score = ?, published_at = ? WHERE id = ?",
+                             (status, rng.randrange(40, 100),
+                              f"2026-02-{1 + i % 28:02d}T00:00:00+00:00" if status == "published" else None, post_id))
+            else:
+                conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+    wrong = 0
+    for user in users:
+        recount = conn.execute(STATS_BY_SCAN, (user,)).fetchone()
+        row = conn.execute(STATS_BY_ROW, (user,)).fetchone()
+        recount = tuple(v or 0 for v in recount[:7]) + (recount[7],)
+        row = tuple(row[:7]) + (row[7] or None,) if row else (0,) * 7 + (None,)
+        wrong += recount != row
+    return wrong
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--body-bytes", type=int, default=2000, help="content_markdown size, for realistic row width")
+    parser.add_argument("--runs", type=int, default=200, help="Users queried per measurement")
+    parser.add_argument("--writes", type=int, default=2000, help="Posts inserted then published for the write cost")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    users = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(args.users)]
+    body = "x" * args.body_bytes
+    probe = rng.sample(users, min(args.runs, len(users)))
+    results = {}
+    for name, migrated in (("baseline", False), ("migrated", True)):
+        start = time.perf_counter()
+        conn = build(":memory:", args.posts, users, body, migrated, args.seed)
+        build_s = time.perf_counter() - start
+        r = {name_: timed(conn, sql, probe, args.runs) for name_, sql in QUERIES.items()}
+        r["stats"] = timed(conn, STATS_BY_ROW if migrated else STATS_BY_SCAN, probe, args.runs)
+        if migrated:
+            # What the indexes alone give the aggregate, without post_stats
+            r["stats_aggregate"] = timed(conn, STATS_BY_SCAN, probe, args.runs)
+        r["writes"] = timed_writes(conn, users, args.writes, body, args.seed + 1)
+        r["build_s"] = round(build_s, 2)
+        if migrated:
+            r["inconsistent_users"] = check_consistency(conn, users, 3000, body, args.seed + 2)
+        results[name] = r
+        conn.close()
+
+    print(f"\n{args.posts:,} posts, {args.users} users (~{args.posts // args.users} posts each)")
+    print(f"{'query':<8} {'baseline p50':>13} {'p95':>9} {'migrated p50':>13} {'p95':>9} {'speedup':>8}")
+    for q in ("list", "review", "stats"):
+        b, m = results["baseline"][q], results["migrated"][q]
+        print(f"{q:<8} {b['p50_ms']:>11.3f}ms {b['p95_ms']:>7.3f}ms {m['p50_ms']:>11.3f}ms {m['p95_ms']:>7.3f}ms "
+              f"{b['p50_ms'] / max(m['p50_ms'], 1e-6):>7.0f}x")
+    agg = results["migrated"]["stats_aggregate"]
+    print(f"(stats aggregated over the indexed posts instead of post_stats: p50 {agg['p50_ms']:.3f}ms, p95 {agg['p95_ms']:.3f}ms)")
+    for q in ("list", "review", "stats"):
+        print(f"  plan {q:<7} baseline: {results['baseline'][q]['plan']}")
+        print(f"  {'':<12} migrated: {results['migrated'][q]['plan']}")
+    bw, mw = results["baseline"]["writes"], results["migrated"]["writes"]
+    print(f"\nper write: insert {bw['insert_us']} -> {mw['insert_us']} us, publish {bw['publish_us']} -> {mw['publish_us']} us")
+    print(f"post_stats rows disagreeing with a recount after 3000 random changes: {results['migrated']['inconsistent_users']}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
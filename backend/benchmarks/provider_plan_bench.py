@@ -0,0 +1,172 @@
+"""
+Adaptive provider selection benchmark (backend/provider_stats.py).
+
+Runs the research aggregator (agents.collect_articles) over a rotation of
+finance, tech, science and policy topics against recorded provider payloads.
+Each provider answers a given category with its recorded articles only some
+of the time, following a yield profile modelled on production: MarketAux
+covers finance, NYT only Technology/Business, NewsData rarely matches.
+Otherwise it answers with an empty result.
+Compares querying every provider (TRENDFLOW_ADAPTIVE_PROVIDERS=0) with the
+planner, after a warm-up that gives it statistics. Reports per research run:
+p50/p95 latency, provider calls (API quota), articles collected and runs
+left with fewer than 4 articles. Fully offline.
+
+    python -m backend.benchmarks.provider_plan_bench --runs 200
+    python -m backend.benchmarks.provider_plan_bench --scale 0.2 --json providers.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import time
+from urllib.parse import urlparse
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend import provider_stats
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import (PROVIDER_HOSTS, ReplayRequests, load_fixture, make_gnews_class,
+                                           replay_environment)
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    import provider_stats
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import PROVIDER_HOSTS, ReplayRequests, load_fixture, make_gnews_class, replay_environment
+    from telemetry import logger as telemetry_logger, trace_run
+
+TOPICS = {
+    "finance": ["Nvidia Q3 earnings", "Stripe IPO valuation", "Bitcoin ETF inflows", "Fed rate decision markets"],
+    "tech": ["AI chips", "OpenAI GPT-5 launch", "Rust in the Linux kernel", "Apple iPhone sales"],
+    "science": ["NASA Mars rocket", "fusion energy research", "solid-state battery study"],
+    "policy": ["EU AI Act compliance", "antitrust court ruling", "chip export tariff"],
+}
+
+# Probability that a provider has anything for a topic in the category
+YIELD = {
+    "gnews": {"finance": 0.9, "tech": 0.9, "science": 0.8, "policy": 0.8},
+    "marketaux": {"finance": 0.9, "tech": 0.3, "science": 0.05, "policy": 0.1},
+    "nyt": {"finance": 0.7, "tech": 0.7, "science": 0.05, "policy": 0.05},
+    "newsdata": {"finance": 0.15, "tech": 0.15, "science": 0.1, "policy": 0.1},
+    "guardian": {"finance": 0.6, "tech": 0.7, "science": 0.8, "policy": 0.9},
+    "google_news": {"finance": 0.8, "tech": 0.8, "science": 0.7, "policy": 0.7},
+}
+
+EMPTY = {
+    "gnews": {"status": 200, "json": {"articles": []}},
+    "marketaux": {"status": 200, "json": {"data": []}},
+    "nyt": {"status": 200, "json": {"response": {"docs": []}}},
+    "newsdata": {"status": 200, "json": {"results": []}},
+    "guardian": {"status": 200, "json": {"response": {"results": []}}},
+    "google_news": [],
+}
+
+
+class CategoryYield:
+    """Decides, per call, whether a provider has results for the current topic's category."""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.category = "tech"
+
+    def hit(self, provider: str) -> bool:
+        return self.rng.random() < YIELD[provider][self.category]
+
+
+def yield_requests(providers: dict, latency, yields: CategoryYield):
+    full, empty = ReplayRequests(providers, latency), ReplayRequests({**providers, **EMPTY}, latency)
+
+    class YieldRequests:
+        def get(self, url, params=None, **kwargs):
+            name = PROVIDER_HOSTS.get(urlparse(url).hostname or "")
+            source = full if name is None or yields.hit(name) else empty
+            return source.get(url, params=params, **kwargs)
+
+        def post(self, url, json=None, **kwargs):
+            return full.post(url, json=json, **kwargs)
+    return YieldRequests()
+
+
+def yield_gnews(providers: dict, latency, yields: CategoryYield):
+    full = make_gnews_class(providers, latency)
+    empty = make_gnews_class({**providers, "google_news": []}, latency)
+
+    def factory(*args, **kwargs):
+        return (full if yields.hit("google_news") else empty)(*args, **kwargs)
+    return factory
+
+
+def bench_mode(agents, adaptive: bool, runs: int, warmup: int, seed: int, scale: float) -> dict:
+    providers = load_fixture("providers.json")
+    yields = CategoryYield(seed)
+    latency = agents.requests.latency
+    agents.requests = yield_requests(providers, latency, yields)
+    agents.GNews = yield_gnews(providers, latency, yields)
+    stats = provider_stats.ProviderStats()
+    saved = (provider_stats.ADAPTIVE_PROVIDERS, provider_stats.provider_stats, agents.provider_stats)
+    provider_stats.ADAPTIVE_PROVIDERS = adaptive
+    provider_stats.provider_stats = agents.provider_stats = stats
+
+    rotation = [(category, topic) for category, topics in TOPICS.items() for topic in topics]
+    elapsed, calls, articles = [], [], []
+    try:
+        for i in range(warmup + runs):
+            yields.category, topic = rotation[i % len(rotation)]
+            start = time.perf_counter()
+            with trace_run() as run:
+                found = agents.collect_articles(topic)
+            if i < warmup:
+                continue
+            elapsed.append(time.perf_counter() - start)
+            calls.append(sum(s["calls"] for name, s in run.summary()["providers"].items() if name != "feed_store"))
+            articles.append(len(found))
+    finally:
+        provider_stats.ADAPTIVE_PROVIDERS, provider_stats.provider_stats, agents.provider_stats = saved
+    return {
+        "runs": runs,
+        "p50_s": round(percentile(elapsed, 50) / scale, 3),
+        "p95_s": round(percentile(elapsed, 95) / scale, 3),
+        "provider_calls": round(sum(calls) / runs, 2),
+        "articles": round(sum(articles) / runs, 2),
+        "thin_runs": round(sum(1 for a in articles if a < 4) / runs, 4),
+        "stats": stats.stats() if adaptive else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200, help="Measured research runs per mode")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="Unmeasured runs first (default: enough for MIN_SAMPLES per category)")
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies (1.0 = production-like); times are reported unscaled")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+    warmup = args.warmup if args.warmup is not None else provider_stats.MIN_SAMPLES * max(map(len, TOPICS.values())) * len(TOPICS)
+
+    telemetry_logger.setLevel(logging.WARNING)
+    results = {}
+    for name, adaptive in (("every provider", False), ("planned", True)):
+        with replay_environment(scale=args.scale, seed=args.seed) as agents, contextlib.redirect_stdout(io.StringIO()):
+            results[name] = bench_mode(agents, adaptive, args.runs, warmup, args.seed, args.scale)
+
+    print(f"\n{'mode':<16} {'p50 (s)':>8} {'p95 (s)':>8} {'API calls':>10} {'articles':>9} {'< 4 articles':>13}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['p50_s']:>8.2f} {r['p95_s']:>8.2f} {r['provider_calls']:>10.2f} {r['articles']:>9.2f} "
+              f"{r['thin_runs']:>13.1%}")
+    print("\nPlanner statistics (survivors per call / latency):")
+    for category, rows in results["planned"]["stats"].items():
+        print(f"   {category:<8} " + ", ".join(f"{p} {s['survivors']:.1f}/{s['latency_s']:.2f}s" for p, s in rows.items()))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
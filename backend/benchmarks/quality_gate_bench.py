@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for the local quality gate (backend/quality_gate.py).
+
+Compares the old per-word `phrase in draft.lower()` loop with the word-level
+Aho-Corasick matcher across banned-phrase list sizes and draft lengths, and
+times the full `assess()` pass. Drafts are built from the recorded fixture
+drafts, so the text looks like real model output.
+
+    python -m backend.benchmarks.quality_gate_bench
+    python -m backend.benchmarks.quality_gate_bench --phrases 10,1000,20000 --words 2000,50000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+try:
+    from backend.quality_gate import BANNED_PHRASES, PhraseMatcher, assess, tokenize
+except ImportError:
+    from quality_gate import BANNED_PHRASES, PhraseMatcher, assess, tokenize
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def make_phrases(n: int, rng: random.Random):
+    """The real banned list padded with deterministic 1-3 word pseudo-phrases."""
+    syllables = ["ka", "lo", "mi", "ner", "tra", "vo", "qui", "zen", "ph", "ul", "sy", "dr"]
+    phrases = list(BANNED_PHRASES)
+    while len(phrases) < n:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(rng.randint(1, 3))]
+        phrases.append(" ".join(words))
+    return phrases[:n]
+
+
+def make_draft(words: int) -> str:
+    with open(FIXTURES / "llm.json", encoding="utf-8") as f:
+        samples = [entry["content"] for entry in json.load(f)["text"]]
+    text, count = [], 0
+    while count < words:
+        for sample in samples:
+            text.append(sample)
+            count += len(sample.split())
+    return "\n\n".join(text)
+
+
+def naive(phrases, draft: str):
+    lowered = draft.lower()
+    return [p for p in phrases if p in lowered]
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phrases", default="7,100,1000,10000", help="Banned-list sizes")
+    parser.add_argument("--words", default="1500,15000,150000", help="Draft lengths in words")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = []
+    print(f"{'phrases':>8} {'words':>8} {'build ms':>9} {'naive ms':>9} {'ac ms':>8} {'assess ms':>10} {'speedup':>8}")
+    for n_phrases in [int(n) for n in args.phrases.split(",")]:
+        phrases = make_phrases(n_phrases, rng)
+        start = time.perf_counter()
+        matcher = PhraseMatcher(phrases)
+        build = time.perf_counter() - start
+        for n_words in [int(n) for n in args.words.split(",")]:
+            draft = make_draft(n_words)
+            naive_s = timed(lambda: naive(phrases, draft), args.repeat)
+            ac_s = timed(lambda: matcher.count(tokenize(draft)), args.repeat)
+            assess_s = timed(lambda: assess(draft, matcher), args.repeat)
+            row = {
+                "phrases": n_phrases, "words": n_words, "build_ms": round(build * 1000, 2),
+                "naive_ms": round(naive_s * 1000, 2), "aho_corasick_ms": round(ac_s * 1000, 2),
+                "assess_ms": round(assess_s * 1000, 2), "speedup": round(naive_s / ac_s, 2) if ac_s else 0.0,
+            }
+            results.append(row)
+            print(f"{n_phrases:>8} {n_words:>8} {row['build_ms']:>9.2f} {row['naive_ms']:>9.2f} "
+                  f"{row['aho_corasick_ms']:>8.2f} {row['assess_ms']:>10.2f} {row['speedup']:>7.2f}x")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
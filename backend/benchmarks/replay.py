@@ -0,0 +1,274 @@
+"""
+Offline stand-ins for Gemini and the news providers.
+
+Recorded payloads live in benchmarks/fixtures/. Every stand-in sleeps for a
+configurable artificial latency so the real StateGraph can be timed end to end
+on a laptop without network access or API quota.
+"""
+import copy
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+# Replayed runs keep their state blobs (blob_store.py) and provider statistics in memory,
+# not in the user's data dir
+os.environ.setdefault("TRENDFLOW_BLOB_DB", ":memory:")
+os.environ.setdefault("TRENDFLOW_PROVIDER_STATS_DB", ":memory:")
+
+try:
+    from backend.llm_scheduler import governed
+except ImportError:
+    from llm_scheduler import governed
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Hosts used by fetch_tech_news -> key in providers.json
+PROVIDER_HOSTS = {
+    "gnews.io": "gnews",
+    "api.marketaux.com": "marketaux",
+    "api.nytimes.com": "nyt",
+    "newsdata.io": "newsdata",
+    "content.guardianapis.com": "guardian",
+}
+
+# Env vars that switch providers on inside fetch_tech_news
+PROVIDER_ENV = ["GNEWS_API_KEY", "MARKETAUX_API_KEY", "NYT_API_KEY", "NEWSDATA_API_KEY", "GUARDIAN_API_KEY"]
+
+
+def load_fixture(name: str, fixtures_dir: Path = FIXTURES_DIR) -> Any:
+    with open(Path(fixtures_dir) / name, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class LatencyModel:
+    """Turns the latencies.json profile into sleep durations."""
+
+    def __init__(self, profile: dict, scale: float = 1.0, seed: Optional[int] = None):
+        self.profile = profile
+        self.scale = scale
+        self.jitter = profile.get("jitter", 0.0)
+        self._rng = random.Random(seed)
+
+    def _jittered(self, seconds: float) -> float:
+        if self.jitter:
+            seconds *= 1 + self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, seconds * self.scale)
+
+    def provider(self, name: str) -> float:
+        return self._jittered(self.profile.get("providers", {}).get(name, 0.0))
+
+    def llm(self, model: str, output_tokens: int) -> float:
+        cfg = self.profile.get("llm", {}).get(model, {})
+        return self._jittered(cfg.get("base_s", 0.0) + output_tokens * cfg.get("per_output_token_s", 0.0))
+
+    def llm_first_token(self, model: str) -> float:
+        return self._jittered(self.profile.get("llm", {}).get(model, {}).get("base_s", 0.0))
+
+    def llm_per_token(self, model: str) -> float:
+        return self._jittered(self.profile.get("llm", {}).get(model, {}).get("per_output_token_s", 0.0))
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that answers from llm.json instead of calling Gemini.
+
+    Free-text calls are matched on a marker substring of the prompt; structured
+    calls are matched by schema name (and optionally a marker). Because this is
+    a real BaseChatModel, callbacks (telemetry, LangGraph streaming) fire as
+    they would for ChatGoogleGenerativeAI.
+    """
+
+    model: str
+    responses: Dict[str, Any]
+    latency: Any = None
+    timeout: Optional[float] = None   # like ChatGoogleGenerativeAI's; a call may also pass one
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @staticmethod
+    def _prompt_text(messages: List[BaseMessage]) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    def _pick(self, prompt: str, schema_name: Optional[str]) -> str:
+        if schema_name:
+            entries = self.responses["structured"].get(schema_name, [])
+            for entry in entries:
+                if "match" not in entry or entry["match"] in prompt:
+                    return json.dumps(entry["data"])
+            raise KeyError(f"No recorded structured response for {schema_name}")
+        for entry in self.responses["text"]:
+            if entry["match"] in prompt:
+                return entry["content"]
+        raise KeyError(f"No recorded response matches prompt: {prompt[:80]!r}")
+
+    def _message(self, content: str, prompt: str) -> AIMessage:
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(content)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        })
+
+    def _wait(self, seconds: float, started: float, timeout: Optional[float]):
+        """Sleeps like the recorded call; raises as a timed-out request would once past `timeout`."""
+        if timeout is not None and time.perf_counter() + seconds - started > timeout:
+            time.sleep(max(0.0, started + timeout - time.perf_counter()))
+            raise TimeoutError(f"{self.model} call timed out after {timeout:.2f}s")
+        time.sleep(seconds)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        started = time.perf_counter()
+        prompt = self._prompt_text(messages)
+        content = self._pick(prompt, kwargs.get("replay_schema"))
+        if self.latency is not None:
+            self._wait(self.latency.llm(self.model, _estimate_tokens(content)), started,
+                       kwargs.get("timeout", self.timeout))
+        return ChatResult(generations=[ChatGeneration(message=self._message(content, prompt))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        started = time.perf_counter()
+        timeout = kwargs.get("timeout", self.timeout)
+        prompt = self._prompt_text(messages)
+        content = self._pick(prompt, kwargs.get("replay_schema"))
+        if self.latency is not None:
+            self._wait(self.latency.llm_first_token(self.model), started, timeout)
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == len(words) - 1 else word + " "
+            if self.latency is not None:
+                self._wait(self.latency.llm_per_token(self.model) * _estimate_tokens(piece), started, timeout)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        # Final empty chunk carries usage, as Gemini does
+        input_tokens, output_tokens = _estimate_tokens(prompt), _estimate_tokens(content)
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }))
+
+    def with_structured_output(self, schema, **kwargs):
+        return self.bind(replay_schema=schema.__name__) | RunnableLambda(
+            lambda msg: schema.model_validate_json(msg.content)
+        )
+
+
+# --- PROVIDER STAND-INS ---
+class ReplayResponse:
+    def __init__(self, status_code: int, payload: Any):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return copy.deepcopy(self._payload)
+
+
+class ReplayRequests:
+    """Drop-in for the `requests` module as used by fetch_tech_news."""
+
+    def __init__(self, providers: dict, latency: Optional[LatencyModel] = None):
+        self.providers = providers
+        self.latency = latency
+
+    def get(self, url, params=None, **kwargs):
+        name = PROVIDER_HOSTS.get(urlparse(url).hostname or "")
+        if name is None or name not in self.providers:
+            return ReplayResponse(404, {"error": f"no recording for {url}"})
+        if self.latency is not None:
+            time.sleep(self.latency.provider(name))
+        recorded = self.providers[name]
+        return ReplayResponse(recorded.get("status", 200), recorded["json"])
+
+    def post(self, url, json=None, **kwargs):
+        return ReplayResponse(201, {"url": "https://dev.to/replay/article"})
+
+
+def make_gnews_class(providers: dict, latency: Optional[LatencyModel] = None):
+    class ReplayGNews:
+        def __init__(self, max_results=10, period=None, **kwargs):
+            self.max_results = max_results
+
+        def get_news(self, topic):
+            if latency is not None:
+                time.sleep(latency.provider("google_news"))
+            return copy.deepcopy(providers.get("google_news", [])[: self.max_results])
+    return ReplayGNews
+
+
+def make_ddgs_class(providers: dict, latency: Optional[LatencyModel] = None):
+    class ReplayDDGS:
+        def __init__(self, timeout=None, **kwargs):
+            self.timeout = timeout
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, keywords=None, max_results=3, **kwargs):
+            if latency is not None:
+                time.sleep(latency.provider("duckduckgo"))
+            return copy.deepcopy(providers.get("duckduckgo", [])[:max_results])
+    return ReplayDDGS
+
+
+@contextmanager
+def replay_environment(scale: float = 1.0, latencies: Optional[dict] = None,
+                       fixtures_dir: Path = FIXTURES_DIR, seed: Optional[int] = None, feed_store=None):
+    """Patches backend.agents so app_graph runs entirely against recordings.
+    Research reads `feed_store` (a feeds.FeedStore) first if given, else no local entries."""
+    try:
+        from backend import agents
+    except ImportError:
+        import agents
+
+    providers = load_fixture("providers.json", fixtures_dir)
+    responses = load_fixture("llm.json", fixtures_dir)
+    latency = LatencyModel(latencies or load_fixture("latencies.json", fixtures_dir), scale, seed)
+
+    # Same LLM scheduler as the real clients, so queueing shows up in the numbers
+    replay_cls = governed(ReplayChatModel)
+    patches = {
+        "llm_fast": replay_cls(model="gemini-2.5-flash", responses=responses,
+                               latency=latency, callbacks=agents.llm_fast.callbacks),
+        "llm_creative": replay_cls(model="gemini-2.5-pro", responses=responses,
+                                   latency=latency, callbacks=agents.llm_creative.callbacks),
+        "requests": ReplayRequests(providers, latency),
+        "GNews": make_gnews_class(providers, latency),
+        "DDGS": make_ddgs_class(providers, latency),
+        "local_articles": (lambda topic, limit: feed_store.search(topic, limit)) if feed_store else (lambda topic, limit: []),
+    }
+    saved_attrs = {name: getattr(agents, name) for name in patches}
+    saved_env = {key: os.environ.get(key) for key in PROVIDER_ENV + ["DEVTO_API_KEY"]}
+    try:
+        for name, value in patches.items():
+            setattr(agents, name, value)
+        for key in PROVIDER_ENV:
+            os.environ[key] = "replay"
+        os.environ.pop("DEVTO_API_KEY", None)  # publisher must never leave the sandbox
+        yield agents
+    finally:
+        for name, value in saved_attrs.items():
+            setattr(agents, name, value)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
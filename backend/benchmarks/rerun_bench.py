@@ -0,0 +1,103 @@
+"""
+Single-stage re-run benchmark (POST /posts/{id}/rerun/{stage}).
+
+Refreshing a saved post's metadata or critique used to mean generating the
+post again. This runs the full app_graph once per run against recordings,
+then re-runs the SEO and Editor stages on the draft it produced, and reports
+p50/p95 wall time, LLM calls and tokens for each. Fully offline.
+
+    python -m backend.benchmarks.rerun_bench --runs 10
+    python -m backend.benchmarks.rerun_bench --scale 1.0 --json rerun.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import replay_environment
+    from backend.blob_store import resolve_state
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import replay_environment
+    from blob_store import resolve_state
+    from telemetry import logger as telemetry_logger, trace_run
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with trace_run() as run:
+        result = fn(*args)
+    llm = run.summary()["llm"].values()
+    return result, {
+        "elapsed_s": time.perf_counter() - start,
+        "llm_calls": sum(s["calls"] for s in llm),
+        "tokens": sum(s["input_tokens"] + s["output_tokens"] for s in llm),
+    }
+
+
+def aggregate(samples: list) -> dict:
+    elapsed = [s["elapsed_s"] for s in samples]
+    return {
+        "runs": len(samples),
+        "p50_s": round(percentile(elapsed, 50), 4),
+        "p95_s": round(percentile(elapsed, 95), 4),
+        "llm_calls": round(sum(s["llm_calls"] for s in samples) / len(samples), 2),
+        "tokens": round(sum(s["tokens"] for s in samples) / len(samples)),
+    }
+
+
+def bench(agents, topic: str, runs: int) -> dict:
+    samples = {"full pipeline": [], "rerun seo": [], "rerun editor": []}
+    for _ in range(runs):
+        state, full = timed(agents.app_graph.invoke, {"topic": topic, "revision_count": 0, "is_approved": False})
+        state = resolve_state(state)
+        samples["full pipeline"].append(full)
+        _, seo = timed(agents.package_for_distribution, state["draft"])
+        samples["rerun seo"].append(seo)
+        _, editor = timed(agents.critique_draft, state["draft"], state["topic"])
+        samples["rerun editor"].append(editor)
+    return {name: aggregate(s) for name, s in samples.items()}
+
+
+def print_report(results: dict):
+    full = results["full pipeline"]
+    print(f"\n{'stage':<14} {'p50 (s)':>9} {'p95 (s)':>9} {'speedup':>8} {'LLM calls':>10} {'tokens':>8}")
+    for name, r in results.items():
+        speedup = full["p50_s"] / r["p50_s"] if r["p50_s"] else 0.0
+        print(f"{name:<14} {r['p50_s']:>9.3f} {r['p95_s']:>9.3f} {speedup:>7.1f}x {r['llm_calls']:>10.1f} {r['tokens']:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="AI chips")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies (1.0 = production-like)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Keep node prints and telemetry logs")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        telemetry_logger.setLevel(logging.WARNING)
+    with replay_environment(scale=args.scale, seed=args.seed) as agents:
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            results = bench(agents, args.topic, args.runs)
+
+    print_report(results)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
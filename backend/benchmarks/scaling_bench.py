@@ -0,0 +1,112 @@
+"""
+Throughput scaling benchmark for multi-worker serving (backend/serve.py).
+
+Starts the mock platform server once, then the stand-in app (standin_app.py)
+with 1, 2, ... `--workers` worker processes sharing one SQLite cache file,
+as `python -m backend.serve --workers N` would. Each endpoint is driven at
+`--concurrency` for `--requests` requests per worker count. Reports
+requests/s, speedup over one worker, p95 latency, and how many calls reached
+the platform stand-ins: with the shared cache that number should not grow
+with the worker count.
+
+Speedup is bounded by the cores available (printed first): on a single core
+more workers only add contention.
+
+    python -m backend.benchmarks.scaling_bench
+    python -m backend.benchmarks.scaling_bench --workers 1,2,4,8 --endpoints posts,auth --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+import httpx
+
+try:
+    from backend.benchmarks.load_test import _spawn, _wait_ready, run_level
+except ImportError:
+    from benchmarks.load_test import _spawn, _wait_ready, run_level
+
+
+async def measure(args, workers: int, mock_url: str, env: dict) -> list:
+    with tempfile.TemporaryDirectory() as data_dir:
+        # One cache file for all the workers of this run, empty at the start of it
+        env = {**env, "TRENDFLOW_DATA_DIR": data_dir, "TRENDFLOW_CACHE_DB": os.path.join(data_dir, "cache.sqlite3")}
+        server = _spawn(args.app, args.port, env, workers=workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+        results = []
+        try:
+            await _wait_ready(f"{base_url}/__bench/loop-lag", server)
+            # Let every worker finish starting up and prewarming before timing anything
+            await asyncio.sleep(args.settle)
+            async with httpx.AsyncClient(base_url=mock_url) as mock:
+                for endpoint in args.endpoints.split(","):
+                    await mock.get("/__calls", params={"reset": True})
+                    result = await run_level(base_url, endpoint, args.concurrency, args.requests)
+                    result["workers"] = workers
+                    result["upstream_calls"] = sum((await mock.get("/__calls")).json().values())
+                    results.append(result)
+                    print(f"   {workers} worker(s), {endpoint}: {result['rps']} req/s, p95 {result['p95_ms']} ms")
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+    return results
+
+
+async def main_async(args) -> list:
+    env = {
+        "MOCK_LATENCY_S": str(args.mock_latency),
+        "MOCK_BASE_URL": f"http://127.0.0.1:{args.mock_port}",
+        "DB_LATENCY_S": str(args.db_latency),
+        "AUTH_LATENCY_S": str(args.auth_latency),
+    }
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+    mock = _spawn("backend.benchmarks.fakes:mock_platform_app", args.mock_port, env)
+    results = []
+    try:
+        await _wait_ready(f"{mock_url}/docs", mock)
+        for workers in [int(w) for w in args.workers.split(",")]:
+            results.extend(await measure(args, workers, mock_url, env))
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+    return results
+
+
+def print_report(results: list):
+    base = {r["endpoint"]: r["rps"] for r in results if r["workers"] == results[0]["workers"]}
+    print(f"\n{'endpoint':<10} {'workers':>7} {'req/s':>8} {'speedup':>8} {'p95 ms':>8} {'err':>4} {'upstream':>9}")
+    for r in sorted(results, key=lambda r: (r["endpoint"], r["workers"])):
+        speedup = r["rps"] / base[r["endpoint"]] if base.get(r["endpoint"]) else 0.0
+        print(f"{r['endpoint']:<10} {r['workers']:>7} {r['rps']:>8.1f} {speedup:>7.2f}x {r['p95_ms']:>8.1f} "
+              f"{r['errors']:>4} {r['upstream_calls']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to compare")
+    parser.add_argument("--endpoints", default="posts,news,analytics,auth")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=600, help="Requests per endpoint and worker count")
+    parser.add_argument("--db-latency", type=float, default=0.005, help="Supabase round trip (blocking), seconds")
+    parser.add_argument("--mock-latency", type=float, default=0.05, help="dev.to/Hashnode/news round trip, seconds")
+    parser.add_argument("--auth-latency", type=float, default=0.0, help="Google token verification (blocking), seconds")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds to wait after startup before measuring")
+    parser.add_argument("--app", default="backend.benchmarks.standin_app:app")
+    parser.add_argument("--port", type=int, default=8110)
+    parser.add_argument("--mock-port", type=int, default=8111)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPU core(s) available")
+    results = asyncio.run(main_async(args))
+    print_report(results)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "cores": os.cpu_count(), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
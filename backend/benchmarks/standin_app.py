@@ -0,0 +1,134 @@
+"""
+The real backend.main app wired to local stand-ins, for load tests.
+
+    MOCK_BASE_URL=http://127.0.0.1:8101 uvicorn backend.benchmarks.standin_app:app --port 8100
+
+Supabase is replaced by InMemorySupabase, Google token verification by a
+blocking fake, the Google News scraper and the agent graph by the replay
+stand-ins, and dev.to / Hashnode / GNews / NewsData by the mock platform
+server. An event-loop lag probe runs inside the server and is exposed on
+GET /__bench/loop-lag.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+try:
+    from backend.benchmarks.fakes import BENCH_JWT_SECRET, BENCH_USERS, InMemorySupabase
+except ImportError:
+    from benchmarks.fakes import BENCH_JWT_SECRET, BENCH_USERS, InMemorySupabase
+
+MOCK_BASE_URL = os.getenv("MOCK_BASE_URL", "http://127.0.0.1:8101")
+
+# Must be in place before backend.main reads its configuration at import time
+os.environ.update({
+    "DEVTO_API_URL": f"{MOCK_BASE_URL}/devto",
+    "HASHNODE_API_URL": f"{MOCK_BASE_URL}/hashnode",
+    "GNEWS_API_URL": f"{MOCK_BASE_URL}/gnews",
+    "NEWSDATA_API_URL": f"{MOCK_BASE_URL}/newsdata",
+    "GNEWS_API_KEY": "bench",
+    "NEWSDATA_API_KEY": "bench",
+    "JWT_SECRET": BENCH_JWT_SECRET,
+    # Empty in-memory feed store and no poller: /news and research fall through to the mocks
+    "TRENDFLOW_FEED_POLLING": "0",
+    "TRENDFLOW_FEED_DB": ":memory:",
+    # Generated posts queue in memory and flush to the in-memory Supabase below
+    "TRENDFLOW_OUTBOX_DB": ":memory:",
+    # Load tests send the same topic over and over; every request should run the pipeline
+    "TRENDFLOW_TOPIC_REUSE": "0",
+    "TRENDFLOW_TOPIC_DB": ":memory:",
+    "TRENDFLOW_BLOB_DB": ":memory:",
+    "TRENDFLOW_PROVIDER_STATS_DB": ":memory:",
+    "TRENDFLOW_AUTOPILOT_DB": ":memory:",
+    # Load tests send everything from one IP and a handful of users
+    "TRENDFLOW_AUTH_RATE_LIMIT": "0",
+    "TRENDFLOW_NEWS_RATE_LIMIT": "0",
+    "TRENDFLOW_ANALYTICS_RATE_LIMIT": "0",
+})
+os.environ.setdefault("GOOGLE_API_KEY", "replay")
+# Private to the process unless a multi-worker run points every worker at one file
+os.environ.setdefault("TRENDFLOW_CACHE_DB", ":memory:")
+
+try:
+    from backend import main, news_fetcher
+    from backend.benchmarks.replay import LatencyModel, load_fixture, make_gnews_class, replay_environment
+except ImportError:
+    import main
+    import news_fetcher
+    from benchmarks.replay import LatencyModel, load_fixture, make_gnews_class, replay_environment
+
+DB_LATENCY_S = float(os.getenv("DB_LATENCY_S", "0.02"))
+AUTH_LATENCY_S = float(os.getenv("AUTH_LATENCY_S", "0.05"))
+REPLAY_SCALE = float(os.getenv("REPLAY_SCALE", "0.01"))
+
+
+def _verify_oauth2_token(credential, request, clock_skew_in_seconds=0):
+    """Blocking stand-in for google.oauth2.id_token (the real one fetches certs)."""
+    time.sleep(AUTH_LATENCY_S)
+    try:
+        user = BENCH_USERS[int(credential.split(":", 1)[1]) % len(BENCH_USERS)]
+    except (IndexError, ValueError):
+        raise ValueError("malformed bench credential")
+    return {"email": user["email"], "name": user["full_name"], "picture": "", "sub": user["id"]}
+
+
+main.supabase = InMemorySupabase(latency_s=DB_LATENCY_S).seed()
+main.id_token = SimpleNamespace(verify_oauth2_token=_verify_oauth2_token)
+news_fetcher.GNews = make_gnews_class(
+    load_fixture("providers.json"), LatencyModel(load_fixture("latencies.json"), REPLAY_SCALE)
+)
+# Held open for the lifetime of the process
+_replay = replay_environment(scale=REPLAY_SCALE)
+_replay.__enter__()
+
+app = main.app
+
+
+class LoopLagProbe:
+    """Sleeps for `interval` in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+
+    async def run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def snapshot(self, reset: bool = True) -> dict:
+        samples, n = sorted(self.samples), len(self.samples)
+        if reset:
+            self.samples = []
+        if not n:
+            return {"samples": 0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "samples": n,
+            "mean_ms": round(1000 * sum(samples) / n, 2),
+            "p95_ms": round(1000 * samples[min(n - 1, int(n * 0.95))], 2),
+            "max_ms": round(1000 * samples[-1], 2),
+        }
+
+
+lag_probe = LoopLagProbe()
+_inner_lifespan = app.router.lifespan_context
+
+
+@asynccontextmanager
+async def _bench_lifespan(a):
+    task = asyncio.create_task(lag_probe.run())
+    try:
+        async with _inner_lifespan(a) as state:
+            yield state
+    finally:
+        task.cancel()
+
+app.router.lifespan_context = _bench_lifespan
+
+
+@app.get("/__bench/loop-lag")
+async def bench_loop_lag(reset: bool = True):
+    return lag_probe.snapshot(reset)
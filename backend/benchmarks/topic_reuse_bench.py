@@ -0,0 +1,170 @@
+"""
+Benchmark for recent-topic reuse (backend/topic_index.py).
+
+Three parts:
+
+- matching: hand-written near-duplicate and unrelated topic pairs; reports
+  how many near-duplicates are found and how many unrelated topics are
+  wrongly matched at the configured similarity;
+- lookup: `--generations` recent generations with synthetic topics; find()
+  p50/p95 through the MinHash LSH buckets vs. a Jaccard scan of every row;
+- pipeline: the full app_graph against recordings for a topic, then for a
+  near-duplicate of it with and without the first run's research as seed.
+
+    python -m backend.benchmarks.topic_reuse_bench
+    python -m backend.benchmarks.topic_reuse_bench --generations 100000 --lookups 2000
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import time
+
+os.environ.setdefault("GOOGLE_API_KEY", "replay")  # clients are constructed at import time
+
+try:
+    from backend import topic_index
+    from backend.benchmarks.pipeline_bench import percentile
+    from backend.benchmarks.replay import replay_environment
+    from backend.telemetry import logger as telemetry_logger, trace_run
+except ImportError:
+    import topic_index
+    from benchmarks.pipeline_bench import percentile
+    from benchmarks.replay import replay_environment
+    from telemetry import logger as telemetry_logger, trace_run
+
+NEAR_DUPLICATES = [
+    ("AI chips", "the AI chip"),
+    ("Nvidia Q3 earnings", "Nvidia earnings Q3 report"),
+    ("OpenAI GPT-5 launch", "GPT-5 launch by OpenAI"),
+    ("Stripe IPO valuation", "Stripe's IPO valuation"),
+    ("Apple Vision Pro sales", "Vision Pro sales Apple"),
+    ("EU AI Act compliance", "EU AI Act compliance deadlines"),
+    ("Bitcoin ETF inflows", "Bitcoin ETF inflows this week"),
+    ("Rust in the Linux kernel", "Rust Linux kernel"),
+]
+UNRELATED = [
+    ("AI chips", "AI regulation"),
+    ("Nvidia Q3 earnings", "AMD Q3 earnings"),
+    ("OpenAI GPT-5 launch", "Google Gemini launch"),
+    ("Stripe IPO valuation", "Stripe payments outage"),
+    ("Apple Vision Pro sales", "Apple Watch sales"),
+    ("EU AI Act compliance", "EU Digital Markets Act"),
+    ("Bitcoin ETF inflows", "Ethereum staking"),
+    ("Rust in the Linux kernel", "Linux kernel 6.8 release"),
+]
+
+
+def bench_matching() -> dict:
+    index = topic_index.TopicIndex()
+    for topic, _ in NEAR_DUPLICATES:
+        index.record(topic, "u", None, topic, "summary")
+    found = sum(1 for _, dup in NEAR_DUPLICATES if index.find(dup))
+    false = [(a, b) for a, b in UNRELATED if (m := index.find(b)) and m["topic"] == a]
+    return {"near_duplicates": len(NEAR_DUPLICATES), "found": found,
+            "unrelated": len(UNRELATED), "false_matches": len(false), "false_pairs": false}
+
+
+def synthetic_topic(rng: random.Random, vocab: list) -> str:
+    return " ".join(rng.sample(vocab, rng.randint(2, 5)))
+
+
+def bench_lookup(generations: int, lookups: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(5000)]
+    index = topic_index.TopicIndex()
+    topics = [synthetic_topic(rng, vocab) for _ in range(generations)]
+    start = time.perf_counter()
+    for topic in topics:
+        index.record(topic, f"user{rng.randrange(100)}", None, topic, "summary")
+    insert_s = time.perf_counter() - start
+
+    # Half the queries are an indexed topic with one word added, half are new
+    queries = [rng.choice(topics) + " " + rng.choice(vocab) if i % 2 else synthetic_topic(rng, vocab)
+               for i in range(lookups)]
+    stored = [topic_index.normalize(t) for t in topics]
+    lsh, scan, agree = [], [], 0
+    for query in queries:
+        start = time.perf_counter()
+        match = index.find(query)
+        lsh.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        keywords = topic_index.normalize(query)
+        best = max((topic_index.jaccard(keywords, s) for s in stored), default=0.0)
+        scan.append(time.perf_counter() - start)
+        agree += (match is not None) == (best >= topic_index.SIMILARITY)
+    return {
+        "generations": generations,
+        "insert_us": round(insert_s / generations * 1e6, 1),
+        "lsh_p50_us": round(percentile(lsh, 50) * 1e6, 1),
+        "lsh_p95_us": round(percentile(lsh, 95) * 1e6, 1),
+        "scan_p50_us": round(percentile(scan, 50) * 1e6, 1),
+        "scan_p95_us": round(percentile(scan, 95) * 1e6, 1),
+        "agreement": round(agree / lookups, 4),
+    }
+
+
+def run_graph(agents, initial_state: dict):
+    start = time.perf_counter()
+    with trace_run() as run:
+        state = agents.app_graph.invoke(initial_state)
+    llm = run.summary()["llm"].values()
+    return state, {"elapsed_s": round(time.perf_counter() - start, 3),
+                   "llm_calls": sum(s["calls"] for s in llm),
+                   "tokens": sum(s["input_tokens"] + s["output_tokens"] for s in llm)}
+
+
+def bench_pipeline(topic: str, duplicate: str, scale: float, seed: int) -> dict:
+    fresh = {"revision_count": 0, "is_approved": False}
+    with replay_environment(scale=scale, seed=seed) as agents, contextlib.redirect_stdout(io.StringIO()):
+        first, _ = run_graph(agents, {**fresh, "topic": topic})
+        _, scratch = run_graph(agents, {**fresh, "topic": duplicate})
+        _, seeded = run_graph(agents, {**fresh, "topic": duplicate, "research_summary": first["research_summary"],
+                                       "search_queries": first.get("search_queries", [])})
+    return {"from scratch": scratch, "reused research": seeded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generations", type=int, default=10000, help="Recent generations in the index")
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--topic", default="AI chips")
+    parser.add_argument("--duplicate", default="the AI chip")
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on recorded latencies (1.0 = production-like)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+    telemetry_logger.setLevel(logging.WARNING)
+
+    matching = bench_matching()
+    print(f"\n=== Matching (similarity >= {topic_index.SIMILARITY}) ===")
+    print(f"near-duplicates found: {matching['found']}/{matching['near_duplicates']}")
+    print(f"unrelated matched:     {matching['false_matches']}/{matching['unrelated']}")
+    for a, b in matching["false_pairs"]:
+        print(f"   '{b}' matched '{a}'")
+
+    lookup = bench_lookup(args.generations, args.lookups, args.seed)
+    print(f"\n=== Lookup ({lookup['generations']} generations) ===")
+    print(f"{'method':<8} {'p50 (us)':>10} {'p95 (us)':>10}")
+    print(f"{'lsh':<8} {lookup['lsh_p50_us']:>10.1f} {lookup['lsh_p95_us']:>10.1f}")
+    print(f"{'scan':<8} {lookup['scan_p50_us']:>10.1f} {lookup['scan_p95_us']:>10.1f}")
+    print(f"insert {lookup['insert_us']} us/generation, LSH agrees with the scan on {lookup['agreement']:.1%} of lookups")
+
+    pipeline = bench_pipeline(args.topic, args.duplicate, args.scale, args.seed)
+    print(f"\n=== Pipeline for '{args.duplicate}' after '{args.topic}' ===")
+    print(f"{'run':<16} {'time (s)':>9} {'LLM calls':>10} {'tokens':>8}")
+    for name, r in pipeline.items():
+        print(f"{name:<16} {r['elapsed_s']:>9.3f} {r['llm_calls']:>10} {r['tokens']:>8}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "matching": matching, "lookup": lookup, "pipeline": pipeline}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
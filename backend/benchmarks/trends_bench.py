@@ -0,0 +1,162 @@
+"""
+Benchmark for the trend engine (backend/trends.py).
+
+Streams a synthetic day of news through the engine: `--articles-per-hour`
+articles per hour for `--hours` hours, words drawn from a Zipf vocabulary,
+plus a few steady "always in the news" topics and `--trending` topics whose
+rate jumps over the last hours. Reports:
+
+- ingest throughput (articles/s, terms/s) and the total terms counted;
+- memory: the engine's footprint vs. exact per-hour Counters over the same
+  window (`--exact` to include the latter);
+- /trends latency (rising() p50/p95) and whether the injected topics come out
+  on top while the steady ones do not.
+
+    python -m backend.benchmarks.trends_bench
+    python -m backend.benchmarks.trends_bench --articles-per-hour 20000 --hours 24 --exact
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+try:
+    from backend import trends
+    from backend.articles import Article
+    from backend.benchmarks.pipeline_bench import percentile
+except ImportError:
+    import trends
+    from articles import Article
+    from benchmarks.pipeline_bench import percentile
+
+STEADY = ["Apple Vision Pro", "Microsoft Azure", "Google Gemini"]
+TRENDING = ["Cerebras Wafer Engine", "Quantum Widget X1", "Helion Fusion Plant", "Mistral Large Three", "Oxide Rack"]
+
+
+def synthetic_hours(args):
+    """Yields (hour, [Article, ...]) for the whole stream."""
+    rng = np.random.default_rng(args.seed)
+    vocab = np.array([f"w{i}" for i in range(args.vocab)])
+    trending = TRENDING[: args.trending]
+    for hour in range(args.hours):
+        ranks = np.minimum(rng.zipf(1.3, size=(args.articles_per_hour, args.words)), args.vocab) - 1
+        batch = []
+        heating = hour >= args.hours - trends.RECENT_BUCKETS
+        for n, row in enumerate(ranks):
+            words = vocab[row].tolist()
+            if n % 20 == 0:
+                words[0] = STEADY[n // 20 % len(STEADY)]
+            if trending and (n % (10 if heating else 400) == 1):
+                words[1] = trending[n // 10 % len(trending)]
+            text = " ".join(words)
+            batch.append(Article(provider="bench", title=text[: len(text) // 2], summary=text[len(text) // 2:],
+                                 url=f"https://bench/{hour}/{n}"))
+        yield hour, batch
+
+
+def deep_size(container) -> int:
+    """Bytes held by a dict/set of strings (or of Counters), including the strings."""
+    if isinstance(container, dict):
+        return sys.getsizeof(container) + sum(sys.getsizeof(k) + deep_size(v) for k, v in container.items())
+    if isinstance(container, (set, frozenset)):
+        return sys.getsizeof(container) + sum(sys.getsizeof(k) for k in container)
+    return sys.getsizeof(container)
+
+
+def engine_bytes(engine) -> int:
+    return (engine.counts.nbytes + deep_size(engine._candidates)
+            + deep_size(engine._seen) + deep_size(engine._seen_old))
+
+
+def run_engine(args) -> dict:
+    engine = trends.TrendEngine(capacity=args.candidates, width_bits=args.sketch_bits, seen_capacity=args.articles_per_hour)
+    base = 1_700_000_000 // engine.bucket_s * engine.bucket_s
+    ingest_s = 0.0
+    articles = 0
+    for hour, batch in synthetic_hours(args):
+        now = base + hour * engine.bucket_s
+        start = time.perf_counter()
+        for i in range(0, len(batch), args.batch):
+            engine.observe(batch[i:i + args.batch], now=now)
+        ingest_s += time.perf_counter() - start
+        articles += len(batch)
+
+    now = base + (args.hours - 1) * engine.bucket_s
+    latencies, top = [], []
+    for _ in range(args.queries):
+        start = time.perf_counter()
+        top = engine.rising(limit=10, now=now)
+        latencies.append(time.perf_counter() - start)
+    topics = [t["topic"].lower() for t in top]
+    found = [t for t in TRENDING[: args.trending] if any(topic in t.lower() for topic in topics)]
+    steady_hits = [s for s in STEADY if any(s.lower() == topic for topic in topics)]
+    stats = engine.stats()
+    return {
+        "articles": articles,
+        "terms": stats["terms_observed"],
+        "ingest_s": round(ingest_s, 2),
+        "articles_per_s": round(articles / ingest_s),
+        "terms_per_s": round(stats["terms_observed"] / ingest_s),
+        "engine_mb": round(engine_bytes(engine) / 2**20, 1),
+        "rising_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "rising_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "trending_found": f"{len(found)}/{args.trending}",
+        "steady_in_top10": len(steady_hits),
+        "top": [t["topic"] for t in top],
+    }
+
+
+def run_exact(args) -> dict:
+    """Exact counts, one Counter per hour for the same window."""
+    start = time.perf_counter()
+    window = {}
+    for hour, batch in synthetic_hours(args):
+        counter = window.setdefault(hour, Counter())
+        for article in batch:
+            counter.update(key for key, _ in trends.extract_terms(f"{article.title}. {article.summary}"))
+    elapsed = time.perf_counter() - start
+    return {"ingest_s": round(elapsed, 2), "distinct_keys": sum(len(c) for c in window.values()),
+            "memory_mb": round(deep_size(window) / 2**20, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=int, default=trends.BUCKETS)
+    parser.add_argument("--articles-per-hour", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=40, help="Words per article")
+    parser.add_argument("--vocab", type=int, default=200000)
+    parser.add_argument("--trending", type=int, default=3, help=f"Injected rising topics (max {len(TRENDING)})")
+    parser.add_argument("--batch", type=int, default=50, help="Articles per observe() call")
+    parser.add_argument("--candidates", type=int, default=trends.CANDIDATES)
+    parser.add_argument("--sketch-bits", type=int, default=trends.SKETCH_WIDTH_BITS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--exact", action="store_true", help="Also measure exact Counters for comparison")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"engine": run_engine(args)}
+    if args.exact:
+        results["exact"] = run_exact(args)
+
+    e = results["engine"]
+    print(f"\n{e['articles']} articles, {e['terms']:,} terms over {args.hours} h")
+    print(f"ingest: {e['ingest_s']:.1f}s ({e['articles_per_s']:,} articles/s, {e['terms_per_s']:,} terms/s)")
+    print(f"engine memory: {e['engine_mb']:.1f} MB (sketch {2 ** args.sketch_bits} wide, {args.candidates} candidates)")
+    if "exact" in results:
+        x = results["exact"]
+        print(f"exact Counters: {x['memory_mb']:.1f} MB for {x['distinct_keys']:,} hour/term keys ({x['ingest_s']:.1f}s)")
+    print(f"rising(): p50 {e['rising_p50_ms']:.2f} ms, p95 {e['rising_p95_ms']:.2f} ms")
+    print(f"injected trends in top 10: {e['trending_found']}; steady topics in top 10: {e['steady_in_top10']}")
+    print("top 10: " + ", ".join(e["top"]))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
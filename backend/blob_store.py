@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.telemetry import metrics
+except ImportError:
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from telemetry import metrics
+
+# --- CONFIGURATION ---
+BLOB_STATE = os.getenv("TRENDFLOW_BLOB_STATE", "1") == "1"              # keep large state fields out of AgentState
+MIN_BYTES = int(os.getenv("TRENDFLOW_BLOB_MIN_BYTES", "1024"))          # smaller values stay inline
+TTL_S = float(os.getenv("TRENDFLOW_BLOB_TTL_HOURS", "24")) * 3600       # unused this long = dropped
+CACHE_BYTES = int(float(os.getenv("TRENDFLOW_BLOB_CACHE_MB", "16")) * 1024 * 1024)
+BLOB_DB_PATH = os.getenv("TRENDFLOW_BLOB_DB")  # default: blobs.sqlite3 in the data dir
+PRUNE_EVERY = 500                               # puts between sweeps of expired blobs
+
+PREFIX = "blob:sha256:"
+_REF_LEN = len(PREFIX) + 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used);
+"""
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, str) and len(value) == _REF_LEN and value.startswith(PREFIX)
+
+
+class BlobStore:
+    """
+    Content-addressed text store: sha256 -> zlib-compressed bytes in SQLite
+    (memory-mapped reads), with a small LRU of decoded text in front.
+
+    Graph state holds `blob:sha256:...` references instead of the research
+    summary and every draft revision, so a run's state (and anything that
+    copies or serializes it) stays a few hundred bytes, and the same draft
+    kept as both `draft` and `best_draft`, or produced by two runs, is
+    stored once. Blobs not used for TTL_S are swept on later writes.
+    """
+
+    def __init__(self, path: str = ":memory:", cache_bytes: int = CACHE_BYTES, ttl_s: float = TTL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_limit = cache_bytes
+        self._puts = 0
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            if path != ":memory:":
+                self._conn.execute("PRAGMA mmap_size=268435456")
+
+    def _remember(self, ref: str, text: str):
+        """Adds to the decoded-text LRU (caller holds the lock)."""
+        if ref in self._cache:
+            self._cache.move_to_end(ref)
+            return
+        self._cache[ref] = text
+        self._cache_bytes += len(text)
+        while self._cache_bytes > self._cache_limit and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+
+    def put(self, text: str) -> str:
+        raw = text.encode("utf-8")
+        ref = PREFIX + hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                # Already stored (here or by another worker): only keep it alive
+                known = ref in self._cache and self._conn.execute(
+                    "UPDATE blobs SET last_used = ? WHERE hash = ?", (now, ref)).rowcount > 0
+                if not known:
+                    known = self._conn.execute(
+                        "INSERT OR IGNORE INTO blobs (hash, data, size, last_used) VALUES (?, ?, ?, ?)",
+                        (ref, zlib.compress(raw, 6), len(raw), now),
+                    ).rowcount == 0
+                    if known:
+                        self._conn.execute("UPDATE blobs SET last_used = ? WHERE hash = ?", (now, ref))
+                self._puts += 1
+                if self._puts % PRUNE_EVERY == 0:
+                    self._prune(now - self.ttl_s)
+            self._remember(ref, text)
+        metrics.inc("trendflow_blob_puts_total", help="Blob store writes by whether the content was new",
+                    outcome="dedup" if known else "stored")
+        return ref
+
+    def get(self, ref: str) -> str:
+        with self._lock:
+            text = self._cache.get(ref)
+            if text is not None:
+                self._cache.move_to_end(ref)
+                return text
+            row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (ref,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown blob {ref}")
+            text = zlib.decompress(row["data"]).decode("utf-8")
+            self._remember(ref, text)
+        return text
+
+    def _prune(self, cutoff: float) -> int:
+        dropped = self._conn.execute("SELECT hash FROM blobs WHERE last_used < ?", (cutoff,)).fetchall()
+        for row in dropped:
+            text = self._cache.pop(row["hash"], None)
+            if text is not None:
+                self._cache_bytes -= len(text)
+        return self._conn.execute("DELETE FROM blobs WHERE last_used < ?", (cutoff,)).rowcount
+
+    def prune(self, max_age_s: Optional[float] = None) -> int:
+        with self._lock, self._conn:
+            return self._prune(time.time() - (self.ttl_s if max_age_s is None else max_age_s))
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) "
+                                     "FROM blobs").fetchone()
+            cached = len(self._cache)
+        return {"path": self.path, "blobs": row[0], "bytes": row[1], "stored_bytes": row[2], "puts": self._puts,
+                "cached": cached, "cached_bytes": self._cache_bytes}
+
+
+# Opened on first use so importing the API never touches the disk
+blob_store = LazyObject(lambda: BlobStore(BLOB_DB_PATH or data_path("blobs.sqlite3")), label="blob_store")
+
+
+def stash(text: Optional[str]) -> Optional[str]:
+    """Reference for a large state value (the value itself when small, or when TRENDFLOW_BLOB_STATE=0)."""
+    if not BLOB_STATE or not isinstance(text, str) or len(text) < MIN_BYTES:
+        return text
+    return blob_store.put(text)
+
+
+def resolve(value: Any) -> Any:
+    """Text behind a reference; anything else is returned as is."""
+    return blob_store.get(value) if is_ref(value) else value
+
+
+def resolve_state(state: dict) -> dict:
+    """Copy of a graph state with every reference replaced by its text (responses, saved posts)."""
+    return {key: resolve(value) for key, value in state.items()}
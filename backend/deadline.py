@@ -0,0 +1,96 @@
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, TypeVar
+
+try:
+    from backend.telemetry import record_degradation
+except ImportError:
+    from telemetry import record_degradation
+
+# --- CONFIGURATION ---
+# Budget for a generation when the request sets none (0 = no deadline)
+DEFAULT_BUDGET_S = float(os.getenv("TRENDFLOW_GENERATION_DEADLINE_S", "0")) or None
+# Time a step needs left to run in full; with less, it degrades (see agents.py / model_router.py)
+FULL_RESEARCH_S = float(os.getenv("TRENDFLOW_DEADLINE_RESEARCH_S", "60"))  # every provider + DuckDuckGo
+PRO_MODEL_S = float(os.getenv("TRENDFLOW_DEADLINE_PRO_S", "45"))           # Pro tier in a model cascade
+REFINE_S = float(os.getenv("TRENDFLOW_DEADLINE_REFINE_S", "40"))           # one more Refiner + Editor round
+LOW_BUDGET_ARTICLES = int(os.getenv("TRENDFLOW_DEADLINE_ARTICLES", "4"))   # research stops here when short on time
+PROVIDER_TIMEOUT_S = float(os.getenv("TRENDFLOW_PROVIDER_TIMEOUT_S", "10"))
+MIN_TIMEOUT_S = 1.0
+
+# Absolute time.monotonic() by which the current run must finish. Context
+# variables follow LangGraph into its worker threads, like the run trace.
+_deadline: ContextVar[Optional[float]] = ContextVar("trendflow_deadline", default=None)
+
+# Waits on clients that take no timeout of their own (see bounded)
+_bounded_pool = ThreadPoolExecutor(max_workers=int(os.getenv("TRENDFLOW_DEADLINE_WORKERS", "4")),
+                                   thread_name_prefix="deadline")
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """A step could not finish inside the run's time budget."""
+
+
+@contextmanager
+def time_budget(seconds: Optional[float]):
+    """Gives everything run inside the block `seconds` to finish (no deadline when falsy)."""
+    if not seconds:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None when the run has none."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def low(needed_s: float) -> bool:
+    """True when the run has a deadline and less than `needed_s` left."""
+    left = remaining()
+    return left is not None and left < needed_s
+
+
+def expired() -> bool:
+    """True when the run has a deadline and it has passed."""
+    return low(0)
+
+
+def timeout(default: float = PROVIDER_TIMEOUT_S) -> float:
+    """Timeout for one provider request: the default, cut to what is left of the budget."""
+    left = remaining()
+    return default if left is None else max(MIN_TIMEOUT_S, min(default, left))
+
+
+def bounded(call: Callable[..., T], *args, default: float = PROVIDER_TIMEOUT_S) -> T:
+    """
+    call(*args), waited on for at most timeout(default) when the run has a
+    deadline. For clients with no timeout to pass (scrapers): past it the call
+    is left to finish in the background and DeadlineExceeded is raised.
+    """
+    if remaining() is None:
+        return call(*args)
+    future = _bounded_pool.submit(contextvars.copy_context().run, call, *args)
+    wait = timeout(default)
+    try:
+        return future.result(timeout=wait)
+    except FutureTimeout:
+        raise DeadlineExceeded(f"{getattr(call, '__qualname__', call)} took longer than {wait:.1f}s") from None
+
+
+def degrade(step: str, **fields):
+    """Notes a degradation in the run trace (reported with the response) and metrics."""
+    left = remaining()
+    print(f"   ⏱️ Deadline: {step} ({left:.1f}s left)" if left is not None else f"   ⏱️ Deadline: {step}")
+    record_degradation(step, remaining_s=round(left, 2) if left is not None else None, **fields)
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+try:
+    from backend.telemetry import log_event, metrics
+except ImportError:
+    from telemetry import log_event, metrics
+
+# Frames from these paths are the "culprit" we attribute a stall to; library
+# frames below them (supabase, requests, ssl) are kept in the stack sample only.
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename
+    if path.startswith(APP_ROOT):
+        path = os.path.relpath(path, os.path.dirname(APP_ROOT))
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    return f"{path}:{frame.f_lineno} in {code.co_name}"
+
+
+def _sample_stack(frame, limit: int = 15):
+    """Returns (innermost app frame label, stack labels innermost-last)."""
+    stack = []
+    culprit = None
+    while frame is not None and len(stack) < 200:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    for f in stack:
+        if f.f_code.co_filename.startswith(APP_ROOT) and f.f_code.co_name != "_heartbeat":
+            culprit = _frame_label(f)
+    labels = [_frame_label(f) for f in stack[-limit:]]
+    return culprit or (labels[-1] if labels else "<unknown>"), labels
+
+
+class RouteTaggingMiddleware:
+    """Pure ASGI middleware that remembers which request each asyncio task is
+    serving, so a stall sampled from another thread can be pinned to a route."""
+
+    def __init__(self, app, detector: "LoopBlockDetector"):
+        self.app = app
+        self.detector = detector
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.detector.running:
+            return await self.app(scope, receive, send)
+        task = asyncio.current_task()
+        self.detector.task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.detector.task_scopes.pop(task, None)
+
+
+class LoopBlockDetector:
+    """Watches event-loop lag and samples the loop thread whenever a callback
+    blocks it for longer than `threshold_s`.
+
+    A heartbeat coroutine ticks every `interval_s`; a watchdog thread notices
+    when the heartbeat goes stale and grabs the loop thread's stack while the
+    blocking call is still running. Stalls are aggregated by (route, culprit
+    frame) for the "top blockers" report.
+    """
+
+    def __init__(self, threshold_s: float = 0.1, interval_s: float = 0.02):
+        self.enabled = os.getenv("TRENDFLOW_LOOP_DIAGNOSTICS", "0") == "1"
+        self.threshold_s = float(os.getenv("TRENDFLOW_LOOP_BLOCK_THRESHOLD_MS", threshold_s * 1000)) / 1000
+        self.interval_s = interval_s
+        self.running = False
+        self.task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._pending: Optional[dict] = None  # sample taken during the current stall
+        self._lock = threading.Lock()
+        self._blockers: Dict[Tuple[str, str], dict] = {}
+        self._lag_max = 0.0
+        self._stalls = 0
+
+    # --- lifecycle ---
+    def start(self, loop: asyncio.AbstractEventLoop):
+        if self.running:
+            return
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self.running = True
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-block-watchdog", daemon=True)
+        self._watchdog.start()
+        print(f"--- 🩺 Loop diagnostics on (threshold {self.threshold_s * 1000:.0f} ms) ---")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._stop.set()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+    # --- loop side ---
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            metrics.observe("trendflow_event_loop_lag_seconds", lag, help="Event-loop wake-up lag")
+            if lag >= self.threshold_s:
+                self._finish_stall(lag)
+
+    def _finish_stall(self, lag: float):
+        with self._lock:
+            sample, self._pending = self._pending, None
+            route, culprit, stack = sample or ("<unsampled>", "<unsampled>", [])
+            key = (route, culprit)
+            entry = self._blockers.setdefault(key, {
+                "route": route, "culprit": culprit, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack,
+            })
+            entry["count"] += 1
+            entry["total_ms"] += lag * 1000
+            if lag * 1000 >= entry["max_ms"]:
+                entry["max_ms"] = lag * 1000
+                entry["stack"] = stack or entry["stack"]
+            self._stalls += 1
+            self._lag_max = max(self._lag_max, lag)
+        metrics.inc("trendflow_event_loop_blocks_total", help="Event-loop stalls above threshold", route=route)
+        log_event("loop_block", route=route, culprit=culprit, duration_ms=round(lag * 1000, 1), stack=stack)
+
+    # --- watchdog side ---
+    def _route_for_running_task(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        scope = self.task_scopes.get(task) if task is not None else None
+        if scope is None:
+            return "<background>"
+        route = scope.get("route")
+        path = getattr(route, "path", None) or scope.get("path", "?")
+        return f"{scope.get('method', '')} {path}".strip()
+
+    def _watch(self):
+        poll = min(self.interval_s, self.threshold_s / 2)
+        while not self._stop.wait(poll):
+            stale = time.perf_counter() - self._last_beat
+            if stale < self.threshold_s + self.interval_s or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            culprit, stack = _sample_stack(frame)
+            with self._lock:
+                if self._pending is None:
+                    self._pending = (self._route_for_running_task(), culprit, stack)
+
+    # --- reporting ---
+    def report(self, limit: int = 20) -> dict:
+        with self._lock:
+            blockers = sorted(self._blockers.values(), key=lambda b: -b["total_ms"])[:limit]
+            blockers = [{**b, "total_ms": round(b["total_ms"], 1), "max_ms": round(b["max_ms"], 1)} for b in blockers]
+            return {
+                "enabled": self.enabled,
+                "running": self.running,
+                "threshold_ms": round(self.threshold_s * 1000, 1),
+                "stalls": self._stalls,
+                "max_lag_ms": round(self._lag_max * 1000, 1),
+                "blockers": blockers,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._blockers.clear()
+            self._stalls = 0
+            self._lag_max = 0.0
+
+
+loop_diagnostics = LoopBlockDetector()
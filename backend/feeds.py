@@ -0,0 +1,429 @@
+import asyncio
+import calendar
+import html
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+try:
+    from backend.articles import Article
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.telemetry import log_event, metrics
+    from backend.trends import record_articles
+except ImportError:
+    from articles import Article
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from telemetry import log_event, metrics
+    from trends import record_articles
+
+# --- FEED LIST ---
+# Tech outlets and vendor blogs with public RSS/Atom feeds. Override with
+# TRENDFLOW_FEEDS ("name=url,name=url") or TRENDFLOW_FEEDS_FILE (one name=url per line).
+DEFAULT_FEEDS = {
+    "TechCrunch": "https://techcrunch.com/feed/",
+    "The Verge": "https://www.theverge.com/rss/index.xml",
+    "Ars Technica": "https://feeds.arstechnica.com/arstechnica/technology-lab",
+    "Wired": "https://www.wired.com/feed/rss",
+    "MIT Technology Review": "https://www.technologyreview.com/feed/",
+    "Hacker News": "https://hnrss.org/frontpage",
+    "NVIDIA Blog": "https://blogs.nvidia.com/feed/",
+    "Google Blog": "https://blog.google/rss/",
+    "AWS News Blog": "https://aws.amazon.com/blogs/aws/feed/",
+    "GitHub Blog": "https://github.blog/feed/",
+}
+
+MIN_INTERVAL_S = int(os.getenv("TRENDFLOW_FEED_MIN_INTERVAL", "300"))      # busy feeds
+MAX_INTERVAL_S = int(os.getenv("TRENDFLOW_FEED_MAX_INTERVAL", "21600"))    # quiet or failing feeds
+POLL_CONCURRENCY = int(os.getenv("TRENDFLOW_FEED_CONCURRENCY", "8"))
+RETENTION_S = int(os.getenv("TRENDFLOW_FEED_RETENTION_HOURS", "336")) * 3600
+SUMMARY_CHARS = 500
+
+FEED_DB_PATH = os.getenv("TRENDFLOW_FEED_DB")  # default: feeds.sqlite3 in the data dir
+
+
+def _parse_feed_list(lines: Iterable[str]) -> Dict[str, str]:
+    feeds = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, sep, url = line.partition("=")
+        if not sep:
+            name, url = line, line
+        feeds[name.strip()] = url.strip()
+    return feeds
+
+
+def load_feeds() -> Dict[str, str]:
+    path = os.getenv("TRENDFLOW_FEEDS_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return _parse_feed_list(f)
+    raw = os.getenv("TRENDFLOW_FEEDS")
+    return _parse_feed_list(raw.split(",")) if raw else dict(DEFAULT_FEEDS)
+
+
+# --- STORE ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    interval_s REAL NOT NULL,
+    next_poll_at REAL NOT NULL DEFAULT 0,
+    last_status TEXT,
+    last_polled_at REAL,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    feed_url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    summary TEXT NOT NULL DEFAULT '',
+    image_url TEXT,
+    published_at TEXT NOT NULL DEFAULT '',
+    published_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_published_ts ON entries (published_ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    title, summary, content='entries', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, title, summary) VALUES ('delete', old.id, old.title, old.summary);
+END;
+"""
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+OPERATORS = {"and", "or", "not"}
+MAX_TERMS = 8            # terms beyond this are ignored (the relaxed query grows with the square of the count)
+
+
+def query_terms(topic: str) -> List[Tuple[str, ...]]:
+    """
+    The topic's required terms, each a tuple of alternatives. Research keywords
+    are boolean strings ("Nvidia AND AMD", "(GPU OR TPU) chips"): an explicit
+    OR joins its neighbours into one term, words excluded with NOT are left
+    out, AND and parentheses are dropped.
+    """
+    terms: List[List[str]] = []
+    join = negate = excluded = False
+    for word in _TERM_RE.findall(topic):
+        if word.lower() in OPERATORS:
+            negate = negate or word == "NOT"
+            join = join or word == "OR"
+            continue
+        if negate or (join and excluded):     # "NOT a OR b" excludes both
+            excluded = True
+        elif join and terms:
+            terms[-1].append(word.lower())
+            excluded = False
+        else:
+            terms.append([word.lower()])
+            excluded = False
+        join = negate = False
+    unique = list(dict.fromkeys(tuple(dict.fromkeys(t)) for t in terms))
+    return unique[:MAX_TERMS]
+
+
+def match_query(topic: str, slack: int = 0) -> Optional[str]:
+    """
+    FTS5 query for the topic's terms (quoted, so user input is never parsed as
+    syntax). Every term is required, or with `slack`, all but that many.
+    """
+    terms = [" OR ".join(f'"{w}"' for w in t) for t in query_terms(topic)]
+    terms = [f"({t})" if " OR " in t else t for t in terms]
+    if not terms or slack >= len(terms):
+        return None
+    if not slack:
+        return " AND ".join(terms)
+    return " OR ".join(f"({' AND '.join(subset)})" for subset in combinations(terms, len(terms) - slack))
+
+
+class FeedStore:
+    """
+    Local index of feed entries (SQLite + FTS5). Searching a topic is a
+    full-text lookup over titles and summaries, newest first.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    # Feed bookkeeping
+    def sync_feeds(self, feeds: Dict[str, str]):
+        """Registers configured feeds (new ones are due immediately) and renames existing ones."""
+        with self._lock, self._conn:
+            for name, url in feeds.items():
+                self._conn.execute(
+                    "INSERT INTO feeds (url, name, interval_s) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET name = excluded.name",
+                    (url, name, MIN_INTERVAL_S),
+                )
+
+    def due_feeds(self, now: Optional[float] = None, urls: Optional[Iterable[str]] = None) -> List[dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM feeds WHERE next_poll_at <= ? ORDER BY next_poll_at", (now,)).fetchall()
+        wanted = set(urls) if urls is not None else None
+        return [dict(r) for r in rows if wanted is None or r["url"] in wanted]
+
+    def next_due_at(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_poll_at) FROM feeds").fetchone()
+        return row[0]
+
+    def record_poll(self, url: str, status: str, interval_s: float, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None, failed: bool = False):
+        now = time.time()
+        # ±10% jitter so feeds that started together drift apart
+        next_poll = now + interval_s * random.uniform(0.9, 1.1)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE feeds SET last_status = ?, last_polled_at = ?, interval_s = ?, next_poll_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), "
+                "failures = CASE WHEN ? THEN failures + 1 ELSE 0 END WHERE url = ?",
+                (status, now, interval_s, next_poll, etag, last_modified, failed, url),
+            )
+
+    def mark_due(self):
+        """Makes every feed due now (e.g. after changing the feed list)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE feeds SET next_poll_at = 0")
+
+    def feeds(self) -> List[dict]:
+        with self._lock:
+            return [dict(r) for r in self._conn.execute("SELECT * FROM feeds ORDER BY name")]
+
+    # Entries
+    def add_entries(self, feed_url: str, articles: Iterable[Article]) -> int:
+        """Stores new entries (known URLs are skipped). Returns how many were new."""
+        rows = [(feed_url, a.source, a.title, a.url, a.summary, a.image_url, a.published_at, _timestamp(a.published_at))
+                for a in articles if a.url and a.title]
+        with self._lock, self._conn:
+            return self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (feed_url, source, title, url, summary, image_url, published_at, published_ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+
+    def search(self, topic: str, limit: int = 10, max_age_s: Optional[float] = None) -> List[Article]:
+        """
+        Entries matching every term of the topic, newest first. When those fall
+        short of `limit` and the topic has three or more terms, entries missing
+        any one term fill the rest.
+        """
+        since = time.time() - max_age_s if max_age_s else 0
+        rows = []
+        for slack in (0, 1):
+            query = match_query(topic, slack)
+            if not query or (slack and len(query_terms(topic)) < 3):
+                break
+            with self._lock:
+                rows += self._conn.execute(
+                    "SELECT e.* FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid "
+                    "WHERE entries_fts MATCH ? AND e.published_ts >= ? ORDER BY e.published_ts DESC LIMIT ?",
+                    # The relaxed query also matches what the strict one found
+                    (query, since, limit + len(rows)),
+                ).fetchall()
+            rows = list({r["id"]: r for r in rows}.values())[:limit]
+            if len(rows) >= limit:
+                break
+        return [Article(provider="rss", title=r["title"], url=r["url"], source=r["source"], summary=r["summary"],
+                        published_at=r["published_at"], image_url=r["image_url"]) for r in rows]
+
+    def prune(self, max_age_s: float = RETENTION_S) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM entries WHERE published_ts < ?", (time.time() - max_age_s,)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*), MAX(published_ts) FROM entries").fetchone()
+        return {"entries": entries[0], "newest_ts": entries[1], "feeds": self.feeds()}
+
+
+def _timestamp(published_at: str) -> float:
+    try:
+        return datetime.fromisoformat(published_at).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+# --- PARSING ---
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _clean(text: str) -> str:
+    text = html.unescape(_TAG_RE.sub(" ", text or ""))
+    text = " ".join(text.split())
+    return text if len(text) <= SUMMARY_CHARS else text[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+def iter_feed_entries(content: bytes, source: str) -> Iterator[Article]:
+    """Parses an RSS/Atom document into Articles (feedparser is imported on first use)."""
+    import feedparser
+
+    parsed = feedparser.parse(content)
+    for entry in parsed.entries:
+        stamp = entry.get("published_parsed") or entry.get("updated_parsed")
+        published = datetime.fromtimestamp(calendar.timegm(stamp), tz=timezone.utc) if stamp else datetime.now(timezone.utc)
+        image = None
+        for media in entry.get("media_content") or entry.get("media_thumbnail") or []:
+            image = media.get("url")
+            if image:
+                break
+        yield Article(
+            provider="rss",
+            title=_clean(entry.get("title", "")),
+            url=entry.get("link", ""),
+            source=source,
+            summary=_clean(entry.get("summary", "")),
+            published_at=published.isoformat(),
+            image_url=image,
+        )
+
+
+# --- POLLER ---
+class FeedPoller:
+    """
+    Polls every configured feed with conditional GETs (If-None-Match /
+    If-Modified-Since), a few at a time. Each feed keeps its own interval:
+    halved when a poll brings new entries, stretched 1.5x when it brings none
+    or the server answers 304, doubled on errors, within
+    [MIN_INTERVAL_S, MAX_INTERVAL_S].
+    """
+
+    def __init__(self, store: FeedStore, feeds: Optional[Dict[str, str]] = None,
+                 concurrency: int = POLL_CONCURRENCY, timeout_s: float = 15.0):
+        self.store = store
+        self.feeds = feeds if feeds is not None else load_feeds()
+        self.concurrency = concurrency
+        self.timeout_s = timeout_s
+        self._task: Optional[asyncio.Task] = None
+        self._synced = False
+
+    def _sync(self):
+        if not self._synced:
+            self.store.sync_feeds(self.feeds)
+            self._synced = True
+
+    async def poll_feed(self, client: httpx.AsyncClient, feed: dict) -> str:
+        headers = {"User-Agent": "TrendFlow/1.0 (+feed poller)"}
+        if feed.get("etag"):
+            headers["If-None-Match"] = feed["etag"]
+        if feed.get("last_modified"):
+            headers["If-Modified-Since"] = feed["last_modified"]
+        interval = feed["interval_s"]
+        start = time.perf_counter()
+        try:
+            resp = await client.get(feed["url"], headers=headers)
+            if resp.status_code == 304:
+                outcome, new = "not_modified", 0
+            elif resp.status_code == 200:
+                articles = await asyncio.to_thread(lambda: list(iter_feed_entries(resp.content, feed["name"])))
+                new = await asyncio.to_thread(self.store.add_entries, feed["url"], articles)
+                if new:
+                    await asyncio.to_thread(record_articles, articles)
+                outcome = "new" if new else "unchanged"
+            else:
+                raise httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request, response=resp)
+        except Exception as e:
+            interval = min(MAX_INTERVAL_S, interval * 2)
+            await asyncio.to_thread(self.store.record_poll, feed["url"], f"error: {e}"[:200], interval, failed=True)
+            outcome = "error"
+            log_event("feed_poll_failed", feed=feed["name"], error=str(e)[:200], next_in_s=round(interval))
+        else:
+            interval = max(MIN_INTERVAL_S, interval / 2) if new else min(MAX_INTERVAL_S, interval * 1.5)
+            await asyncio.to_thread(self.store.record_poll, feed["url"], outcome, interval,
+                                    etag=resp.headers.get("etag"), last_modified=resp.headers.get("last-modified"))
+            metrics.inc("trendflow_feed_entries_total", new, help="New entries stored from RSS/Atom feeds", feed=feed["name"])
+        metrics.inc("trendflow_feed_polls_total", help="RSS/Atom polls by outcome", outcome=outcome)
+        metrics.observe("trendflow_feed_poll_seconds", time.perf_counter() - start, help="RSS/Atom poll wall time")
+        return outcome
+
+    async def poll_due(self, client: Optional[httpx.AsyncClient] = None) -> Dict[str, int]:
+        """Polls every feed that is due now. Returns {outcome: count}."""
+        await asyncio.to_thread(self._sync)
+        due = await asyncio.to_thread(self.store.due_feeds, None, self.feeds.values())
+        if not due:
+            return {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(c, feed):
+            async with semaphore:
+                return await self.poll_feed(c, feed)
+
+        if client is None:
+            async with httpx.AsyncClient(timeout=self.timeout_s, follow_redirects=True) as c:
+                outcomes = await asyncio.gather(*(one(c, f) for f in due))
+        else:
+            outcomes = await asyncio.gather(*(one(client, f) for f in due))
+        counts: Dict[str, int] = {}
+        for outcome in outcomes:
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+    async def run(self):
+        last_prune = 0.0
+        while True:
+            try:
+                counts = await self.poll_due()
+                if counts:
+                    log_event("feed_poll", **counts)
+                if time.time() - last_prune > 3600:
+                    await asyncio.to_thread(self.store.prune)
+                    last_prune = time.time()
+                next_due = await asyncio.to_thread(self.store.next_due_at)
+            except Exception as e:
+                log_event("feed_poller_error", error=str(e)[:200])
+                next_due = None
+            delay = (next_due - time.time()) if next_due else 60
+            await asyncio.sleep(min(60, max(5, delay)))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# --- LOCAL-FIRST LOOKUP ---
+FEED_POLLING = os.getenv("TRENDFLOW_FEED_POLLING", "1") == "1"
+FEED_MAX_AGE_S = float(os.getenv("TRENDFLOW_FEED_MAX_AGE_HOURS", "48")) * 3600
+# Research is answered from the store alone once it has this many fresh matches
+FEED_SUFFICIENT = int(os.getenv("TRENDFLOW_FEED_SUFFICIENT", "4"))
+
+# Opened on first use so importing the API never touches the disk
+feed_store = LazyObject(lambda: FeedStore(FEED_DB_PATH or data_path("feeds.sqlite3")), label="feed_store")
+feed_poller = LazyObject(lambda: FeedPoller(feed_store), label="feed_poller")
+
+
+def local_articles(topic: str, limit: int) -> List[Article]:
+    """Fresh stored entries for `topic`; never raises (a broken store just means no local results)."""
+    try:
+        return feed_store.search(topic, limit=limit, max_age_s=FEED_MAX_AGE_S)
+    except Exception as e:
+        log_event("feed_store_error", error=str(e)[:200])
+        return []
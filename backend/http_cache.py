@@ -0,0 +1,213 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.responses import Response
+
+try:
+    from backend.telemetry import metrics
+except ImportError:
+    from telemetry import metrics
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # stdlib json
+    orjson = None
+
+MIN_COMPRESS_BYTES = int(os.getenv("TRENDFLOW_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5            # about twice as fast as gzip -6, and smaller on prose-heavy JSON
+ENCODED_CACHE_ENTRIES = 256   # compressed bodies kept by (ETag, encoding)
+THREAD_MIN_BYTES = 128 * 1024  # compress bodies larger than this off the event loop
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _etag(data: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+# Cheap "what would the body be" for a request: a string that changes whenever its response would
+# (e.g. a per-user change counter), or None when it cannot tell and the content hash must decide
+VersionFn = Callable[[dict], Awaitable[Optional[str]]]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def pick_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    offered = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.partition(";")
+        try:
+            q = float(params.strip().removeprefix("q=")) if params.strip() else 1.0
+        except ValueError:
+            q = 1.0
+        offered[name.strip()] = q
+    if brotli is not None and offered.get("br"):
+        return "br"
+    if offered.get("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def json_response(content, status_code: int = 200) -> Response:
+    """
+    JSON response for data that is already JSON-native (Supabase rows, news
+    dicts): skips FastAPI's per-value jsonable_encoder walk and uses orjson
+    when installed, which matters for a post library with full bodies.
+    """
+    if orjson is not None:
+        body = orjson.dumps(content, default=str)
+    else:
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    return Response(body, status_code=status_code, media_type="application/json")
+
+
+class ConditionalResponseMiddleware:
+    """
+    Pure ASGI middleware for polled JSON read endpoints.
+
+    Buffers the JSON body of a 200 GET on one of `paths`, tags it with a
+    content-hash ETag and answers 304 (no body) when the client's
+    If-None-Match still matches, so a dashboard refresh with nothing new costs
+    a few headers. Paths with a function in `versions` are tagged from that
+    version instead, and a matching If-None-Match is answered before the
+    endpoint runs: no database query, no serialization. When the version is
+    unknown the content hash is the fallback.
+    Bodies over `minimum_size` are compressed (brotli when the
+    client accepts it and the module is installed, else gzip); compressed
+    bodies are cached by ETag so repeat full loads skip the compressor too.
+    Responses are per-user, so they are marked private and vary on
+    Authorization.
+    """
+
+    def __init__(self, app, paths: Iterable[str], minimum_size: int = MIN_COMPRESS_BYTES,
+                 versions: Optional[Dict[str, VersionFn]] = None):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.versions = versions or {}
+        self.minimum_size = minimum_size
+        self._encoded: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        request_headers = scope["headers"]
+        etag = await self._version_etag(scope)
+        if etag is not None and etag_matches(_header(request_headers, b"if-none-match"), etag):
+            metrics.inc("trendflow_http_not_modified_total", help="Read requests answered 304 Not Modified",
+                        source="version")
+            await send({"type": "http.response.start", "status": 304, "headers": self._cache_headers(etag)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        start = None
+        chunks: List[bytes] = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                content_type = _header(message.get("headers", []), b"content-type") or ""
+                if message["status"] != 200 or not content_type.startswith("application/json"):
+                    start = False      # pass through untouched
+                    return await send(message)
+                start = message
+                return
+            if start is False:
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._respond(start, b"".join(chunks), request_headers, send, etag)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _version_etag(self, scope) -> Optional[str]:
+        version_fn = self.versions.get(scope["path"])
+        if version_fn is None:
+            return None
+        try:
+            version = await version_fn(scope)
+        except Exception:
+            return None   # the content hash still works
+        if version is None:
+            return None
+        # Path and query are part of the tag: one version covers several endpoints
+        return _etag(f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}|{version}".encode())
+
+    @staticmethod
+    def _cache_headers(etag: str) -> List[Tuple[bytes, bytes]]:
+        return [(b"etag", etag.encode()), (b"cache-control", b"private, no-cache"),
+                (b"vary", b"Authorization, Accept-Encoding")]
+
+    async def _respond(self, start: dict, body: bytes, request_headers, send, version_etag: Optional[str] = None):
+        # The version was read before the endpoint ran, so the body is at least that new;
+        # compressed bodies are still cached by content, which the version does not pin down
+        content_etag = _etag(body)
+        etag = version_etag or content_etag
+        headers = [(k, v) for k, v in start.get("headers", [])
+                   if k.lower() not in (b"content-length", b"etag", b"cache-control", b"vary")]
+        headers += self._cache_headers(etag)
+
+        if etag_matches(_header(request_headers, b"if-none-match"), etag):
+            metrics.inc("trendflow_http_not_modified_total", help="Read requests answered 304 Not Modified",
+                        source="content")
+            metrics.inc("trendflow_http_bytes_saved_total", len(body), help="Response body bytes not sent thanks to 304s and compression")
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [h for h in headers if h[0].lower() != b"content-type"]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = pick_encoding(_header(request_headers, b"accept-encoding")) if len(body) >= self.minimum_size else None
+        if encoding:
+            encoded = await self._encode(content_etag, body, encoding)
+            metrics.inc("trendflow_http_bytes_saved_total", len(body) - len(encoded))
+            body = encoded
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _encode(self, etag: str, body: bytes, encoding: str) -> bytes:
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._encoded.get(key)
+            if cached is not None:
+                self._encoded.move_to_end(key)
+                return cached
+        if len(body) > THREAD_MIN_BYTES:
+            encoded = await asyncio.to_thread(compress, body, encoding)
+        else:
+            encoded = compress(body, encoding)
+        with self._lock:
+            self._encoded[key] = encoded
+            while len(self._encoded) > ENCODED_CACHE_ENTRIES:
+                self._encoded.popitem(last=False)
+        return encoded
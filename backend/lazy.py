@@ -0,0 +1,63 @@
+import importlib
+import threading
+from typing import Any, Callable, Optional
+
+_UNSET = object()
+
+
+class LazyObject:
+    """
+    Stands in for a module-level object that is expensive to build (an LLM
+    client, the DB client, a compiled graph). `factory` runs on first use, once,
+    and every attribute access, call or truth test is forwarded to the result.
+
+    Module globals holding a LazyObject can still be replaced outright, which
+    is how the benchmarks swap in stand-ins.
+    """
+
+    __slots__ = ("_factory", "_value", "_lock", "_label")
+
+    def __init__(self, factory: Callable[[], Any], label: Optional[str] = None):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_value", _UNSET)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_label", label or getattr(factory, "__name__", "object"))
+
+    def _resolve(self):
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                value = self._value
+                if value is _UNSET:
+                    value = self._factory()
+                    object.__setattr__(self, "_value", value)
+        return value
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __repr__(self):
+        return repr(self._value) if self.loaded else f"<lazy {self._label}>"
+
+
+def lazy_import(module: str, name: str) -> LazyObject:
+    """`from module import name`, deferred until `name` is first used."""
+    return LazyObject(lambda: getattr(importlib.import_module(module), name), label=f"{module}.{name}")
+
+
+def lazy_module(name: str) -> LazyObject:
+    """`import name`, deferred until the first attribute access."""
+    return LazyObject(lambda: importlib.import_module(name), label=name)
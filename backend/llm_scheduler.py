@@ -0,0 +1,339 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from langchain_core.exceptions import ModelRateLimitError
+
+try:
+    from backend import deadline
+    from backend.telemetry import log_event, metrics, record_llm_retry
+except ImportError:
+    import deadline
+    from telemetry import log_event, metrics, record_llm_retry
+
+# --- PRIORITY CLASSES ---
+# Lower value is served first. Interactive generation (a user is waiting on the
+# request) always goes ahead of batch/background work queued for the same model.
+PRIORITIES = {"interactive": 0, "batch": 1, "background": 2}
+
+_priority: ContextVar[str] = ContextVar("trendflow_llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(name: str):
+    """Runs every LLM call inside the block with the given priority class."""
+    if name not in PRIORITIES:
+        raise ValueError(f"unknown priority class {name!r} (expected one of {sorted(PRIORITIES)})")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    if isinstance(error, ModelRateLimitError):
+        return True
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "ResourceExhausted" in type(error).__name__
+
+
+# --- ADAPTIVE LIMITER ---
+class AdaptiveLimiter:
+    """
+    Concurrency limit for one model, shared by every request in the process.
+
+    AIMD: each success below the latency target adds ~1 slot per window of
+    `limit` calls; a 429 cuts it by `decrease_ratio`, at most once per round trip (the
+    best recent latency, or `cooldown_s` before any call finished), so a burst
+    of 429s from the same overload counts once; a slow call (latency above
+    `latency_factor` x the best recent latency) trims it by 10%. The limit does
+    not grow again until a round trip after a decrease.
+    Waiters are served strictly by priority class, FIFO within a class.
+    A waiter with a timeout (what is left of its run's deadline) gives up
+    with DeadlineExceeded instead of holding its place.
+    """
+
+    def __init__(self, model: str, max_limit: int, min_limit: int = 1, initial: Optional[int] = None,
+                 cooldown_s: float = 2.0, latency_factor: float = 3.0, decrease_ratio: float = 0.7):
+        self.model = model
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max(min_limit, max_limit // 2))
+        self.cooldown_s = cooldown_s
+        self.latency_factor = latency_factor
+        self.decrease_ratio = decrease_ratio
+        self.in_flight = 0
+        self._baseline: Optional[float] = None   # decaying minimum of observed latency
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._waiters = []                       # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._publish()
+
+    def _publish(self):
+        metrics.set("trendflow_llm_concurrency_limit", round(self.limit, 2), help="Adaptive LLM concurrency limit", model=self.model)
+        metrics.set("trendflow_llm_in_flight", self.in_flight, help="LLM calls currently running", model=self.model)
+        metrics.set("trendflow_llm_queue_depth", len(self._waiters), help="LLM calls waiting for a slot", model=self.model)
+
+    def acquire(self, priority: str = "interactive", timeout: Optional[float] = None) -> float:
+        """Blocks until a slot is free for this caller, at most `timeout` seconds. Returns the time spent queued."""
+        start = time.perf_counter()
+        ticket = (PRIORITIES[priority], next(self._seq))
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            self._publish()
+            try:
+                while self._waiters[0] != ticket or self.in_flight >= int(self.limit):
+                    left = None if give_up is None else give_up - time.monotonic()
+                    if left is not None and left <= 0:
+                        metrics.inc("trendflow_llm_queue_timeouts_total", help="LLM calls that ran out of time queued",
+                                    model=self.model, priority=priority)
+                        raise deadline.DeadlineExceeded(f"no {self.model} slot within {timeout:.1f}s")
+                    self._cond.wait(left)
+                self.in_flight += 1
+            finally:
+                # Also when interrupted while waiting: a ticket left behind would block the queue
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._publish()
+                # The next waiter may also fit if the limit grew while we waited
+                self._cond.notify_all()
+        waited = time.perf_counter() - start
+        metrics.observe("trendflow_llm_queue_seconds", waited, help="Time LLM calls wait for a slot",
+                        model=self.model, priority=priority)
+        return waited
+
+    def _window(self) -> float:
+        """About one round trip: the limit changes at most once per window after a decrease."""
+        return max(0.05, self._baseline) if self._baseline is not None else self.cooldown_s
+
+    def release(self, outcome: str = "ok", latency_s: Optional[float] = None):
+        """outcome: "ok", "rate_limited" or "error" (no signal). `latency_s` is only
+        passed for calls of comparable size (not streams, whose length varies)."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            settled = now - self._last_decrease >= self._window()
+            if outcome == "rate_limited":
+                # Every call already in flight during an overload may 429; count the overload once
+                if settled:
+                    self._last_decrease = now
+                    self.limit = max(self.min_limit, self.limit * self.decrease_ratio)
+                    log_event("llm_limit_decrease", model=self.model, limit=round(self.limit, 2), reason="rate_limited")
+            elif outcome == "ok":
+                slow = False
+                if latency_s is not None:
+                    self._baseline = latency_s if self._baseline is None else min(latency_s, self._baseline * 1.05)
+                    slow = latency_s > self._baseline * self.latency_factor
+                if slow and settled:
+                    self._last_decrease = now
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                elif not slow and settled:
+                    self.limit = min(self.max_limit, self.limit + 1 / max(self.limit, 1))
+            self._publish()
+            self._cond.notify_all()
+
+
+def _parse_limits(raw: str) -> Dict[str, int]:
+    limits = {}
+    for part in raw.split(","):
+        if "=" in part:
+            model, value = part.split("=", 1)
+            limits[model.strip()] = int(value)
+    return limits
+
+
+# "model=max,model=max"; unknown models get TRENDFLOW_LLM_DEFAULT_CONCURRENCY
+MAX_CONCURRENCY = _parse_limits(os.getenv("TRENDFLOW_LLM_MAX_CONCURRENCY", "gemini-2.5-flash=32,gemini-2.5-pro=8"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("TRENDFLOW_LLM_DEFAULT_CONCURRENCY", "8"))
+MAX_REQUEUES = int(os.getenv("TRENDFLOW_LLM_MAX_REQUEUES", "4"))
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(model: str) -> AdaptiveLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = AdaptiveLimiter(model, MAX_CONCURRENCY.get(model, DEFAULT_MAX_CONCURRENCY))
+        return limiter
+
+
+def snapshot() -> dict:
+    """Current limit, in-flight calls and queue depth per model."""
+    with _limiters_lock:
+        return {
+            model: {"limit": round(l.limit, 2), "max_limit": l.max_limit, "in_flight": l.in_flight, "queued": len(l._waiters)}
+            for model, l in _limiters.items()
+        }
+
+
+async def _acquire_async(limiter: AdaptiveLimiter, priority: str, timeout: Optional[float] = None) -> float:
+    """
+    acquire() for coroutines. It blocks on a condition variable, so it waits in a
+    thread, which cannot be interrupted: if the caller is cancelled meanwhile,
+    the slot the thread goes on to take is released as soon as it has it.
+    """
+    waiting = asyncio.ensure_future(asyncio.to_thread(limiter.acquire, priority, timeout))
+    try:
+        return await asyncio.shield(waiting)
+    except asyncio.CancelledError:
+        waiting.add_done_callback(lambda f: f.cancelled() or f.exception() is not None or limiter.release("error"))
+        raise
+
+
+def _backoff(attempt: int) -> float:
+    # Short: the limiter already keeps the re-queued call from piling onto the overload
+    return min(4.0, 0.1 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _budget() -> Optional[float]:
+    """Seconds the run has left to queue for a slot (None without a deadline)."""
+    left = deadline.remaining()
+    if left is not None and left <= 0:
+        raise deadline.DeadlineExceeded("time budget spent before the LLM call")
+    return left
+
+
+def _check_budget(error: Exception, delay: float = 0.0):
+    """Turns a failed call into DeadlineExceeded once the budget is spent, or cannot cover `delay` more."""
+    if deadline.low(delay) and not isinstance(error, deadline.DeadlineExceeded):
+        raise deadline.DeadlineExceeded(f"time budget spent: {error}") from error
+
+
+# --- GOVERNED CHAT MODELS ---
+class GovernedChatModelMixin:
+    """
+    Routes every generation through the process-wide limiter of its model.
+    Mixed in ahead of a LangChain chat model class (see `governed`), so
+    structured output, streaming and callbacks keep working unchanged.
+
+    A 429 shrinks the shared limit and the call is re-queued with backoff,
+    instead of every request retrying against the quota on its own. Each
+    re-queue counts as a retry of the call in telemetry. The methods name
+    run_manager explicitly: LangChain only passes it to signatures that do.
+
+    Under a run deadline (deadline.py) the queue wait and, for clients with a
+    `timeout` field, the request itself are cut to the time left; a call that
+    fails once the budget is spent raises DeadlineExceeded.
+    """
+
+    def _governor(self) -> AdaptiveLimiter:
+        return limiter_for(getattr(self, "model", None) or type(self).__name__)
+
+    def _call_kwargs(self, kwargs: dict) -> dict:
+        """kwargs with the request timeout cut to what is left of the run's deadline."""
+        left = deadline.remaining()
+        if left is None or "timeout" not in type(self).model_fields:
+            return kwargs
+        cap = kwargs.get("timeout") or getattr(self, "timeout", None) or left
+        return {**kwargs, "timeout": max(deadline.MIN_TIMEOUT_S, min(cap, left))}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = self._governor()
+        priority = current_priority()
+        for attempt in range(MAX_REQUEUES + 1):
+            limiter.acquire(priority, _budget())
+            start = time.perf_counter()
+            try:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **self._call_kwargs(kwargs))
+            except Exception as e:
+                limited = is_rate_limited(e)
+                limiter.release("rate_limited" if limited else "error")
+                _check_budget(e)
+                if not limited or attempt == MAX_REQUEUES:
+                    raise
+                delay = _backoff(attempt)
+                _check_budget(e, delay)
+                metrics.inc("trendflow_llm_requeues_total", help="LLM calls re-queued after a 429", model=limiter.model)
+                record_llm_retry(run_manager)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release("error")
+                raise
+            limiter.release("ok", latency_s=time.perf_counter() - start)
+            return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = self._governor()
+        priority = current_priority()
+        for attempt in range(MAX_REQUEUES + 1):
+            limiter.acquire(priority, _budget())
+            started_output = False
+            try:
+                for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **self._call_kwargs(kwargs)):
+                    started_output = True
+                    yield chunk
+            except Exception as e:
+                limited = is_rate_limited(e)
+                limiter.release("rate_limited" if limited else "error")
+                _check_budget(e)
+                # Once tokens went out we cannot replay the call transparently
+                if not limited or started_output or attempt == MAX_REQUEUES:
+                    raise
+                delay = _backoff(attempt)
+                _check_budget(e, delay)
+                metrics.inc("trendflow_llm_requeues_total", help="LLM calls re-queued after a 429", model=limiter.model)
+                record_llm_retry(run_manager)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # GeneratorExit (consumer stopped early) and friends: just free the slot
+                limiter.release("error")
+                raise
+            limiter.release("ok")
+            return
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = self._governor()
+        priority = current_priority()
+        for attempt in range(MAX_REQUEUES + 1):
+            await _acquire_async(limiter, priority, _budget())
+            start = time.perf_counter()
+            try:
+                result = await super()._agenerate(messages, stop=stop, run_manager=run_manager,
+                                                  **self._call_kwargs(kwargs))
+            except Exception as e:
+                limited = is_rate_limited(e)
+                limiter.release("rate_limited" if limited else "error")
+                _check_budget(e)
+                if not limited or attempt == MAX_REQUEUES:
+                    raise
+                delay = _backoff(attempt)
+                _check_budget(e, delay)
+                metrics.inc("trendflow_llm_requeues_total", help="LLM calls re-queued after a 429", model=limiter.model)
+                record_llm_retry(run_manager)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                limiter.release("error")
+                raise
+            limiter.release("ok", latency_s=time.perf_counter() - start)
+            return result
+
+
+_governed_classes: Dict[type, type] = {}
+
+
+def governed(model_cls: type) -> type:
+    """Returns `model_cls` with GovernedChatModelMixin applied (cached per class)."""
+    cls = _governed_classes.get(model_cls)
+    if cls is None:
+        cls = type(f"Governed{model_cls.__name__}", (GovernedChatModelMixin, model_cls), {"__module__": __name__})
+        _governed_classes[model_cls] = cls
+    return cls
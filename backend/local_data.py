@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+# Local state (feed store, ...) lives outside the code tree: the container image
+# runs as a non-root user that cannot write to /app.
+DATA_DIR = os.getenv("TRENDFLOW_DATA_DIR", os.path.join(os.path.expanduser("~"), ".trendflow"))
+
+
+def data_path(name: str) -> str:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """SQLite connection shared across threads (callers serialise access with their own lock)."""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
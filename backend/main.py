@@ -1,12 +1,17 @@
 import os
+import json
 import requests
 import httpx
 import asyncio
-from fastapi import FastAPI, HTTPException, Depends, status
+import time
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Any
-from supabase import create_client, Client
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Any, Set, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,14 +19,112 @@ load_dotenv()
 load_dotenv(".env.local") # Always try to load .env.local to pick up new keys like HASHNODE_TOKEN
 
 try:
-    from backend.agents import app_graph
-    from backend.news_fetcher import fetch_structured_news
+    from backend.agents import app_graph, critique_draft, package_for_distribution
+    from backend.blob_store import blob_store, resolve_state
+    from backend.deadline import DEFAULT_BUDGET_S, DeadlineExceeded, time_budget
+    from backend.news_fetcher import fetch_news_cached
+    from backend.telemetry import configure_logging, log_event, metrics, record_cache, trace_run
+    from backend.diagnostics import RouteTaggingMiddleware, loop_diagnostics
+    from backend.http_cache import ConditionalResponseMiddleware, json_response
+    from backend import autopilot, feeds, llm_scheduler, news_stream, outbox, post_stats, provider_stats, topic_index, trends
+    from backend.lazy import LazyObject
+    from backend.local_data import data_path
+    from backend.shared_cache import LeaderLease, allow, cached, invalidate, lookup, shared_cache, store
 except ImportError:
-    from agents import app_graph
-    from news_fetcher import fetch_structured_news
+    from agents import app_graph, critique_draft, package_for_distribution
+    from blob_store import blob_store, resolve_state
+    from deadline import DEFAULT_BUDGET_S, DeadlineExceeded, time_budget
+    from news_fetcher import fetch_news_cached
+    from telemetry import configure_logging, log_event, metrics, record_cache, trace_run
+    from diagnostics import RouteTaggingMiddleware, loop_diagnostics
+    from http_cache import ConditionalResponseMiddleware, json_response
+    import autopilot
+    import feeds
+    import llm_scheduler
+    import news_stream
+    import outbox
+    import post_stats
+    import provider_stats
+    import topic_index
+    import trends
+    from lazy import LazyObject
+    from local_data import data_path
+    from shared_cache import LeaderLease, allow, cached, invalidate, lookup, shared_cache, store
+
+configure_logging()
+
+# Startup prewarming (TRENDFLOW_PREWARM=0 to disable)
+PREWARM = os.getenv("TRENDFLOW_PREWARM", "1") == "1"
+# Topics whose news the lease holder puts in the shared cache at startup (the dashboard's topic list)
+PREWARM_TOPICS = [t.strip() for t in os.getenv("TRENDFLOW_PREWARM_TOPICS", "Technology,AI,Crypto,Startup").split(",") if t.strip()]
+
+async def start_background_jobs():
+    # RSS/Atom poller feeding the local news store (TRENDFLOW_FEED_POLLING=0 to disable)
+    if feeds.FEED_POLLING:
+        feeds.feed_poller.start()
+    # Writes generated posts to Supabase in the background (only needed once Supabase is configured)
+    if supabase:
+        post_outbox.start()
+    if PREWARM:
+        background_jobs.append(asyncio.create_task(prewarm_news()))
+    # Scheduled generations in the off-peak windows (TRENDFLOW_AUTOPILOT=0 to disable)
+    if autopilot.AUTOPILOT:
+        autopilot_runner.start()
+
+async def stop_background_jobs():
+    while background_jobs:
+        background_jobs.pop().cancel()
+    if feeds.FEED_POLLING:
+        await feeds.feed_poller.stop()
+    if autopilot.AUTOPILOT:
+        await autopilot_runner.stop()
+    if supabase:
+        await post_outbox.stop()
+
+background_jobs: List[asyncio.Task] = []
+
+# With several workers, the jobs above run on whichever one holds this lease
+background_lease = LeaderLease("background", start_background_jobs, stop_background_jobs)
+
+async def prewarm():
+    """
+    Builds what the first requests would otherwise wait for (the Supabase
+    client, the compiled graph, the local stores) in threads, once the worker
+    is already accepting connections.
+    """
+    start = time.perf_counter()
+    for target in (supabase, app_graph, feeds.feed_store, trends.trend_engine, topic_index.topic_index,
+                   blob_store, provider_stats.provider_stats, autopilot.schedule_store):
+        try:
+            await asyncio.to_thread(bool, target)  # a truth test resolves a LazyObject
+        except Exception as e:
+            log_event("prewarm_failed", target=repr(target), error=str(e)[:200])
+    log_event("prewarm_done", seconds=round(time.perf_counter() - start, 3))
+
+async def prewarm_news():
+    """Fills the shared news cache for PREWARM_TOPICS, at the size the live feed asks for."""
+    await asyncio.gather(*(fetch_news_cached(topic, news_stream.STREAM_LIMIT) for topic in PREWARM_TOPICS),
+                         return_exceptions=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Opt-in: TRENDFLOW_LOOP_DIAGNOSTICS=1
+    if loop_diagnostics.enabled:
+        loop_diagnostics.start(asyncio.get_running_loop())
+    background_lease.start()
+    warming = asyncio.create_task(prewarm()) if PREWARM else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    # Streamed generations outlive their client; let running ones reach the outbox
+    if streamed_generations:
+        await asyncio.wait(streamed_generations, timeout=GENERATION_DRAIN_S)
+    await background_lease.stop()
+    await news_stream.news_hub.close()
+    loop_diagnostics.stop()
 
 # Initialize FastAPI
-app = FastAPI(title="TrendFlow Backend")
+app = FastAPI(title="TrendFlow Backend", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -32,24 +135,71 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Supabase
+# Tags each request task with its route so loop stalls can be attributed (no-op unless diagnostics are on)
+app.add_middleware(RouteTaggingMiddleware, detector=loop_diagnostics)
+
+async def posts_version(scope) -> Optional[str]:
+    """
+    Version of the caller's posts for /posts and /posts/stats ETags: the
+    post_stats change counter (migration_post_stats.sql) plus the posts still
+    in the outbox. One primary-key read instead of the post list. None (use
+    the content hash) without Supabase, a valid token or a counter row.
+    """
+    if not supabase:
+        return None
+    authorization = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"authorization"), "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except jwt.JWTError:
+        return None
+    if not user_id:
+        return None
+    response = await asyncio.to_thread(supabase.table("post_stats").select("version").eq("user_id", user_id).execute)
+    if not response.data or response.data[0].get("version") is None:
+        return None
+    pending = await asyncio.to_thread(post_outbox.fingerprint, user_id)
+    return f"{user_id}:{response.data[0]['version']}:{pending}"
+
+# ETag / 304 and gzip or brotli for the read endpoints the dashboard polls.
+# Posts are versioned, so an unchanged library is answered 304 before it is queried.
+app.add_middleware(ConditionalResponseMiddleware, paths=["/posts", "/posts/stats", "/news", "/analytics", "/trends"],
+                   versions={"/posts": posts_version, "/posts/stats": posts_version})
+
+# Publishing platforms (overridable to point at staging or local stand-ins)
+DEVTO_API_URL = os.getenv("DEVTO_API_URL", "https://dev.to/api")
+HASHNODE_API_URL = os.getenv("HASHNODE_API_URL", "https://gql.hashnode.com")
+
+# Initialize Supabase (on first use, so requests that never touch the DB don't wait for it)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY or "PLACEHOLDER" in SUPABASE_URL:
-    print("Warning: SUPABASE_URL or SUPABASE_KEY not set or is a placeholder.")
-    supabase = None
-else:
+def create_supabase():
+    if not SUPABASE_URL or not SUPABASE_KEY or "PLACEHOLDER" in SUPABASE_URL:
+        print("Warning: SUPABASE_URL or SUPABASE_KEY not set or is a placeholder.")
+        return None
     try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        from supabase import create_client
+        return create_client(SUPABASE_URL, SUPABASE_KEY)
     except Exception as e:
         print(f"Warning: Failed to initialize Supabase client: {e}")
-        supabase = None
+        return None
+
+# Falsy until configured, like before: endpoints keep their `if not supabase` checks
+supabase = LazyObject(create_supabase, label="supabase")
+
+# Generated posts land here first and reach Supabase from a background flusher
+post_outbox = LazyObject(
+    lambda: outbox.PostOutbox(outbox.OUTBOX_DB_PATH or data_path("outbox.sqlite3"), lambda: supabase),
+    label="post_outbox",
+)
 
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 from jose import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # ... existing code ...
 
@@ -90,13 +240,63 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except jwt.JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+# Requests per minute, counted across all workers (0 disables)
+AUTH_RATE_LIMIT = int(os.getenv("TRENDFLOW_AUTH_RATE_LIMIT", "20"))            # per client IP
+NEWS_RATE_LIMIT = int(os.getenv("TRENDFLOW_NEWS_RATE_LIMIT", "120"))           # per client IP
+ANALYTICS_RATE_LIMIT = int(os.getenv("TRENDFLOW_ANALYTICS_RATE_LIMIT", "30"))  # platform fetches per user
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy this is only the real client if FORWARDED_ALLOW_IPS trusts the proxy
+    return request.client.host if request.client else "unknown"
+
+async def rate_limit(bucket: str, key: str, limit: int):
+    if not await allow(bucket, key, limit):
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests, try again in a minute")
+
+GOOGLE_CERTS_TTL_S = 3600  # Google rotates its signing keys over days
+USER_CACHE_TTL_S = 3600
+
+class SharedCertsRequest:
+    """
+    google-auth transport that serves Google's public signing certs from the
+    shared cache: once any worker has fetched them, verifying a sign-in makes
+    no outbound request.
+    """
+
+    def __init__(self):
+        self._request = google_requests.Request()
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+        key = f"google_certs:{url}"
+        try:
+            data = shared_cache.get(key)
+        except Exception:
+            data = None
+        record_cache("google_certs", data is not None)
+        if data is None:
+            response = self._request(url, method=method, headers=headers, timeout=timeout, **kwargs)
+            if response.status != 200:
+                return response
+            data = response.data.decode("utf-8")
+            try:
+                shared_cache.set(key, data, GOOGLE_CERTS_TTL_S)
+            except Exception:
+                pass
+        return SimpleNamespace(status=200, headers={}, data=data.encode("utf-8"))
+
+google_certs_request = SharedCertsRequest()
+
 @app.post("/auth/google")
-async def google_auth(request: GoogleAuthRequest):
+async def google_auth(request: GoogleAuthRequest, http_request: Request):
+    await rate_limit("auth", client_ip(http_request), AUTH_RATE_LIMIT)
     try:
-        # Verify the token with Google
-        idinfo = id_token.verify_oauth2_token(
-            request.credential, 
-            google_requests.Request(), 
+        # Verify the token with Google (in a thread: it may fetch Google's certs)
+        idinfo = await asyncio.to_thread(
+            id_token.verify_oauth2_token,
+            request.credential,
+            google_certs_request,
             clock_skew_in_seconds=10
         )
 
@@ -109,7 +309,13 @@ async def google_auth(request: GoogleAuthRequest):
         # Check/Create user in Supabase
         user_id = google_id # Default to Google ID if DB fails
         
-        if supabase:
+        # A returning user whose profile hasn't changed needs no database round trip
+        user_key = f"auth:user:{email}"
+        known = await lookup(user_key) if supabase else None
+        record_cache("auth_user", known is not None)
+        if known and known.get("full_name") == name and known.get("avatar_url") == picture:
+            user_id = known["id"]
+        elif supabase:
             try:
                 # Check if user exists
                 existing = supabase.table("users").select("*").eq("email", email).execute()
@@ -129,6 +335,7 @@ async def google_auth(request: GoogleAuthRequest):
                         "avatar_url": picture
                     }).execute()
                     user_id = new_user.data[0]['id']
+                await store(user_key, {"id": user_id, "full_name": name, "avatar_url": picture}, USER_CACHE_TTL_S)
             except Exception as e:
                 print(f"Database auth error: {e}")
                 # Continue without DB persistence if it fails (fallback mode)
@@ -197,6 +404,8 @@ async def update_user_settings(settings: UserSettings, user_id: str = Depends(ge
             return {"message": "No changes"}
             
         supabase.table("users").update(update_data).eq("id", user_id).execute()
+        # New keys may mean different platforms: don't serve analytics fetched with the old ones
+        await invalidate(f"analytics:{user_id}")
         return {"message": "Settings updated"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -204,6 +413,20 @@ async def update_user_settings(settings: UserSettings, user_id: str = Depends(ge
 # Request Models
 class BlogRequest(BaseModel):
     topic: str
+    # Near-identical topic generated recently (topic_index.py): "auto" offers the user's own post,
+    # else reuses its research; "research" always generates, reusing research; "none" starts from scratch
+    reuse: Literal["auto", "research", "none"] = "auto"
+    # Seconds the whole generation may take; near it, steps degrade (deadline.py) and the
+    # response lists which ones under "degradations"
+    deadline_s: Optional[float] = Field(None, gt=0)
+
+class ScheduleRequest(BaseModel):
+    # "topic": a post on `topic` every `every_hours`; "trends": a post on the top rising trend
+    # (containing `match`, if set) the user has not written about lately
+    kind: Literal["topic", "trends"] = "topic"
+    topic: Optional[str] = None
+    match: Optional[str] = None
+    every_hours: float = Field(24, ge=1)
 
 class PostUpdate(BaseModel):
     title: Optional[str] = None
@@ -218,8 +441,19 @@ class PostUpdate(BaseModel):
     critique_notes: Optional[str] = None
     image_prompt: Optional[str] = None
 
+# Platform stats move slowly; every worker serves the same copy for this long
+ANALYTICS_CACHE_TTL_S = float(os.getenv("TRENDFLOW_ANALYTICS_CACHE_TTL", "300"))
+
 @app.get("/analytics")
 async def get_analytics(user_id: str = Depends(get_current_user)):
+    async def refresh():
+        # Only calls to dev.to / Hashnode count against the limit, not cached reads
+        await rate_limit("analytics", user_id, ANALYTICS_RATE_LIMIT)
+        return await collect_analytics(user_id)
+
+    return await cached("analytics", user_id, ANALYTICS_CACHE_TTL_S, refresh)
+
+async def collect_analytics(user_id: str) -> dict:
     analytics_data = {
         "devto": [],
         "hashnode": [],
@@ -246,7 +480,7 @@ async def get_analytics(user_id: str = Depends(get_current_user)):
     async def fetch_devto(client):
         if not devto_key: return []
         try:
-            resp = await client.get("https://dev.to/api/articles/me/published", headers={"api-key": devto_key})
+            resp = await client.get(f"{DEVTO_API_URL}/articles/me/published", headers={"api-key": devto_key})
             return resp.json() if resp.status_code == 200 else []
         except Exception as e:
             print(f"Dev.to Analytics Error: {e}")
@@ -274,7 +508,7 @@ async def get_analytics(user_id: str = Depends(get_current_user)):
             }
             """
             resp = await client.post(
-                "https://gql.hashnode.com", 
+                HASHNODE_API_URL,
                 json={"query": query, "variables": {"publicationId": hashnode_pub_id}}, 
                 headers={"Authorization": hashnode_token, "Content-Type": "application/json"}
             )
@@ -327,14 +561,112 @@ async def get_analytics(user_id: str = Depends(get_current_user)):
 
     return analytics_data
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint for node, provider and LLM timings."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Admin endpoints are only reachable when ADMIN_TOKEN is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+@app.get("/admin/diagnostics/blockers", dependencies=[Depends(require_admin)])
+async def get_loop_blockers(limit: int = 20, reset: bool = False):
+    """Top event-loop blockers, aggregated by route and culprit frame."""
+    report = loop_diagnostics.report(limit)
+    if reset:
+        loop_diagnostics.reset()
+    return report
+
+@app.get("/admin/diagnostics/llm", dependencies=[Depends(require_admin)])
+async def get_llm_scheduler():
+    """Adaptive concurrency limit, in-flight calls and queue depth per Gemini model."""
+    return llm_scheduler.snapshot()
+
+@app.get("/admin/diagnostics/feeds", dependencies=[Depends(require_admin)])
+async def get_feed_store():
+    """Entries in the local feed store and the polling state of every feed."""
+    return await asyncio.to_thread(feeds.feed_store.stats)
+
+@app.get("/admin/diagnostics/outbox", dependencies=[Depends(require_admin)])
+async def get_post_outbox():
+    """Generated posts not yet written to Supabase, and the errors holding them back."""
+    return await asyncio.to_thread(post_outbox.stats)
+
+@app.get("/admin/diagnostics/cache", dependencies=[Depends(require_admin)])
+async def get_shared_cache():
+    """Backend and size of the cache shared by the workers, and who holds the background-jobs lease."""
+    report = await asyncio.to_thread(shared_cache.stats)
+    report["background_lease"] = {"held_here": background_lease.held, "worker": os.getpid()}
+    return report
+
+@app.get("/admin/diagnostics/topics", dependencies=[Depends(require_admin)])
+async def get_topic_index():
+    """Recent generations available for reuse (topic_index.py)."""
+    return await asyncio.to_thread(topic_index.topic_index.stats)
+
+@app.get("/admin/diagnostics/blobs", dependencies=[Depends(require_admin)])
+async def get_blob_store():
+    """Size of the blob store behind graph state references, and how much of it is cached decoded."""
+    return await asyncio.to_thread(blob_store.stats)
+
+@app.get("/admin/diagnostics/providers", dependencies=[Depends(require_admin)])
+async def get_provider_stats():
+    """Per topic category: each news provider's latency, yield and error rate as the research planner sees them."""
+    return await asyncio.to_thread(provider_stats.provider_stats.stats)
+
+@app.get("/admin/diagnostics/autopilot", dependencies=[Depends(require_admin)])
+async def get_autopilot():
+    """Off-peak windows, today's scheduled generations by outcome and the daily budgets."""
+    return await asyncio.to_thread(autopilot_runner.stats)
+
 @app.get("/news")
-async def get_news(topic: str = "Technology", limit: int = 5):
+async def get_news(request: Request, topic: str = "Technology", limit: int = 5):
+    await rate_limit("news", client_ip(request), NEWS_RATE_LIMIT)
     try:
-        news = await fetch_structured_news(topic, limit)
-        return news
+        news = await fetch_news_cached(topic, limit)
+        return json_response(news)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/news/stream")
+async def stream_news(request: Request, topic: str = "Technology", limit: int = news_stream.STREAM_LIMIT):
+    """
+    Live news for a topic as Server-Sent Events: `snapshot` with the current
+    items, then `news` with only new, deduplicated items as they appear. All
+    clients on a topic share one upstream refresher.
+    """
+    ip = client_ip(request)
+    await rate_limit("news", ip, NEWS_RATE_LIMIT)
+    hub = news_stream.news_hub
+    if hub.client_full(ip):
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many live news streams open")
+    if not hub.accepts(topic, ip):
+        raise HTTPException(status_code=503, detail="Too many live topics, try again shortly")
+
+    async def event_stream():
+        try:
+            async for event, items in news_stream.news_events(hub, topic, min(max(limit, 1), news_stream.STREAM_LIMIT), ip):
+                yield sse_event(event, items) if event else ": keep-alive\n\n"
+        except news_stream.TooManyStreams:
+            yield sse_event("error", {"detail": "Too many live news streams open"})
+        except news_stream.TooManyTopics:
+            yield sse_event("error", {"detail": "Too many live topics, try again shortly"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/trends")
+async def get_trends(limit: int = 10):
+    """Topics rising fastest across recently fetched news, for picking what to write about."""
+    return await asyncio.to_thread(trends.trend_engine.rising, min(max(limit, 1), 50))
+
 @app.get("/posts")
 
 @app.get("/posts")
@@ -344,10 +676,52 @@ async def get_posts(user_id: str = Depends(get_current_user)):
     try:
         # Filter posts by user_id
         response = supabase.table("posts").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-        return response.data
+        posts = response.data
     except Exception as e:
         print(f"Error fetching posts: {e}")
-        return []
+        posts = []
+    # Posts still waiting in the outbox are the user's newest; an id can be in both right after a flush
+    pending = await asyncio.to_thread(post_outbox.pending_for, user_id)
+    if pending:
+        flushed = {p.get("id") for p in posts}
+        posts = sorted([p for p in pending if p["id"] not in flushed] + posts,
+                       key=lambda p: p.get("created_at") or "", reverse=True)
+    return json_response(posts)
+
+@app.get("/posts/stats")
+async def get_post_stats(user_id: str = Depends(get_current_user)):
+    """
+    Post counts by status, average viral score and last publish time: one
+    post_stats row kept current by triggers (migration_post_stats.sql), plus
+    the posts still in the outbox.
+    """
+    if not supabase:
+        return post_stats.render(None)
+    try:
+        flushed = None
+        try:
+            # Blocking client: every round trip runs off the event loop
+            response = await asyncio.to_thread(supabase.table("post_stats").select("*").eq("user_id", user_id).execute)
+            stats = response.data[0] if response.data else None
+        except Exception as e:
+            print(f"post_stats unavailable, counting posts instead (run migration_post_stats.sql): {e}")
+            response = await asyncio.to_thread(
+                supabase.table("posts").select("id, status, viral_score, updated_at").eq("user_id", user_id).execute)
+            stats = post_stats.from_posts(response.data)
+            flushed = {p["id"] for p in response.data}
+        pending = await asyncio.to_thread(post_outbox.pending_for, user_id)
+        if pending:
+            # Right after a flush a post is already in Supabase (and post_stats) but still in the outbox
+            if flushed is None:
+                response = await asyncio.to_thread(
+                    supabase.table("posts").select("id").eq("user_id", user_id).in_("id", [p["id"] for p in pending]).execute)
+                flushed = {p["id"] for p in response.data}
+            pending = [p for p in pending if p["id"] not in flushed]
+        if pending:
+            stats = post_stats.combine(stats or post_stats.empty(), post_stats.from_posts(pending))
+        return post_stats.render(stats, pending=len(pending))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/posts/{post_id}")
 async def update_post(post_id: str, post: PostUpdate, user_id: str = Depends(get_current_user)):
@@ -356,6 +730,9 @@ async def update_post(post_id: str, post: PostUpdate, user_id: str = Depends(get
     try:
         # Filter out None values
         update_data = {k: v for k, v in post.dict().items() if v is not None}
+        pending = await asyncio.to_thread(post_outbox.update, post_id, user_id, update_data)
+        if pending is not None:
+            return [pending]
         # Ensure user owns the post
         response = supabase.table("posts").update(update_data).eq("id", post_id).eq("user_id", user_id).execute()
         return response.data
@@ -367,11 +744,57 @@ async def delete_post(post_id: str, user_id: str = Depends(get_current_user)):
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not configured")
     try:
+        await asyncio.to_thread(post_outbox.discard, post_id, user_id)
         response = supabase.table("posts").delete().eq("id", post_id).eq("user_id", user_id).execute()
         return {"message": "Post deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_post(post_id: str, user_id: str) -> Optional[dict]:
+    """The user's post, from the outbox if it is still pending there; None if there is no such post."""
+    post = await asyncio.to_thread(post_outbox.get, post_id, user_id)
+    if post is not None:
+        return post
+    response = supabase.table("posts").select("*").eq("id", post_id).eq("user_id", user_id).execute()
+    return response.data[0] if response.data else None
+
+@app.post("/posts/{post_id}/rerun/{stage}")
+async def rerun_post_stage(post_id: str, stage: str, user_id: str = Depends(get_current_user)):
+    """
+    Re-runs one pipeline stage against the saved post and stores the result:
+    `seo` repackages the current content_markdown (title, tags, meta
+    description, image prompt), `editor` re-critiques it.
+    """
+    rerun = RERUN_STAGES.get(stage)
+    if rerun is None:
+        raise HTTPException(status_code=404, detail=f"Unknown stage '{stage}' (expected one of: {', '.join(RERUN_STAGES)})")
+    if not supabase:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    post = await load_post(post_id, user_id)
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if not post.get("content_markdown"):
+        raise HTTPException(status_code=400, detail="Post has no content to re-run against")
+
+    try:
+        with trace_run() as run:
+            changes = await asyncio.to_thread(rerun, post)
+        updated = await asyncio.to_thread(post_outbox.update, post_id, user_id, changes)
+        if updated is None:
+            response = supabase.table("posts").update(changes).eq("id", post_id).eq("user_id", user_id).execute()
+            updated = response.data[0] if response.data else {**post, **changes}
+        return {"status": "success", "stage": stage, "data": updated, "trace": run.summary()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def ensure_post_saved(post_id: str, user_id: str):
+    """Flushes a post that is still in the outbox; 409 if Supabase won't take it yet."""
+    if await asyncio.to_thread(post_outbox.get, post_id, user_id) is None:
+        return
+    if not await post_outbox.flush_post(post_id):
+        raise HTTPException(status_code=409, detail="Post is still being saved, try again shortly")
+
 @app.post("/posts/{post_id}/publish")
 async def publish_post_to_devto(post_id: str, user_id: str = Depends(get_current_user)):
     if not supabase:
@@ -390,6 +813,9 @@ async def publish_post_to_devto(post_id: str, user_id: str = Depends(get_current
     if not devto_key:
         raise HTTPException(status_code=400, detail="Dev.to API Key not configured in Settings")
 
+    # A post still in the outbox has to reach Supabase before it can be marked published
+    await ensure_post_saved(post_id, user_id)
+
     try:
         # 1. Fetch the post
         response = supabase.table("posts").select("*").eq("id", post_id).eq("user_id", user_id).execute()
@@ -433,7 +859,7 @@ async def publish_post_to_devto(post_id: str, user_id: str = Depends(get_current
         }
         
         print(f"Sending payload to Dev.to: {article_payload}")
-        devto_res = requests.post("https://dev.to/api/articles", json=article_payload, headers=headers)
+        devto_res = requests.post(f"{DEVTO_API_URL}/articles", json=article_payload, headers=headers)
         
         if devto_res.status_code == 201:
             # 4. Update local status
@@ -468,6 +894,9 @@ async def publish_post_to_hashnode(post_id: str, user_id: str = Depends(get_curr
         print(f"❌ Hashnode Config Missing. Token: {'Set' if token else 'Missing'}, Pub ID: {'Set' if pub_id else 'Missing'}")
         raise HTTPException(status_code=400, detail="Hashnode Token or Publication ID not configured in Settings")
 
+    # A post still in the outbox has to reach Supabase before it can be marked published
+    await ensure_post_saved(post_id, user_id)
+
     try:
         # 1. Fetch the post
         response = supabase.table("posts").select("*").eq("id", post_id).eq("user_id", user_id).execute()
@@ -490,7 +919,7 @@ async def publish_post_to_hashnode(post_id: str, user_id: str = Depends(get_curr
         
         formatted_tags = formatted_tags[:5] # Limit to 5
 
-        url = "https://gql.hashnode.com"
+        url = HASHNODE_API_URL
         headers = {
             "Authorization": os.getenv("HASHNODE_TOKEN"),
             "Content-Type": "application/json"
@@ -538,60 +967,296 @@ async def publish_post_to_hashnode(post_id: str, user_id: str = Depends(get_curr
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Posts carry topic, research_summary, distribution and editor_score (migration_pipeline_state.sql)
+PIPELINE_STATE_COLUMNS = os.getenv("TRENDFLOW_PIPELINE_STATE_COLUMNS", "0") == "1"
+
+def metadata_columns(metadata: dict, topic: str) -> dict:
+    """The `posts` columns that come from the SEO node's DistributionPackage."""
+    columns = {
+        "title": metadata.get("title_viral", f"Deep Dive: {topic}"),
+        "reading_time_min": metadata.get("reading_time", 5),
+        "seo_keywords": metadata.get("tags", []),
+        "meta_description": metadata.get("meta_description", ""),
+        "image_prompt": metadata.get("image_prompt_midjourney", "")
+    }
+    if PIPELINE_STATE_COLUMNS:
+        columns["distribution"] = metadata
+    return columns
+
+def build_post_data(final_state: dict, topic: str, user_id: str) -> dict:
+    """Maps the final graph state onto a `posts` row."""
+    # Extract metadata safely
+    metadata = final_state.get("final_metadata", {})
+
+    post_data = {
+        "user_id": user_id,
+        "content_markdown": final_state.get("draft", ""),
+        "status": "needs_review",
+        "viral_score": 85, # Default value as new SEO node doesn't generate score
+        "sentiment": "Neutral", # Default value
+        "target_audience": "General Tech", # Default value
+        "critique_notes": final_state.get("critique", "No critique generated"),
+        **metadata_columns(metadata, topic),
+    }
+    if PIPELINE_STATE_COLUMNS:
+        post_data["topic"] = final_state.get("topic") or topic
+        post_data["research_summary"] = final_state.get("research_summary")
+        post_data["editor_score"] = final_state.get("score")
+    return post_data
+
+def rerun_seo(post: dict) -> dict:
+    """New DistributionPackage for the saved draft: one Flash call."""
+    return metadata_columns(package_for_distribution(post["content_markdown"]), post.get("topic") or post.get("title") or "")
+
+def rerun_editor(post: dict) -> dict:
+    """Editor critique of the saved draft: the local gate, then at most one Flash call."""
+    review = critique_draft(post["content_markdown"], post.get("topic") or post.get("title") or "")
+    changes = {"critique_notes": review["critique"]}
+    if PIPELINE_STATE_COLUMNS:
+        changes["editor_score"] = review["score"]
+    return changes
+
+# Stages that can be re-run on a saved post, without research, writing or the refine loop
+RERUN_STAGES = {"seo": rerun_seo, "editor": rerun_editor}
+
+def save_generated_post(post_data: dict) -> dict:
+    """
+    Persists a generated post. Returns the response body minus graph state and trace.
+
+    The post is committed to the local outbox and returned with its final id
+    and created_at; the outbox flusher writes it to Supabase, retrying until
+    it lands, so a slow or failing database never delays or loses a post.
+    """
+    if supabase:
+        return {"status": "success", "data": post_outbox.enqueue(post_data)}
+    post_data["id"] = str(uuid.uuid4())
+    post_data["created_at"] = datetime.now(timezone.utc).isoformat()
+    return {"status": "success", "data": post_data, "message": "Supabase not configured, returning data directly."}
+
+async def plan_generation(request: BlogRequest, user_id: str) -> Tuple[dict, Optional[dict], Optional[dict]]:
+    """
+    Initial graph state for a generation, checked against recent generations
+    on near-identical topics (topic_index.py). Returns (initial_state, match
+    whose research seeds it, response offering the user's existing post instead).
+    """
+    initial_state = {
+        "topic": request.topic,
+        "revision_count": 0,
+        "is_approved": False
+    }
+    if not topic_index.TOPIC_REUSE or request.reuse == "none":
+        return initial_state, None, None
+    try:
+        match = await asyncio.to_thread(topic_index.topic_index.find, request.topic, user_id)
+    except Exception as e:
+        log_event("topic_index_error", error=str(e)[:200])
+        match = None
+    if match is None:
+        metrics.inc("trendflow_topic_reuse_total", help="Generation requests by recent-topic reuse", outcome="miss")
+        return initial_state, None, None
+
+    if request.reuse == "auto" and match["own"] and match["post_id"] and supabase:
+        try:
+            post = await load_post(match["post_id"], user_id)
+        except Exception as e:
+            log_event("topic_index_error", error=str(e)[:200])
+            post = None
+        if post is not None:
+            metrics.inc("trendflow_topic_reuse_total", help="Generation requests by recent-topic reuse", outcome="offered")
+            log_event("topic_reuse", outcome="offered", topic=request.topic, match=match["topic"], similarity=match["similarity"])
+            return initial_state, None, {
+                "status": "duplicate",
+                "data": post,
+                "match": {key: match[key] for key in ("topic", "similarity", "created_at")},
+            }
+    if not match["research_summary"]:
+        metrics.inc("trendflow_topic_reuse_total", help="Generation requests by recent-topic reuse", outcome="stale")
+        return initial_state, None, None
+
+    metrics.inc("trendflow_topic_reuse_total", help="Generation requests by recent-topic reuse", outcome="research")
+    log_event("topic_reuse", outcome="research", topic=request.topic, match=match["topic"], similarity=match["similarity"])
+    initial_state["research_summary"] = match["research_summary"]
+    initial_state["search_queries"] = match["search_queries"]
+    return initial_state, match, None
+
+def remember_generation(topic: str, user_id: str, final_state: dict, post: dict, reused: Optional[dict]):
+    """Adds a finished generation to the recent-topic index; never fails the request."""
+    try:
+        topic_index.topic_index.record(
+            topic, user_id, post.get("id"),
+            reused["research_topic"] if reused else final_state.get("topic"),
+            final_state.get("research_summary"), final_state.get("search_queries"),
+            researched_at=reused["researched_at"] if reused else None,
+        )
+    except Exception as e:
+        log_event("topic_index_error", error=str(e)[:200])
+
 @app.post("/generate-pro-blog")
 async def generate_pro_blog(request: BlogRequest, user_id: str = Depends(get_current_user)):
     try:
         print(f"Starting generation for topic: {request.topic} by user {user_id}")
         
-        # Initial State
-        initial_state = {
-            "topic": request.topic,
-            "revision_count": 0,
-            "is_approved": False
-        }
-        
-        # Run the Graph
-        final_state = app_graph.invoke(initial_state)
-        
-        # Extract metadata safely
-        metadata = final_state.get("final_metadata", {})
+        # Initial State (or the user's recent post on the same topic)
+        initial_state, reused, duplicate = await plan_generation(request, user_id)
+        if duplicate is not None:
+            return duplicate
         
-        # Prepare data for Supabase
-        post_data = {
-            "user_id": user_id,
-            "title": metadata.get("title_viral", f"Deep Dive: {request.topic}"),
-            "content_markdown": final_state.get("draft", ""),
-            "status": "needs_review",
-            "viral_score": 85, # Default value as new SEO node doesn't generate score
-            "sentiment": "Neutral", # Default value
-            "target_audience": "General Tech", # Default value
-            "reading_time_min": metadata.get("reading_time", 5),
-            "seo_keywords": metadata.get("tags", []),
-            "meta_description": metadata.get("meta_description", ""),
-            "critique_notes": final_state.get("critique", "No critique generated"),
-            "image_prompt": metadata.get("image_prompt_midjourney", "")
-        }
-        
-        # Insert into Supabase
-        if supabase:
-            try:
-                response = supabase.table("posts").insert(post_data).execute()
-                return {"status": "success", "data": response.data[0], "state": final_state}
-            except Exception as e:
-                print(f"Supabase Insert Failed: {e}")
-                # Fallback: Return the data anyway so the UI can display it
-                # We add a fake ID so the frontend doesn't crash
-                post_data["id"] = "temp-" + os.urandom(4).hex()
-                post_data["created_at"] = "2024-01-01T00:00:00Z"
-                return {"status": "partial_success", "data": post_data, "message": "Content generated but failed to save to DB (Table missing?)."}
-        else:
-            post_data["id"] = "temp-" + os.urandom(4).hex()
-            post_data["created_at"] = "2024-01-01T00:00:00Z"
-            return {"status": "success", "data": post_data, "message": "Supabase not configured, returning data directly."}
+        # Run the Graph (traced so the response carries a per-node timing summary).
+        # Off the event loop: the lease renewal, news streams and SSE keep-alives share it.
+        def run_graph():
+            with trace_run() as run, time_budget(request.deadline_s or DEFAULT_BUDGET_S):
+                # Drafts and research come back as blob references (blob_store.py)
+                final_state = resolve_state(app_graph.invoke(initial_state))
+            return final_state, run.summary()
+
+        final_state, run_summary = await asyncio.to_thread(run_graph)
 
+        result = await asyncio.to_thread(save_generated_post, build_post_data(final_state, request.topic, user_id))
+        await asyncio.to_thread(remember_generation, request.topic, user_id, final_state, result["data"], reused)
+        if result["status"] == "success" and "message" not in result:
+            result["state"] = final_state
+        result["trace"] = run_summary
+        result["degradations"] = run_summary["degradations"]
+        return result
+
+    except DeadlineExceeded as e:
+        # The budget ran out before there was a draft to save
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Nodes whose LLM output is the article itself (everything else streams structured JSON)
+DRAFT_NODES = ("writer", "refiner")
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Seconds a shutting-down worker waits for streamed generations still running
+GENERATION_DRAIN_S = float(os.getenv("TRENDFLOW_GENERATION_DRAIN_S", "120"))
+
+# Streamed generations in flight (a reference keeps each task alive until it finishes)
+streamed_generations: Set[asyncio.Task] = set()
+
+async def run_streamed_generation(request: BlogRequest, user_id: str, initial_state: dict, reused: Optional[dict],
+                                  events: asyncio.Queue):
+    """
+    Runs one streamed generation to the end and saves it, putting SSE events on
+    `events` as it goes and None when finished. Detached from the response, so
+    a client that disconnects mid-run still gets its post in /posts.
+    """
+    final_state = initial_state
+    current_message = None
+    try:
+        with trace_run() as run, time_budget(request.deadline_s or DEFAULT_BUDGET_S):
+            # Sync nodes run in LangGraph's executor, so the event loop stays free while we relay
+            async for mode, payload in app_graph.astream(initial_state, stream_mode=["messages", "updates", "values"]):
+                if mode == "messages":
+                    chunk, meta = payload
+                    node = meta.get("langgraph_node")
+                    if node not in DRAFT_NODES or not chunk.content:
+                        continue
+                    if chunk.id != current_message:
+                        current_message = chunk.id
+                        events.put_nowait(sse_event("draft_start", {"node": node}))
+                    events.put_nowait(sse_event("token", {"node": node, "text": chunk.content}))
+                elif mode == "updates":
+                    for node in payload:
+                        events.put_nowait(sse_event("stage", {"node": node, "status": "done"}))
+                else:
+                    final_state = payload
+
+        final_state = await asyncio.to_thread(resolve_state, final_state)
+        post_data = build_post_data(final_state, request.topic, user_id)
+        result = await asyncio.to_thread(save_generated_post, post_data)
+        await asyncio.to_thread(remember_generation, request.topic, user_id, final_state, result["data"], reused)
+        result["trace"] = run.summary()
+        result["degradations"] = result["trace"]["degradations"]
+        events.put_nowait(sse_event("done", result))
+    except Exception as e:
+        print(f"Streamed generation failed: {e}")
+        events.put_nowait(sse_event("error", {"detail": str(e)}))
+    finally:
+        events.put_nowait(None)
+
+@app.post("/generate-pro-blog/stream")
+async def generate_pro_blog_stream(request: BlogRequest, user_id: str = Depends(get_current_user)):
+    """
+    Same pipeline as /generate-pro-blog, relayed as Server-Sent Events:
+    `stage` when a node finishes, `draft_start` + `token` while the writer or
+    refiner is streaming, then `done` with the saved post (or `error`).
+    A recent post on the same topic is offered as a single `duplicate` event.
+    The run continues, and is saved, if the client goes away.
+    """
+    print(f"Starting streamed generation for topic: {request.topic} by user {user_id}")
+    initial_state, reused, duplicate = await plan_generation(request, user_id)
+
+    events: asyncio.Queue = asyncio.Queue()
+    if duplicate is None:
+        task = asyncio.create_task(run_streamed_generation(request, user_id, initial_state, reused, events))
+        streamed_generations.add(task)
+        task.add_done_callback(streamed_generations.discard)
+
+    async def event_stream():
+        if duplicate is not None:
+            yield sse_event("duplicate", duplicate)
+            return
+        # Only relays: cancelling this (client gone) leaves the run going
+        while (event := await events.get()) is not None:
+            yield event
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def run_scheduled_generation(topic: str, user_id: str) -> dict:
+    """
+    One autopilot generation: the /generate-pro-blog pipeline and bookkeeping,
+    with its LLM calls queued behind interactive ones. Reuses recent research
+    on the topic instead of offering the existing post.
+    """
+    initial_state, reused, _ = await plan_generation(BlogRequest(topic=topic, reuse="research"), user_id)
+
+    def run_graph():
+        with llm_scheduler.llm_priority("background"), trace_run() as run, time_budget(DEFAULT_BUDGET_S):
+            final_state = resolve_state(app_graph.invoke(initial_state))
+        return final_state, run.summary()
+
+    final_state, _ = await asyncio.to_thread(run_graph)
+    result = await asyncio.to_thread(save_generated_post, build_post_data(final_state, topic, user_id))
+    await asyncio.to_thread(remember_generation, topic, user_id, final_state, result["data"], reused)
+    return result
+
+# Runs on the worker holding the background lease (see start_background_jobs)
+autopilot_runner = autopilot.Autopilot(autopilot.schedule_store, run_scheduled_generation)
+
+@app.get("/autopilot/schedules")
+async def list_schedules(user_id: str = Depends(get_current_user)):
+    """The user's recurring generations, each with its latest run."""
+    return await asyncio.to_thread(autopilot.schedule_store.list, user_id)
+
+@app.post("/autopilot/schedules")
+async def create_schedule(request: ScheduleRequest, user_id: str = Depends(get_current_user)):
+    """Registers a recurring generation; drafts land in posts as needs_review, in the off-peak windows."""
+    topic = (request.topic or "").strip() or None
+    if request.kind == "topic" and not topic:
+        raise HTTPException(status_code=422, detail="A topic schedule needs a topic")
+    schedule = await asyncio.to_thread(autopilot.schedule_store.add, user_id, request.kind, topic,
+                                       (request.match or "").strip() or None, request.every_hours * 3600)
+    if schedule is None:
+        raise HTTPException(status_code=400, detail=f"At most {autopilot.MAX_SCHEDULES} schedules per user")
+    return {"status": "success", "data": schedule, "next_window_at": autopilot_runner.next_window_at(time.time())}
+
+@app.delete("/autopilot/schedules/{schedule_id}")
+async def delete_schedule(schedule_id: int, user_id: str = Depends(get_current_user)):
+    if not await asyncio.to_thread(autopilot.schedule_store.delete, user_id, schedule_id):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return {"status": "success"}
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    try:
+        from backend.serve import main as serve
+    except ImportError:
+        from serve import main as serve
+    serve(["--host", "0.0.0.0", "--port", "8000"])
@@ -0,0 +1,20 @@
+-- Intermediate pipeline state kept with each post, so single stages can be
+-- re-run later (POST /posts/{id}/rerun/{stage}) without the whole pipeline.
+-- Once applied, set TRENDFLOW_PIPELINE_STATE_COLUMNS=1 so new posts fill them.
+do $$
+begin
+    -- The researched topic the Editor reviewed against (can be narrower than the requested one)
+    if not exists (select 1 from information_schema.columns where table_name = 'posts' and column_name = 'topic') then
+        alter table public.posts add column topic text;
+    end if;
+    if not exists (select 1 from information_schema.columns where table_name = 'posts' and column_name = 'research_summary') then
+        alter table public.posts add column research_summary text;
+    end if;
+    -- The full DistributionPackage (social posts and SEO title included), not just the mapped columns
+    if not exists (select 1 from information_schema.columns where table_name = 'posts' and column_name = 'distribution') then
+        alter table public.posts add column distribution jsonb;
+    end if;
+    if not exists (select 1 from information_schema.columns where table_name = 'posts' and column_name = 'editor_score') then
+        alter table public.posts add column editor_score integer;
+    end if;
+end $$;
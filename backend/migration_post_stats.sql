@@ -0,0 +1,157 @@
+-- Indexes for the dashboard queries and a per-user statistics table kept
+-- up to date by triggers, so GET /posts/stats reads one row.
+
+-- 1. When a post was published (set by the trigger below)
+do $$
+begin
+    if not exists (select 1 from information_schema.columns where table_name = 'posts' and column_name = 'published_at') then
+        alter table public.posts add column published_at timestamp with time zone;
+    end if;
+end $$;
+
+-- Posts published before this migration: best known time is their last update
+update public.posts set published_at = updated_at where status = 'published' and published_at is null;
+
+-- 2. Indexes
+-- GET /posts: where user_id = ? order by created_at desc
+create index if not exists posts_user_created_idx on public.posts (user_id, created_at desc);
+-- Review queue and published list are small slices of a user's posts
+create index if not exists posts_user_needs_review_idx on public.posts (user_id, created_at desc) where status = 'needs_review';
+create index if not exists posts_user_published_idx on public.posts (user_id, published_at desc) where status = 'published';
+
+-- 3. Per-user statistics
+create table if not exists public.post_stats (
+  user_id uuid primary key references public.users(id) on delete cascade,
+  total integer not null default 0,
+  drafts integer not null default 0,
+  needs_review integer not null default 0,
+  approved integer not null default 0,
+  published integer not null default 0,
+  viral_score_sum bigint not null default 0,
+  viral_score_count integer not null default 0,
+  avg_viral_score numeric generated always as
+    (case when viral_score_count > 0 then round(viral_score_sum::numeric / viral_score_count, 1) end) stored,
+  last_published_at timestamp with time zone,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- 4. Stamp published_at when a post becomes published
+create or replace function public.posts_stamp_published() returns trigger as $$
+begin
+    if new.status = 'published' and new.published_at is null then
+        new.published_at := timezone('utc'::text, now());
+    end if;
+    return new;
+end $$ language plpgsql;
+
+drop trigger if exists posts_stamp_published on public.posts;
+create trigger posts_stamp_published before insert or update of status on public.posts
+    for each row execute function public.posts_stamp_published();
+
+-- 5. Apply each row change to its user's statistics: take the old row out, put the new one in
+create or replace function public.post_stats_add(p_user_id uuid, p_status post_status, p_viral_score integer, p_sign integer)
+returns void as $$
+begin
+    if p_user_id is null then
+        return;
+    end if;
+    insert into public.post_stats as s (user_id, total, drafts, needs_review, approved, published, viral_score_sum, viral_score_count)
+    values (
+        p_user_id,
+        p_sign,
+        case when p_status = 'draft' then p_sign else 0 end,
+        case when p_status = 'needs_review' then p_sign else 0 end,
+        case when p_status = 'approved' then p_sign else 0 end,
+        case when p_status = 'published' then p_sign else 0 end,
+        coalesce(p_viral_score, 0) * p_sign,
+        case when p_viral_score is not null then p_sign else 0 end
+    )
+    on conflict (user_id) do update set
+        total = s.total + excluded.total,
+        drafts = s.drafts + excluded.drafts,
+        needs_review = s.needs_review + excluded.needs_review,
+        approved = s.approved + excluded.approved,
+        published = s.published + excluded.published,
+        viral_score_sum = s.viral_score_sum + excluded.viral_score_sum,
+        viral_score_count = s.viral_score_count + excluded.viral_score_count,
+        updated_at = timezone('utc'::text, now());
+end $$ language plpgsql;
+
+create or replace function public.post_stats_apply() returns trigger as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.post_stats_add(old.user_id, old.status, old.viral_score, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.post_stats_add(new.user_id, new.status, new.viral_score, 1);
+    end if;
+    -- Latest publish time; recomputed from posts_user_published_idx only when a published post changes
+    if tg_op in ('INSERT', 'UPDATE') and new.status = 'published' then
+        update public.post_stats set last_published_at = greatest(last_published_at, new.published_at)
+        where user_id = new.user_id;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') and old.status = 'published' then
+        update public.post_stats set last_published_at = (
+            select max(published_at) from public.posts where user_id = old.user_id and status = 'published'
+        ) where user_id = old.user_id;
+    end if;
+    return null;
+end $$ language plpgsql security definer set search_path = public;
+
+drop trigger if exists post_stats_apply on public.posts;
+create trigger post_stats_apply after insert or delete or update of user_id, status, viral_score, published_at on public.posts
+    for each row execute function public.post_stats_apply();
+
+-- 6. Backfill from the posts already there
+insert into public.post_stats (user_id, total, drafts, needs_review, approved, published,
+                               viral_score_sum, viral_score_count, last_published_at)
+select user_id,
+       count(*),
+       count(*) filter (where status = 'draft'),
+       count(*) filter (where status = 'needs_review'),
+       count(*) filter (where status = 'approved'),
+       count(*) filter (where status = 'published'),
+       coalesce(sum(viral_score), 0),
+       count(viral_score),
+       max(published_at) filter (where status = 'published')
+from public.posts
+where user_id is not null
+group by user_id
+on conflict (user_id) do update set
+    total = excluded.total,
+    drafts = excluded.drafts,
+    needs_review = excluded.needs_review,
+    approved = excluded.approved,
+    published = excluded.published,
+    viral_score_sum = excluded.viral_score_sum,
+    viral_score_count = excluded.viral_score_count,
+    last_published_at = excluded.last_published_at,
+    updated_at = timezone('utc'::text, now());
+
+-- 7. Readable like posts; written only by the trigger (security definer)
+alter table public.post_stats enable row level security;
+drop policy if exists "Allow read for anon" on public.post_stats;
+create policy "Allow read for anon" on public.post_stats for select using (true);
+
+-- 8. Change counter for conditional GETs on /posts and /posts/stats: bumped by every insert, update
+-- (any column, edits included) or delete of a user's posts, so the API can answer If-None-Match
+-- from this row without reading the posts
+alter table public.post_stats add column if not exists version bigint not null default 0;
+
+create or replace function public.post_stats_touch() returns trigger as $$
+begin
+    -- Runs after post_stats_apply (triggers fire in name order), so the row exists
+    if tg_op in ('INSERT', 'UPDATE') then
+        update public.post_stats set version = version + 1, updated_at = timezone('utc'::text, now())
+        where user_id = new.user_id;
+    end if;
+    if tg_op = 'DELETE' or (tg_op = 'UPDATE' and old.user_id is distinct from new.user_id) then
+        update public.post_stats set version = version + 1, updated_at = timezone('utc'::text, now())
+        where user_id = old.user_id;
+    end if;
+    return null;
+end $$ language plpgsql security definer set search_path = public;
+
+drop trigger if exists post_stats_touch on public.posts;
+create trigger post_stats_touch after insert or update or delete on public.posts
+    for each row execute function public.post_stats_touch();
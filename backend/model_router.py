@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from backend import deadline
+    from backend.telemetry import metrics, record_route
+except ImportError:
+    import deadline
+    from telemetry import metrics, record_route
+
+# --- ROUTING POLICY ---
+# Per call site: the model tiers to try in order, and the local quality score
+# (0-100, see quality_gate.py) a result needs to stop the cascade. A site can
+# also start on a later tier when the Editor scored the previous draft below
+# `editor_escalate_below`.
+DEFAULT_POLICY: Dict[str, dict] = {
+    "synthesis": {"models": ["fast", "pro"], "escalate_below": 50},
+    "writer": {"models": ["pro"], "escalate_below": 0},
+    "refiner": {"models": ["fast", "pro"], "escalate_below": 70, "editor_escalate_below": 40},
+}
+
+
+def load_policy() -> Dict[str, dict]:
+    """DEFAULT_POLICY overlaid with TRENDFLOW_MODEL_POLICY (JSON, same shape, per-site keys merged).
+
+    e.g. TRENDFLOW_MODEL_POLICY='{"writer": {"models": ["fast", "pro"], "escalate_below": 60}}'
+    """
+    policy = {site: dict(cfg) for site, cfg in DEFAULT_POLICY.items()}
+    raw = os.getenv("TRENDFLOW_MODEL_POLICY")
+    if raw:
+        try:
+            for site, cfg in json.loads(raw).items():
+                policy.setdefault(site, {"models": ["pro"], "escalate_below": 0}).update(cfg)
+        except (ValueError, AttributeError) as e:
+            print(f"   ⚠️ Ignoring invalid TRENDFLOW_MODEL_POLICY: {e}")
+    return policy
+
+
+policy = load_policy()
+
+
+def first_tier(site: str, editor_score: Optional[int] = None) -> str:
+    """Tier the cascade starts on. Drafts the Editor scored very low skip the cheap tier."""
+    cfg = policy.get(site, {"models": ["pro"]})
+    tiers = cfg["models"]
+    threshold = cfg.get("editor_escalate_below")
+    if editor_score is not None and threshold is not None and editor_score < threshold:
+        return tiers[-1]
+    return tiers[0]
+
+
+def cascade(site: str, models: Dict[str, object], call: Callable[[object], str],
+            score: Callable[[str], int], start: Optional[str] = None) -> Tuple[str, List[dict]]:
+    """
+    Runs `call(model)` on each tier of the site's policy, cheapest first, and
+    stops at the first result whose local score clears `escalate_below` (the
+    last tier is always accepted). Near the run's deadline only Flash is
+    tried. Returns the result and one routing decision per attempt, for the
+    run's `routing_log`.
+    """
+    cfg = policy.get(site, {"models": ["pro"], "escalate_below": 0})
+    tiers = cfg["models"]
+    if start in tiers:
+        tiers = tiers[tiers.index(start):]
+    # Short on time: Flash only, whatever the policy
+    if "fast" in models and tiers != ["fast"] and deadline.low(deadline.PRO_MODEL_S):
+        deadline.degrade("fast_model", site=site)
+        tiers = ["fast"]
+
+    decisions = []
+    for i, tier in enumerate(tiers):
+        model = models[tier]
+        model_name = getattr(model, "model", tier)
+        started = time.perf_counter()
+        text = call(model)
+        duration = time.perf_counter() - started
+        result_score = score(text)
+        escalate = i < len(tiers) - 1 and result_score < cfg.get("escalate_below", 0)
+
+        decision = {
+            "site": site, "tier": tier, "model": model_name, "score": result_score,
+            "duration_s": round(duration, 4), "escalated": escalate,
+        }
+        decisions.append(decision)
+        metrics.inc("trendflow_model_routes_total", help="Cascade attempts by call site, tier and outcome",
+                    site=site, tier=tier, outcome="escalated" if escalate else "accepted")
+        record_route(site, duration, tier=tier, model=model_name, score=result_score, escalated=escalate)
+        if escalate:
+            print(f"   [Router] {site}: {tier} scored {result_score} < {cfg['escalate_below']}, escalating")
+            continue
+        return text, decisions
+    return text, decisions
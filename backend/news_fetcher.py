@@ -2,28 +2,51 @@ import os
 import requests
 import httpx
 import asyncio
-from gnews import GNews
+from itertools import islice
 from dotenv import load_dotenv
 
+try:
+    from backend.telemetry import provider_span, record_cache
+    from backend.lazy import lazy_import
+    from backend.articles import iter_gnews, iter_google_news, iter_newsdata, unique
+    from backend.feeds import local_articles
+    from backend.trends import record_articles
+    from backend.shared_cache import cached
+except ImportError:
+    from telemetry import provider_span, record_cache
+    from lazy import lazy_import
+    from articles import iter_gnews, iter_google_news, iter_newsdata, unique
+    from feeds import local_articles
+    from trends import record_articles
+    from shared_cache import cached
+
+GNews = lazy_import("gnews", "GNews")  # Google News scraper, imported on first use
+
 load_dotenv()
 
+# Provider endpoints (overridable to point at staging or local stand-ins)
+GNEWS_API_URL = os.getenv("GNEWS_API_URL", "https://gnews.io/api/v4")
+NEWSDATA_API_URL = os.getenv("NEWSDATA_API_URL", "https://newsdata.io/api/1")
+
+# How long a topic's results are shared by every worker before the providers are asked again
+NEWS_CACHE_TTL_S = float(os.getenv("TRENDFLOW_NEWS_CACHE_TTL", "60"))
+
 async def fetch_structured_news(topic: str = "Technology", limit: int = 5):
-    news_items = []
+    # Local feed store first: a full page from it costs no API quota
+    news_items = await asyncio.to_thread(local_articles, topic, limit)
+    record_cache("feed_store", len(news_items) >= limit)
+    if len(news_items) >= limit:
+        return [article.as_news_item() for article in news_items]
 
     async def fetch_gnews(client):
         if not os.getenv("GNEWS_API_KEY"): return []
         try:
-            url = f"https://gnews.io/api/v4/search?q={topic}&lang=en&max={limit}&apikey={os.getenv('GNEWS_API_KEY')}"
-            resp = await client.get(url)
-            data = resp.json()
-            return [{
-                "title": article['title'],
-                "url": article['url'],
-                "source": article['source']['name'],
-                "summary": article['description'],
-                "published_at": article['publishedAt'],
-                "image_url": article.get('image')
-            } for article in data.get('articles', [])]
+            url = f"{GNEWS_API_URL}/search?q={topic}&lang=en&max={limit}&apikey={os.getenv('GNEWS_API_KEY')}"
+            with provider_span("gnews") as span:
+                resp = await client.get(url)
+                data = resp.json()
+                span["results"] = len(data.get('articles', []))
+            return list(iter_gnews(data))
         except Exception as e:
             print(f"GNews failed: {e}")
             return []
@@ -31,17 +54,12 @@ async def fetch_structured_news(topic: str = "Technology", limit: int = 5):
     async def fetch_newsdata(client):
         if not os.getenv("NEWSDATA_API_KEY"): return []
         try:
-            url = f"https://newsdata.io/api/1/news?apikey={os.getenv('NEWSDATA_API_KEY')}&q={topic}&language=en"
-            resp = await client.get(url)
-            data = resp.json()
-            return [{
-                "title": article['title'],
-                "url": article['link'],
-                "source": article['source_id'],
-                "summary": article['description'],
-                "published_at": article['pubDate'],
-                "image_url": article.get('image_url')
-            } for article in data.get('results', [])[:limit]]
+            url = f"{NEWSDATA_API_URL}/news?apikey={os.getenv('NEWSDATA_API_KEY')}&q={topic}&language=en"
+            with provider_span("newsdata") as span:
+                resp = await client.get(url)
+                data = resp.json()
+                span["results"] = len(data.get('results', []))
+            return list(islice(iter_newsdata(data), limit))
         except Exception as e:
             print(f"NewsData failed: {e}")
             return []
@@ -50,16 +68,11 @@ async def fetch_structured_news(topic: str = "Technology", limit: int = 5):
         try:
             # Scraper can be slow, so we cap it to avoid timeouts if limit is huge
             scraper_limit = min(limit, 20) 
-            google_news = GNews(max_results=scraper_limit)
-            g_results = google_news.get_news(topic)
-            return [{
-                "title": r['title'],
-                "url": r['url'],
-                "source": r['publisher']['title'],
-                "summary": "Read full article on Google News...",
-                "published_at": r['published date'],
-                "image_url": None
-            } for r in g_results]
+            with provider_span("google_news") as span:
+                google_news = GNews(max_results=scraper_limit)
+                g_results = google_news.get_news(topic)
+                span["results"] = len(g_results)
+            return list(iter_google_news(g_results))
         except Exception as e:
             print(f"Google News failed: {e}")
             return []
@@ -73,8 +86,15 @@ async def fetch_structured_news(topic: str = "Technology", limit: int = 5):
             asyncio.to_thread(fetch_google_scraper)
         )
         
-    # Flatten results
+    # Flatten results; records become response dicts only for the items actually served
     for res in results:
         news_items.extend(res)
-        
-    return news_items[:limit]
+    await asyncio.to_thread(record_articles, news_items)
+
+    return [article.as_news_item() for article in islice(unique(news_items), limit)]
+
+
+async def fetch_news_cached(topic: str = "Technology", limit: int = 5):
+    """fetch_structured_news, answered from the shared cache for NEWS_CACHE_TTL_S."""
+    key = f"{' '.join(topic.lower().split())}:{limit}"
+    return await cached("news", key, NEWS_CACHE_TTL_S, lambda: fetch_structured_news(topic, limit))
@@ -0,0 +1,260 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from backend.articles import Article, dedupe_key
+    from backend.news_fetcher import fetch_news_cached
+    from backend.telemetry import log_event, metrics
+except ImportError:
+    from articles import Article, dedupe_key
+    from news_fetcher import fetch_news_cached
+    from telemetry import log_event, metrics
+
+# --- CONFIGURATION ---
+REFRESH_INTERVAL_S = float(os.getenv("TRENDFLOW_NEWS_STREAM_INTERVAL", "120"))
+STREAM_LIMIT = int(os.getenv("TRENDFLOW_NEWS_STREAM_LIMIT", "50"))      # items fetched per refresh
+MAX_TOPICS = int(os.getenv("TRENDFLOW_NEWS_STREAM_MAX_TOPICS", "100"))  # distinct live topics
+MAX_PER_CLIENT = int(os.getenv("TRENDFLOW_NEWS_STREAM_PER_CLIENT", "4"))  # live streams per client IP, per worker
+LINGER_S = 30.0          # keep a topic's refresher alive this long after its last subscriber leaves
+KEEPALIVE_S = 15.0       # comment line so proxies don't close an idle stream
+SUBSCRIBER_BACKLOG = 16  # undelivered batches before a slow subscriber is dropped (it reconnects)
+SEEN_ITEMS = 2000        # dedupe keys remembered per topic
+
+Fetch = Callable[[str, int], Awaitable[List[dict]]]
+
+
+class TooManyTopics(Exception):
+    pass
+
+
+class TooManyStreams(Exception):
+    pass
+
+
+def item_key(item: dict) -> str:
+    """Same dedupe rule as research: URL without its query, else the normalised title."""
+    return dedupe_key(Article(provider="news", title=item.get("title") or "", url=item.get("url") or ""))
+
+
+def topic_key(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+class Subscription:
+    __slots__ = ("queue", "dropped", "client")
+
+    def __init__(self, client: Optional[str] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        self.dropped = False
+        self.client = client
+
+
+class TopicChannel:
+    """One topic's refresher and its subscribers. Created by the hub."""
+
+    def __init__(self, topic: str, fetch: Fetch, interval_s: float, linger_s: float):
+        self.topic = topic
+        self.fetch = fetch
+        self.interval_s = interval_s
+        self.linger_s = linger_s
+        self.subscribers: Set[Subscription] = set()
+        self.snapshot: List[dict] = []           # newest first; what a new subscriber starts from
+        self.ready = asyncio.Event()             # set once the first refresh has finished
+        self.idle_since: Optional[float] = None
+        self.refreshes = 0
+        self._seen: Set[str] = set()
+        self._seen_order: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def _remember(self, key: str):
+        self._seen.add(key)
+        self._seen_order.append(key)
+        if len(self._seen_order) > SEEN_ITEMS:
+            self._seen.discard(self._seen_order.popleft())
+
+    async def refresh(self) -> List[dict]:
+        """Fetches the topic once and fans out only the items not sent before."""
+        items = await self.fetch(self.topic, STREAM_LIMIT)
+        self.refreshes += 1
+        metrics.inc("trendflow_news_stream_refreshes_total", help="Upstream fetches made for live news topics")
+        fresh = []
+        for item in items:
+            key = item_key(item)
+            if key not in self._seen:
+                self._remember(key)
+                fresh.append(item)
+        if fresh and self.ready.is_set():
+            for sub in list(self.subscribers):
+                try:
+                    sub.queue.put_nowait(fresh)
+                except asyncio.QueueFull:
+                    # Too far behind: end its stream; EventSource reconnects and starts from the snapshot
+                    sub.dropped = True
+                    self.subscribers.discard(sub)
+            metrics.inc("trendflow_news_stream_items_total", len(fresh) * len(self.subscribers),
+                        help="News items pushed to live subscribers")
+        if fresh:
+            self.snapshot = (fresh + self.snapshot)[:STREAM_LIMIT]
+        self.ready.set()
+        return fresh
+
+    @property
+    def expired(self) -> bool:
+        return (not self.subscribers and self.idle_since is not None
+                and time.monotonic() - self.idle_since >= self.linger_s)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run(self):
+        while not self.expired:
+            try:
+                await self.refresh()
+            except Exception as e:
+                log_event("news_stream_refresh_failed", topic=self.topic, error=str(e)[:200])
+                self.ready.set()
+            await asyncio.sleep(self.interval_s * random.uniform(0.9, 1.1))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def cancel(self) -> Optional[asyncio.Task]:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+        return task
+
+
+class TopicHub:
+    """
+    Live news per topic, shared by every connected client.
+
+    The first subscriber to a topic starts one refresher for it; later
+    subscribers join that channel and get its current snapshot, then only
+    items nobody on the topic has been sent yet. Upstream fetches scale with
+    the number of distinct live topics, not with connections. A topic's
+    refresher outlives its last subscriber by LINGER_S so page reloads and
+    reconnects don't restart it. Each worker runs its own hub; their refreshes
+    go through the shared news cache, so a topic is fetched once per TTL.
+    """
+
+    def __init__(self, fetch: Fetch = fetch_news_cached, interval_s: float = REFRESH_INTERVAL_S,
+                 max_topics: int = MAX_TOPICS, linger_s: float = LINGER_S, max_per_client: int = MAX_PER_CLIENT):
+        self.fetch = fetch
+        self.interval_s = interval_s
+        self.max_topics = max_topics
+        self.linger_s = linger_s
+        self.max_per_client = max_per_client
+        self.channels: Dict[str, TopicChannel] = {}
+        self.clients: Dict[str, int] = {}        # live subscriptions per client IP
+
+    def _reap(self):
+        """Drops channels whose refresher stopped after lingering without subscribers."""
+        for key, channel in list(self.channels.items()):
+            if channel.expired or not channel.running:
+                del self.channels[key]
+                channel.cancel()
+
+    def _publish(self):
+        metrics.set("trendflow_news_stream_topics", len(self.channels), help="Topics with a live news refresher")
+        metrics.set("trendflow_news_stream_subscribers", sum(len(c.subscribers) for c in self.channels.values()),
+                    help="Clients connected to /news/stream")
+
+    def client_full(self, client: Optional[str]) -> bool:
+        return client is not None and self.max_per_client > 0 and self.clients.get(client, 0) >= self.max_per_client
+
+    def subscribe(self, topic: str, client: Optional[str] = None) -> Tuple[TopicChannel, Subscription]:
+        """
+        Joins (or starts) the topic's channel. Raises TooManyStreams when
+        `client` already has max_per_client live streams, TooManyTopics when a
+        new topic would exceed max_topics.
+        """
+        self._reap()
+        if self.client_full(client):
+            metrics.inc("trendflow_news_stream_rejected_total", help="Live news subscriptions refused", reason="client")
+            raise TooManyStreams(f"{self.clients[client]} live streams")
+        key = topic_key(topic)
+        channel = self.channels.get(key)
+        if channel is None:
+            if len(self.channels) >= self.max_topics:
+                metrics.inc("trendflow_news_stream_rejected_total", help="Live news subscriptions refused", reason="topics")
+                raise TooManyTopics(f"{len(self.channels)} live topics")
+            channel = self.channels[key] = TopicChannel(topic.strip(), self.fetch, self.interval_s, self.linger_s)
+            channel.start()
+        sub = Subscription(client)
+        if client is not None:
+            self.clients[client] = self.clients.get(client, 0) + 1
+        channel.subscribers.add(sub)
+        channel.idle_since = None
+        self._publish()
+        return channel, sub
+
+    def unsubscribe(self, channel: TopicChannel, sub: Subscription):
+        channel.subscribers.discard(sub)
+        if sub.client is not None:
+            left = self.clients.get(sub.client, 0) - 1
+            if left > 0:
+                self.clients[sub.client] = left
+            else:
+                self.clients.pop(sub.client, None)
+        if not channel.subscribers:
+            channel.idle_since = time.monotonic()
+        self._publish()
+
+    def accepts(self, topic: str, client: Optional[str] = None) -> bool:
+        self._reap()
+        if self.client_full(client):
+            return False
+        return topic_key(topic) in self.channels or len(self.channels) < self.max_topics
+
+    def stats(self) -> dict:
+        self._reap()
+        return {
+            "topics": {c.topic: {"subscribers": len(c.subscribers), "refreshes": c.refreshes,
+                                 "snapshot": len(c.snapshot)} for c in self.channels.values()},
+            "subscribers": sum(len(c.subscribers) for c in self.channels.values()),
+        }
+
+    async def close(self):
+        tasks = [t for t in (c.cancel() for c in self.channels.values()) if t is not None]
+        self.channels = {}
+        self.clients = {}
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._publish()
+
+
+news_hub = TopicHub()
+
+
+async def news_events(hub: TopicHub, topic: str, limit: int,
+                      client: Optional[str] = None) -> AsyncIterator[Tuple[Optional[str], Optional[list]]]:
+    """
+    One subscriber's stream as (event, items): `snapshot` once, then `news`
+    batches; (None, None) when nothing arrived for KEEPALIVE_S. Subscribes on
+    first iteration and unsubscribes when the consumer stops (client gone) or
+    falls too far behind.
+    """
+    channel, sub = hub.subscribe(topic, client)
+    try:
+        await channel.ready.wait()
+        snapshot = channel.snapshot[:limit]
+        # A refresh that landed between subscribing and now is already in the snapshot
+        sent = {item_key(item) for item in snapshot}
+        yield "snapshot", snapshot
+        while not sub.dropped:
+            try:
+                batch = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield None, None
+                continue
+            batch = [item for item in batch if item_key(item) not in sent]
+            if batch:
+                yield "news", batch
+    finally:
+        hub.unsubscribe(channel, sub)
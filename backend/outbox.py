@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from backend.local_data import connect
+    from backend.telemetry import log_event, metrics
+except ImportError:
+    from local_data import connect
+    from telemetry import log_event, metrics
+
+OUTBOX_DB_PATH = os.getenv("TRENDFLOW_OUTBOX_DB")  # default: outbox.sqlite3 in the data dir
+FLUSH_BATCH = int(os.getenv("TRENDFLOW_OUTBOX_BATCH", "50"))
+MAX_BACKOFF_S = float(os.getenv("TRENDFLOW_OUTBOX_MAX_BACKOFF", "300"))
+IDLE_S = float(os.getenv("TRENDFLOW_OUTBOX_IDLE_S", "5"))  # how soon posts enqueued by other workers are picked up
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    payload TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_user ON outbox (user_id);
+"""
+
+
+def _backoff(attempts: int) -> float:
+    return min(MAX_BACKOFF_S, 2.0 * 2 ** min(attempts, 16)) * random.uniform(0.8, 1.2)
+
+
+class PostOutbox:
+    """
+    Durable write-ahead queue for generated posts.
+
+    `enqueue` commits the row to local SQLite (synchronous=FULL) and returns
+    it with its final id and created_at, so the request never waits on
+    Supabase. A background flusher upserts pending rows in batches and only
+    deletes them once Supabase has acknowledged them; failed rows are retried
+    with capped exponential backoff until they succeed. Upserting by the
+    client-generated id makes a retry after a lost acknowledgement harmless.
+
+    Every worker on the host shares the file. Only one of them runs the
+    flusher, so a row is removed only if nobody edited it while it was in
+    flight, and deleting a pending post leaves a tombstone that the flusher
+    turns into a delete in Supabase.
+    """
+
+    def __init__(self, path: str, client: Callable[[], Any], table: str = "posts", batch: int = FLUSH_BATCH):
+        self.path = path
+        self._client = client        # returns the Supabase client (or None while unconfigured)
+        self.table = table
+        self.batch = batch
+        self._conn = connect(path)
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._lock = threading.Lock()
+        # Held for a whole flush, so an edit or delete never races a row already on its way to Supabase
+        self._flushing = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(outbox)")}
+            if "deleted" not in columns:  # outbox written before tombstones
+                self._conn.execute("ALTER TABLE outbox ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._publish()
+
+    # Queue
+    def enqueue(self, post_data: dict) -> dict:
+        now = datetime.now(timezone.utc).isoformat()
+        row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **post_data}
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO outbox (id, user_id, payload, created_at) VALUES (?, ?, ?, ?)",
+                               (row["id"], row.get("user_id"), json.dumps(row), row["created_at"]))
+        metrics.inc("trendflow_outbox_enqueued_total", help="Posts written to the local outbox")
+        self._publish()
+        self.wake()
+        return row
+
+    def pending_for(self, user_id: str) -> List[dict]:
+        """Posts of `user_id` that Supabase has not acknowledged yet, newest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT payload FROM outbox WHERE user_id = ? AND deleted = 0 "
+                                      "ORDER BY created_at DESC",
+                                      (user_id,)).fetchall()
+        return [json.loads(r["payload"]) for r in rows]
+
+    def fingerprint(self, user_id: str) -> str:
+        """Changes whenever a pending post of `user_id` is added, edited or drops out; "" when none (for ETags)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, json_extract(payload, '$.updated_at') FROM outbox "
+                                      "WHERE user_id = ? AND deleted = 0 ORDER BY id", (user_id,)).fetchall()
+        return ",".join(f"{r[0]}@{r[1] or ''}" for r in rows)
+
+    def get(self, post_id: str, user_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM outbox WHERE id = ? AND user_id = ? AND deleted = 0",
+                                     (post_id, user_id)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def update(self, post_id: str, user_id: str, changes: dict) -> Optional[dict]:
+        """Applies an edit to a post still in the outbox. Returns the updated row, or None if not pending."""
+        with self._flushing, self._lock, self._conn:
+            row = self._conn.execute("SELECT payload FROM outbox WHERE id = ? AND user_id = ? AND deleted = 0",
+                                     (post_id, user_id)).fetchone()
+            if row is None:
+                return None
+            payload = {**json.loads(row["payload"]), **changes, "updated_at": datetime.now(timezone.utc).isoformat()}
+            self._conn.execute("UPDATE outbox SET payload = ? WHERE id = ?", (json.dumps(payload), post_id))
+        return payload
+
+    def discard(self, post_id: str, user_id: str) -> bool:
+        """
+        Drops a post that was deleted before it reached Supabase. The row stays
+        as a tombstone until the flusher has deleted the post there too, in
+        case another worker's flush was already upserting it.
+        """
+        with self._flushing, self._lock, self._conn:
+            deleted = self._conn.execute("UPDATE outbox SET deleted = 1, next_attempt_at = 0 "
+                                         "WHERE id = ? AND user_id = ? AND deleted = 0", (post_id, user_id)).rowcount
+        self.wake()
+        return bool(deleted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), MIN(created_at), MAX(attempts) FROM outbox").fetchone()
+            errors = self._conn.execute("SELECT id, attempts, last_error FROM outbox WHERE last_error IS NOT NULL "
+                                        "ORDER BY attempts DESC LIMIT 5").fetchall()
+        return {"pending": row[0], "oldest_created_at": row[1], "max_attempts": row[2] or 0,
+                "failing": [dict(r) for r in errors]}
+
+    def _publish(self):
+        with self._lock:
+            pending = self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        metrics.set("trendflow_outbox_pending", pending, help="Generated posts waiting to be written to Supabase")
+
+    # Flushing
+    def flush_once(self, ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """Writes due rows (or just `ids`) to Supabase. Blocking; returns {"flushed": n, "failed": n}."""
+        client = self._client()
+        if not client:
+            return {"flushed": 0, "failed": 0}
+        with self._flushing:
+            return self._flush(client, ids)
+
+    def _flush(self, client, ids: Optional[List[str]]) -> Dict[str, int]:
+        with self._lock:
+            if ids is None:
+                rows = self._conn.execute("SELECT id, payload, attempts, deleted FROM outbox WHERE next_attempt_at <= ? "
+                                          "ORDER BY created_at LIMIT ?", (time.time(), self.batch)).fetchall()
+            else:
+                marks = ",".join("?" * len(ids))
+                rows = self._conn.execute(f"SELECT id, payload, attempts, deleted FROM outbox WHERE id IN ({marks})", ids).fetchall()
+        if not rows:
+            return {"flushed": 0, "failed": 0}
+
+        start = time.perf_counter()
+        live = [r for r in rows if not r["deleted"]]
+        done, failed = [], []
+        if live:
+            try:
+                client.table(self.table).upsert([json.loads(r["payload"]) for r in live]).execute()
+                done = list(live)
+            except Exception as batch_error:
+                if len(live) == 1:
+                    failed = [(live[0], batch_error)]
+                else:
+                    # Isolate the row(s) Supabase rejects so the rest of the batch still lands
+                    for r in live:
+                        try:
+                            client.table(self.table).upsert(json.loads(r["payload"])).execute()
+                            done.append(r)
+                        except Exception as e:
+                            failed.append((r, e))
+        for r in rows:
+            if r["deleted"]:
+                try:
+                    client.table(self.table).delete().eq("id", r["id"]).execute()
+                    done.append(r)
+                except Exception as e:
+                    failed.append((r, e))
+        metrics.observe("trendflow_outbox_flush_seconds", time.perf_counter() - start, help="Outbox flush wall time")
+
+        with self._lock, self._conn:
+            if done:
+                # Only rows nobody touched since they were read: an edit or delete made meanwhile gets flushed next
+                self._conn.executemany("DELETE FROM outbox WHERE id = ? AND payload = ? AND deleted = ?",
+                                       [(r["id"], r["payload"], r["deleted"]) for r in done])
+            for r, e in failed:
+                self._conn.execute("UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                                   (r["attempts"] + 1, time.time() + _backoff(r["attempts"]), str(e)[:500], r["id"]))
+        if done:
+            metrics.inc("trendflow_outbox_flushed_total", len(done), help="Outbox rows acknowledged by Supabase")
+        if failed:
+            metrics.inc("trendflow_outbox_failures_total", len(failed), help="Outbox rows that failed to flush")
+            log_event("outbox_flush_failed", rows=len(failed), error=str(failed[0][1])[:200])
+        self._publish()
+        return {"flushed": len(done), "failed": len(failed)}
+
+    def next_attempt_in(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt_at) FROM outbox").fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    async def flush_post(self, post_id: str) -> bool:
+        """Tries to write one pending post right away. True if it is (now) in Supabase."""
+        await asyncio.to_thread(self.flush_once, [post_id])
+        with self._lock:
+            pending = self._conn.execute("SELECT 1 FROM outbox WHERE id = ?", (post_id,)).fetchone()
+        return pending is None
+
+    def wake(self):
+        """Nudges the flusher (safe from any thread)."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def run(self, idle_s: float = IDLE_S):
+        while True:
+            self._wake.clear()   # before flushing, so an enqueue during the flush is not missed
+            try:
+                result = await asyncio.to_thread(self.flush_once)
+                if result["flushed"] == self.batch:
+                    continue  # more may be waiting
+                delay = await asyncio.to_thread(self.next_attempt_in)
+            except Exception as e:
+                log_event("outbox_flusher_error", error=str(e)[:200])
+                delay = None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(idle_s, delay) if delay is not None else idle_s)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, drain_s: float = 5.0):
+        """Stops the flusher after one last attempt (bounded by `drain_s`); unflushed rows stay on disk."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.flush_once), timeout=drain_s)
+        except Exception:
+            pass
@@ -0,0 +1,47 @@
+from typing import Iterable, Optional
+
+# post_stats column per status
+STATUS_COLUMNS = {"draft": "drafts", "needs_review": "needs_review", "approved": "approved", "published": "published"}
+COUNTERS = ("total", *STATUS_COLUMNS.values(), "viral_score_sum", "viral_score_count")
+
+
+def empty() -> dict:
+    return {**{name: 0 for name in COUNTERS}, "last_published_at": None}
+
+
+def from_posts(posts: Iterable[dict]) -> dict:
+    """A post_stats row computed from posts (pending outbox rows, or a database without the migration)."""
+    stats = empty()
+    for post in posts:
+        stats["total"] += 1
+        column = STATUS_COLUMNS.get(post.get("status") or "draft")
+        if column:
+            stats[column] += 1
+        if post.get("viral_score") is not None:
+            stats["viral_score_sum"] += post["viral_score"]
+            stats["viral_score_count"] += 1
+        if post.get("status") == "published":
+            published_at = post.get("published_at") or post.get("updated_at")
+            if published_at and (stats["last_published_at"] is None or published_at > stats["last_published_at"]):
+                stats["last_published_at"] = published_at
+    return stats
+
+
+def combine(stats: dict, other: dict) -> dict:
+    out = {name: (stats.get(name) or 0) + (other.get(name) or 0) for name in COUNTERS}
+    out["last_published_at"] = max(filter(None, (stats.get("last_published_at"), other.get("last_published_at"))),
+                                   default=None)
+    return out
+
+
+def render(stats: Optional[dict], pending: int = 0) -> dict:
+    """Response body for GET /posts/stats."""
+    stats = stats or empty()
+    count = stats.get("viral_score_count") or 0
+    return {
+        "total": stats.get("total") or 0,
+        "by_status": {status: stats.get(column) or 0 for status, column in STATUS_COLUMNS.items()},
+        "avg_viral_score": round(stats["viral_score_sum"] / count, 1) if count else None,
+        "last_published_at": stats.get("last_published_at"),
+        "pending": pending,
+    }
@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.telemetry import metrics
+    from backend.topic_index import normalize
+except ImportError:
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from telemetry import metrics
+    from topic_index import normalize
+
+# --- CONFIGURATION ---
+ADAPTIVE_PROVIDERS = os.getenv("TRENDFLOW_ADAPTIVE_PROVIDERS", "1") == "1"   # 0 = query every provider, fixed order
+TARGET_ARTICLES = float(os.getenv("TRENDFLOW_PROVIDER_TARGET_ARTICLES", "8"))  # expected articles a plan aims for
+MIN_SAMPLES = int(os.getenv("TRENDFLOW_PROVIDER_MIN_SAMPLES", "5"))           # calls before a provider can be skipped
+MIN_YIELD = float(os.getenv("TRENDFLOW_PROVIDER_MIN_YIELD", "0.3"))           # articles per call worth asking for
+PROBE_EVERY = int(os.getenv("TRENDFLOW_PROVIDER_PROBE_EVERY", "10"))          # skipped plans before a re-check
+PROVIDER_STATS_DB = os.getenv("TRENDFLOW_PROVIDER_STATS_DB")  # default: providers.sqlite3 in the data dir
+ALPHA = 0.1                   # EWMA weight of the newest call once a provider has 10+ samples
+MIN_LATENCY_S = 0.01
+
+# Topic category -> keywords, matched after topic_index.normalize (lowercase, plurals folded).
+# The first category with the most keyword hits wins; no hit = "general".
+_CATEGORY_WORDS = {
+    "finance": {"stock", "share", "market", "earning", "revenue", "profit", "ipo", "valuation", "funding", "investor",
+                "bank", "fed", "inflation", "rate", "economy", "crypto", "bitcoin", "ethereum", "etf", "price",
+                "merger", "acquisition", "q1", "q2", "q3", "q4", "quarter", "nasdaq", "dow"},
+    "tech": {"ai", "chip", "gpu", "cpu", "software", "app", "cloud", "startup", "openai", "nvidia", "apple", "google",
+             "microsoft", "meta", "amazon", "llm", "model", "robot", "quantum", "semiconductor", "cybersecurity",
+             "data", "linux", "rust", "python", "developer", "smartphone", "iphone", "android", "launch", "gpt-5",
+             "gemini", "tesla"},
+    "science": {"space", "nasa", "climate", "energy", "battery", "fusion", "research", "study", "health", "vaccine",
+                "biotech", "gene", "drug", "physics", "mars", "rocket"},
+    "policy": {"regulation", "law", "act", "eu", "court", "antitrust", "election", "government", "ban", "policy",
+               "compliance", "senate", "congress", "tariff", "sanction"},
+}
+# Folded the same way as topics ("mars" -> "mar"), or the keyword could never match
+CATEGORIES = {category: {k for word in words for k in normalize(word)} for category, words in _CATEGORY_WORDS.items()}
+assert all(len(normalize(word)) == 1 for words in _CATEGORY_WORDS.values() for word in words), \
+    "category keywords must be single words that normalize() keeps"
+
+
+def categorize(topic: str) -> str:
+    """Coarse topic category the provider statistics are kept per."""
+    keywords = set(normalize(topic))
+    best, hits = "general", 0
+    for category, words in CATEGORIES.items():
+        count = len(keywords & words)
+        if count > hits:
+            best, hits = category, count
+    return best
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_stats (
+    provider TEXT NOT NULL,
+    category TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    latency_s REAL NOT NULL,
+    results REAL NOT NULL,
+    survivors REAL NOT NULL,
+    errors REAL NOT NULL,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (provider, category)
+) WITHOUT ROWID;
+"""
+
+
+class ProviderStats:
+    """
+    Per (news provider, topic category) moving averages of call latency,
+    articles returned, articles that survive filtering and error rate.
+    plan() uses them to query, for each research run, only the providers
+    expected to be worth their latency and quota, best yield per second
+    first. Shared by every worker on the host.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def record(self, provider: str, category: str, latency_s: float, results: int, survivors: int, error: bool):
+        """Folds one provider call into its averages (plain mean for the first samples, then EWMA)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO provider_stats (provider, category, samples, latency_s, results, survivors, errors, "
+                "updated_at) VALUES (?, ?, 1, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (provider, category) DO UPDATE SET "
+                "latency_s = latency_s + MAX(?, 1.0 / (samples + 1)) * (excluded.latency_s - latency_s), "
+                "results = results + MAX(?, 1.0 / (samples + 1)) * (excluded.results - results), "
+                "survivors = survivors + MAX(?, 1.0 / (samples + 1)) * (excluded.survivors - survivors), "
+                "errors = errors + MAX(?, 1.0 / (samples + 1)) * (excluded.errors - errors), "
+                "samples = samples + 1, skipped = 0, updated_at = excluded.updated_at",
+                (provider, category, latency_s, results, survivors, float(error), time.time(),
+                 ALPHA, ALPHA, ALPHA, ALPHA),
+            )
+
+    def plan(self, providers: List[str], category: str) -> List[str]:
+        """
+        Providers to query for a topic in `category`, in order. Ones with fewer
+        than MIN_SAMPLES calls are always asked. Known ones are ranked by
+        surviving articles per second and added until the plan expects
+        TARGET_ARTICLES; those yielding under MIN_YIELD per call are dropped,
+        except once every PROBE_EVERY plans so a recovered provider is noticed.
+        """
+        with self._lock:
+            rows = {row["provider"]: row for row in self._conn.execute(
+                "SELECT * FROM provider_stats WHERE category = ?", (category,))}
+        unknown = [p for p in providers if p not in rows or rows[p]["samples"] < MIN_SAMPLES]
+        known = sorted((p for p in providers if p not in unknown),
+                       key=lambda p: rows[p]["survivors"] / max(rows[p]["latency_s"], MIN_LATENCY_S), reverse=True)
+        chosen, expected = [], sum(rows[p]["survivors"] for p in unknown if p in rows)
+        for provider in known:
+            row = rows[provider]
+            if row["skipped"] + 1 >= PROBE_EVERY:
+                reason = "probe"
+            elif row["survivors"] < MIN_YIELD:
+                reason = "low_yield"
+            elif expected >= TARGET_ARTICLES:
+                reason = "enough"
+            else:
+                reason = None
+            if reason in (None, "probe"):
+                chosen.append(provider)
+                expected += row["survivors"]
+            if reason is not None:
+                metrics.inc("trendflow_provider_plan_total", help="Providers skipped or re-probed by the research planner",
+                            provider=provider, category=category, outcome="probed" if reason == "probe" else reason)
+        skipped = [p for p in known if p not in chosen]
+        if skipped:
+            with self._lock, self._conn:
+                self._conn.executemany("UPDATE provider_stats SET skipped = skipped + 1 "
+                                       "WHERE provider = ? AND category = ?", [(p, category) for p in skipped])
+        # Best known providers first: a deadline cap (deadline.py) cuts from the end
+        return chosen + unknown
+
+    def stats(self) -> Dict[str, Dict[str, dict]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM provider_stats ORDER BY category, provider").fetchall()
+        out: Dict[str, Dict[str, dict]] = {}
+        for row in rows:
+            out.setdefault(row["category"], {})[row["provider"]] = {
+                "samples": row["samples"],
+                "latency_s": round(row["latency_s"], 3),
+                "results": round(row["results"], 2),
+                "survivors": round(row["survivors"], 2),
+                "error_rate": round(row["errors"], 3),
+                "skipped": row["skipped"],
+            }
+        return out
+
+
+# Opened on first use so importing the API never touches the disk
+provider_stats = LazyObject(lambda: ProviderStats(PROVIDER_STATS_DB or data_path("providers.sqlite3")),
+                            label="provider_stats")
+
+
+def plan_providers(providers: List[str], topic: str, category: Optional[str] = None) -> List[str]:
+    """The planned subset and order, or `providers` unchanged when TRENDFLOW_ADAPTIVE_PROVIDERS=0."""
+    if not ADAPTIVE_PROVIDERS:
+        return providers
+    return provider_stats.plan(providers, category or categorize(topic))
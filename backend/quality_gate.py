@@ -0,0 +1,196 @@
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# --- PHRASE LISTS ---
+# AI-cliché vocabulary the Editor always rejects. Matching is whole-word, so
+# inflections that matter are listed explicitly.
+BANNED_PHRASES = [
+    "delve", "delves", "delving", "tapestry", "ever-evolving", "landscape", "landscapes",
+    "game-changer", "game-changing", "moreover", "in conclusion",
+]
+
+# Generic openers the Editor prompt says to "REJECT immediately". Only checked in the hook.
+HOOK_PHRASES = [
+    "in today's digital world", "in today's world", "in today's fast-paced world",
+    "in the fast-paced world of", "in the ever-changing world of", "in this article",
+    "in this blog post", "have you ever wondered", "since the dawn of time",
+]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+NUMBER_RE = re.compile(r"[$€£]?\d[\d,.]*\s*(?:%|percent|[kmbt]n?\b|million|billion|trillion)?", re.IGNORECASE)
+
+HOOK_CHARS = 300                 # how much of the opening counts as "the hook"
+MIN_NUMBERS_PER_100_WORDS = 0.5  # below this the draft has effectively no data
+LONG_PARAGRAPH_WORDS = 120
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Every phrase list is matched in a single pass over the draft, whatever its
+    size, and a phrase only matches on word boundaries ("landscape" does not
+    fire inside "landscaped").
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self.phrases = []
+        for phrase in phrases:
+            words = tokenize(phrase)
+            if words:
+                self._add(words, phrase)
+        self._link()
+
+    def _add(self, words: List[str], phrase: str):
+        node = 0
+        for word in words:
+            nxt = self._goto[node].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if phrase not in self._out[node]:
+            self._out[node].append(phrase)
+            self.phrases.append(phrase)
+
+    def _link(self):
+        # BFS: a node's failure link is the longest proper suffix that is also a prefix in the trie
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and word not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def count(self, tokens: List[str]) -> Dict[str, int]:
+        """Returns {phrase: occurrences} for every phrase found in `tokens`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[str, int] = {}
+        node = 0
+        for word in tokens:
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for phrase in out[node]:
+                found[phrase] = found.get(phrase, 0) + 1
+        return found
+
+
+def _load_extra_phrases() -> List[str]:
+    """Optional newline-separated phrase file, for teams that keep a longer house list."""
+    path = os.getenv("TRENDFLOW_BANNED_PHRASES_FILE")
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+banned_matcher = PhraseMatcher(BANNED_PHRASES + _load_extra_phrases())
+hook_matcher = PhraseMatcher(HOOK_PHRASES)
+
+
+# --- SCORING ---
+@dataclass
+class QualityReport:
+    banned: Dict[str, int] = field(default_factory=dict)
+    hook_phrases: List[str] = field(default_factory=list)
+    word_count: int = 0
+    numbers: int = 0
+    headers: int = 0
+    paragraphs: int = 0
+    long_paragraphs: int = 0
+    max_paragraph_words: int = 0
+    hard_failures: List[str] = field(default_factory=list)   # the Editor would reject for these
+    warnings: List[str] = field(default_factory=list)        # worth mentioning, not disqualifying
+
+    @property
+    def data_density(self) -> float:
+        """Numbers per 100 words."""
+        return 100 * self.numbers / self.word_count if self.word_count else 0.0
+
+    @property
+    def clearly_fails(self) -> bool:
+        return bool(self.hard_failures)
+
+    @property
+    def score(self) -> int:
+        """Rough score on the mechanical half of the Editor rubric (hook, data, formatting)."""
+        hook = 0 if self.hook_phrases else 20
+        data = min(30, round(self.data_density * 10))
+        formatting = (10 if self.headers else 0) + (10 if not self.long_paragraphs else 5 if self.long_paragraphs < 3 else 0)
+        penalty = 25 if self.banned else 0
+        return max(0, round((hook + data + formatting) * 100 / 70) - penalty)
+
+    def critique(self) -> str:
+        return "\n".join(f"- {line}" for line in self.hard_failures + self.warnings)
+
+    def as_dict(self) -> dict:
+        return {
+            "score": self.score, "banned": self.banned, "hook_phrases": self.hook_phrases,
+            "word_count": self.word_count, "data_density": round(self.data_density, 2),
+            "headers": self.headers, "long_paragraphs": self.long_paragraphs,
+            "hard_failures": self.hard_failures, "warnings": self.warnings,
+        }
+
+
+def assess(draft: str, matcher: Optional[PhraseMatcher] = None) -> QualityReport:
+    """Scans a markdown draft once and checks what the Editor rubric can check without an LLM."""
+    matcher = matcher or banned_matcher
+    report = QualityReport()
+
+    tokens = tokenize(draft)
+    report.word_count = len(tokens)
+    report.banned = matcher.count(tokens)
+    report.numbers = len(NUMBER_RE.findall(draft))
+
+    body_lines = []
+    for line in draft.splitlines():
+        if line.lstrip().startswith("#"):
+            report.headers += 1
+        else:
+            body_lines.append(line)
+    paragraphs = [p for p in re.split(r"\n\s*\n", "\n".join(body_lines)) if p.strip()]
+    sizes = [len(p.split()) for p in paragraphs]
+    report.paragraphs = len(sizes)
+    report.long_paragraphs = sum(1 for n in sizes if n > LONG_PARAGRAPH_WORDS)
+    report.max_paragraph_words = max(sizes, default=0)
+
+    hook = "\n".join(paragraphs)[:HOOK_CHARS]
+    report.hook_phrases = sorted(hook_matcher.count(tokenize(hook)))
+
+    if report.banned:
+        report.hard_failures.append(f"Remove these banned AI-cliché words: {sorted(report.banned)}.")
+    if report.hook_phrases:
+        report.hard_failures.append(f"The hook opens with a generic phrase ({', '.join(report.hook_phrases)}). Lead with a concrete fact or number.")
+    if report.word_count and report.data_density < MIN_NUMBERS_PER_100_WORDS:
+        report.hard_failures.append("No concrete numbers, dates or prices. Add specific data points.")
+    if not report.headers:
+        report.warnings.append("Add clear markdown headers to break up the article.")
+    if report.long_paragraphs:
+        report.warnings.append(f"{report.long_paragraphs} paragraph(s) exceed {LONG_PARAGRAPH_WORDS} words. Split them up.")
+    return report
+
+
+def research_score(summary: str) -> int:
+    """Local score for a research synthesis: enough substance, and dense with concrete data."""
+    report = assess(summary)
+    if report.word_count < 80:
+        return round(report.word_count * 50 / 80)
+    return min(100, 40 + round(report.data_density * 10))
@@ -0,0 +1,37 @@
+"""
+Runs the API under uvicorn with one or more worker processes.
+
+    python -m backend.serve --port 7860 --workers 4
+    TRENDFLOW_WORKERS=4 python -m backend.serve
+
+Workers share the response cache, rate limits and the background-jobs lease
+through backend/shared_cache.py (SQLite in the data dir, or Redis when
+REDIS_URL is set). Behind a reverse proxy, set FORWARDED_ALLOW_IPS to the
+proxy's address so rate limits see the real client IP. Not "*": trusting
+every peer lets clients choose their own IP with an X-Forwarded-For header.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def default_workers() -> int:
+    return int(os.getenv("TRENDFLOW_WORKERS") or os.getenv("WEB_CONCURRENCY") or 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (TRENDFLOW_WORKERS / WEB_CONCURRENCY, default 1); about one per core")
+    parser.add_argument("--app", default="backend.main:app" if __package__ else "main:app",
+                        help="ASGI app to serve, as module:attribute")
+    args = parser.parse_args(argv)
+
+    uvicorn.run(args.app, host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.telemetry import log_event, metrics, record_cache
+except ImportError:
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from telemetry import log_event, metrics, record_cache
+
+# --- CONFIGURATION ---
+REDIS_URL = os.getenv("REDIS_URL")                # shared across hosts when set
+CACHE_DB_PATH = os.getenv("TRENDFLOW_CACHE_DB")   # otherwise: cache.sqlite3 in the data dir, shared by the host's workers
+PURGE_EVERY = 500                                 # writes between sweeps of expired SQLite rows
+FILL_WAIT_S = 5.0                                 # longest a worker waits for another to fill the same key
+FILL_POLL_S = 0.05                                # how often the waiting workers look for it
+
+# Identifies this process in leases
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SQLiteCache:
+    """
+    Cache entries, rate-limit counters and leases in one WAL SQLite file.
+
+    Every worker on the host opens the same file, so a value fetched by one
+    worker is a hit for the others and a rate limit counts requests across
+    all of them. Values are JSON. Calls block for tens of microseconds; async
+    callers go through the helpers below.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl_s: float):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, json.dumps(value, default=str), time.time() + ttl_s))
+            self._purge()
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, window_s: float) -> int:
+        """Count in the current fixed window of `window_s` (for rate limits)."""
+        now = time.time()
+        window = f"{key}@{int(now // window_s)}"
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "INSERT INTO kv (key, value, expires_at) VALUES (?, '1', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1 RETURNING value",
+                (window, (now // window_s + 1) * window_s)).fetchone()
+            self._purge()
+        return int(row[0])
+
+    def acquire_lease(self, name: str, owner: str, ttl_s: float) -> bool:
+        """Takes or renews `name` for `owner`; False while another live owner holds it."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl_s, now))
+            row = self._conn.execute("SELECT owner FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def release_lease(self, name: str, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def _purge(self):
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self._conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+            self._conn.execute("DELETE FROM leases WHERE expires_at <= ?", (time.time(),))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM kv WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+            leases = [dict(r) for r in self._conn.execute("SELECT name, owner, expires_at FROM leases")]
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "leases": leases}
+
+
+class RedisCache:
+    """Same interface on Redis (or anything that speaks its protocol), for workers on several hosts."""
+
+    def __init__(self, url: str):
+        import redis
+        self.url = url
+        self._redis = redis.Redis.from_url(url, socket_timeout=2)
+
+    def get(self, key: str) -> Any:
+        value = self._redis.get(f"trendflow:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Any, ttl_s: float):
+        self._redis.set(f"trendflow:{key}", json.dumps(value, default=str), px=max(1, int(ttl_s * 1000)))
+
+    def delete(self, key: str):
+        self._redis.delete(f"trendflow:{key}")
+
+    def incr(self, key: str, window_s: float) -> int:
+        window = f"trendflow:{key}@{int(time.time() // window_s)}"
+        pipe = self._redis.pipeline()
+        pipe.incr(window)
+        pipe.expire(window, int(window_s) + 1)
+        return int(pipe.execute()[0])
+
+    def acquire_lease(self, name: str, owner: str, ttl_s: float) -> bool:
+        key = f"trendflow:lease:{name}"
+        if self._redis.set(key, owner, nx=True, px=int(ttl_s * 1000)):
+            return True
+        current = self._redis.get(key)
+        if current is not None and current.decode() == owner:
+            self._redis.pexpire(key, int(ttl_s * 1000))
+            return True
+        return False
+
+    def release_lease(self, name: str, owner: str):
+        key = f"trendflow:lease:{name}"
+        current = self._redis.get(key)
+        if current is not None and current.decode() == owner:
+            self._redis.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "url": self.url.split("@")[-1], "entries": self._redis.dbsize()}
+
+
+def open_shared_cache():
+    if REDIS_URL:
+        return RedisCache(REDIS_URL)
+    return SQLiteCache(CACHE_DB_PATH or data_path("cache.sqlite3"))
+
+
+shared_cache = LazyObject(open_shared_cache, label="shared_cache")
+
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+async def lookup(key: str) -> Any:
+    """shared_cache.get off the event loop; None (a miss) if the cache is unavailable."""
+    try:
+        return await asyncio.to_thread(shared_cache.get, key)
+    except Exception as e:
+        log_event("shared_cache_error", op="get", error=str(e)[:200])
+        return None
+
+
+async def store(key: str, value: Any, ttl_s: float):
+    try:
+        await asyncio.to_thread(shared_cache.set, key, value, ttl_s)
+    except Exception as e:
+        log_event("shared_cache_error", op="set", error=str(e)[:200])
+
+
+async def invalidate(key: str):
+    try:
+        await asyncio.to_thread(shared_cache.delete, key)
+    except Exception as e:
+        log_event("shared_cache_error", op="delete", error=str(e)[:200])
+
+
+async def cached(namespace: str, key: str, ttl_s: float, produce: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Value of `produce()` shared by every worker for `ttl_s`. Concurrent misses
+    for the same key within this worker wait for one call, and across
+    workers a short lease lets one fill the key while the others poll for it
+    (up to FILL_WAIT_S). A failing cache never fails the request: it falls
+    back to calling `produce` directly. Empty results are returned but not
+    stored.
+    """
+    full_key = f"{namespace}:{key}"
+    hit = await lookup(full_key)
+    record_cache(namespace, hit is not None)
+    if hit is not None:
+        return hit
+
+    pending = _inflight.get(full_key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise          # this request was cancelled, not the one it was waiting on
+            return await produce()
+    future = asyncio.get_running_loop().create_future()
+    _inflight[full_key] = future
+    filling = await _claim_fill(full_key)
+    try:
+        value = None
+        while not filling:  # another worker is producing it: wait for its result
+            await asyncio.sleep(FILL_POLL_S)
+            value = await lookup(full_key)
+            if value is not None:
+                break
+            filling = await _claim_fill(full_key)  # it finished empty, failed, or its lease ran out
+        if value is None:
+            value = await produce()
+        if value and filling:  # an empty result (every provider failed) is not worth sharing
+            await store(full_key, value, ttl_s)
+        future.set_result(value)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved: waiters re-raise it, nobody else has to
+        raise
+    finally:
+        _inflight.pop(full_key, None)
+        if filling:
+            await _release_fill(full_key)
+    return value
+
+
+async def _claim_fill(full_key: str) -> bool:
+    try:
+        return await asyncio.to_thread(shared_cache.acquire_lease, f"fill:{full_key}", WORKER_ID, FILL_WAIT_S)
+    except Exception:
+        return True  # nothing to coordinate through: just fill it
+
+
+async def _release_fill(full_key: str):
+    try:
+        await asyncio.to_thread(shared_cache.release_lease, f"fill:{full_key}", WORKER_ID)
+    except Exception:
+        pass
+
+
+async def allow(bucket: str, key: str, limit: int, window_s: float = 60.0) -> bool:
+    """Fixed-window rate limit counted across all workers. Fails open if the cache is unavailable."""
+    if limit <= 0:
+        return True
+    try:
+        count = await asyncio.to_thread(shared_cache.incr, f"rate:{bucket}:{key}", window_s)
+    except Exception as e:
+        log_event("shared_cache_error", op="incr", error=str(e)[:200])
+        return True
+    if count > limit:
+        metrics.inc("trendflow_rate_limited_total", help="Requests rejected by a rate limit", bucket=bucket)
+        return False
+    return True
+
+
+class LeaderLease:
+    """
+    Elects one worker to run the singleton background jobs (feed poller,
+    outbox flusher, prewarming shared entries). Renews every ttl/3; when the
+    holder dies, another worker takes over within `ttl_s`.
+    """
+
+    def __init__(self, name: str, on_acquire: Callable[[], Awaitable[None]], on_release: Callable[[], Awaitable[None]],
+                 ttl_s: float = 30.0):
+        self.name = name
+        self.on_acquire = on_acquire
+        self.on_release = on_release
+        self.ttl_s = ttl_s
+        self.held = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        while True:
+            try:
+                held = await asyncio.to_thread(shared_cache.acquire_lease, self.name, WORKER_ID, self.ttl_s)
+            except Exception as e:
+                log_event("lease_error", lease=self.name, error=str(e)[:200])
+                held = False
+            if held != self.held:
+                self.held = held
+                metrics.set("trendflow_leader", int(held), help="1 on the worker running the background jobs", lease=self.name)
+                log_event("lease_acquired" if held else "lease_lost", lease=self.name, worker=WORKER_ID)
+                try:
+                    await (self.on_acquire() if held else self.on_release())
+                except Exception as e:
+                    # A failing job start/stop must not end the renewals (the lease would lapse mid-run)
+                    log_event("lease_callback_error", lease=self.name, held=held, error=str(e)[:200])
+            await asyncio.sleep(self.ttl_s / 3)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.held:
+            self.held = False
+            await self.on_release()
+            try:
+                await asyncio.to_thread(shared_cache.release_lease, self.name, WORKER_ID)
+            except Exception:
+                pass
@@ -0,0 +1,384 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# --- LOGGING ---
+# Every span is emitted as one JSON line on the "trendflow.telemetry" logger so
+# it can be shipped as-is to any log aggregator.
+logger = logging.getLogger("trendflow.telemetry")
+
+
+def configure_logging():
+    """Attaches a plain stderr handler once, so JSON lines are not lost when the
+    host (uvicorn, scripts) has not configured the root logger."""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(os.getenv("TRENDFLOW_LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+
+def log_event(event: str, **fields):
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, **fields}, default=str))
+
+
+# --- METRICS REGISTRY (Prometheus text format) ---
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Minimal in-process counters, gauges and histograms rendered in the Prometheus
+    exposition format. Avoids pulling in prometheus_client for a handful of series."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, list]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    @staticmethod
+    def _key(labels: dict) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def set(self, name: str, value: float, help: str = "", **labels):
+        """Sets a gauge to its current value."""
+        key = self._key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # [bucket counts..., sum, count]
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * len(DEFAULT_BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+            if help:
+                self._help.setdefault(name, help)
+
+    @staticmethod
+    def _fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ""
+        body = ",".join(
+            k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for k, v in pairs
+        )
+        return "{" + body + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._fmt_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._fmt_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, state in series.items():
+                    for i, bound in enumerate(DEFAULT_BUCKETS):
+                        lines.append(f"{name}_bucket{self._fmt_labels(key, (('le', str(bound)),))} {state[i]}")
+                    lines.append(f"{name}_bucket{self._fmt_labels(key, (('le', '+Inf'),))} {state[-1]}")
+                    lines.append(f"{name}_sum{self._fmt_labels(key)} {state[-2]}")
+                    lines.append(f"{name}_count{self._fmt_labels(key)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# --- PER-RUN TRACE ---
+class RunTrace:
+    """Collects every span recorded while one graph run is active."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, kind: str, name: str, duration_s: float, **fields):
+        with self._lock:
+            self.spans.append({"kind": kind, "name": name, "duration_s": duration_s, **fields})
+
+    def summary(self) -> dict:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        nodes, providers, llm = {}, {}, {}
+        cache = {"hits": 0, "misses": 0}
+        routing = []
+        degradations = []
+        saved = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            kind, name, dur = span["kind"], span["name"], span["duration_s"]
+            if kind == "node":
+                agg = nodes.setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            elif kind == "provider":
+                agg = providers.setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0, "results": 0, "errors": 0})
+                agg["results"] += span.get("results", 0)
+                agg["errors"] += 1 if span.get("status", "ok") != "ok" else 0
+            elif kind == "llm":
+                agg = llm.setdefault(name, {"calls": 0, "total_s": 0.0, "max_s": 0.0,
+                                            "input_tokens": 0, "output_tokens": 0, "retries": 0})
+                agg["input_tokens"] += span.get("input_tokens", 0)
+                agg["output_tokens"] += span.get("output_tokens", 0)
+                agg["retries"] += span.get("retries", 0)
+            elif kind == "cache":
+                cache["hits" if span.get("hit") else "misses"] += 1
+                continue
+            elif kind == "saved":
+                saved[name] = saved.get(name, 0) + span.get("count", 0)
+                continue
+            elif kind == "degradation":
+                degradations.append({"step": name,
+                                     **{k: v for k, v in span.items() if k not in ("kind", "name", "duration_s")}})
+                continue
+            elif kind == "route":
+                routing.append({"site": name, "duration_s": round(dur, 4),
+                                **{k: v for k, v in span.items() if k not in ("kind", "name", "duration_s")}})
+                continue
+            else:
+                continue
+            agg["calls"] += 1
+            agg["total_s"] = round(agg["total_s"] + dur, 4)
+            agg["max_s"] = round(max(agg["max_s"], dur), 4)
+
+        slowest = max(nodes.items(), key=lambda kv: kv[1]["total_s"])[0] if nodes else None
+        return {
+            "run_id": self.run_id,
+            "total_s": round(end - self.started, 4),
+            "slowest_node": slowest,
+            "nodes": nodes,
+            "providers": providers,
+            "llm": llm,
+            "cache": cache,
+            "routing": routing,
+            "degradations": degradations,
+            "llm_calls_saved": {"total": sum(saved.values()), **saved},
+        }
+
+
+_current_run: ContextVar[Optional[RunTrace]] = ContextVar("trendflow_run", default=None)
+
+
+def current_run() -> Optional[RunTrace]:
+    return _current_run.get()
+
+
+@contextmanager
+def trace_run(run_id: Optional[str] = None):
+    """Activates a RunTrace for everything executed inside the block."""
+    run = RunTrace(run_id)
+    token = _current_run.set(run)
+    status = "ok"
+    try:
+        yield run
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        _current_run.reset(token)
+        run.finished = time.perf_counter()
+        duration = run.finished - run.started
+        metrics.inc("trendflow_runs_total", help="Graph runs by outcome", status=status)
+        metrics.observe("trendflow_run_seconds", duration, help="End-to-end graph run wall time")
+        log_event("run", run_id=run.run_id, status=status, duration_s=round(duration, 4),
+             summary=run.summary())
+
+
+def _record(kind: str, name: str, duration_s: float, **fields):
+    run = _current_run.get()
+    if run is not None:
+        run.add_span(kind, name, duration_s, **fields)
+    log_event(kind, run_id=run.run_id if run else None, name=name, duration_s=round(duration_s, 4), **fields)
+
+
+def traced_node(name: str):
+    """Wraps a StateGraph node so its wall time lands in the run trace and metrics."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return fn(state, *args, **kwargs)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                metrics.observe("trendflow_node_seconds", duration, help="Graph node wall time", node=name)
+                metrics.inc("trendflow_node_calls_total", help="Graph node executions", node=name, status=status)
+                _record("node", name, duration, status=status)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def provider_span(provider: str):
+    """Times one outbound news-provider call. Callers may set span["results"]."""
+    span = {"results": 0, "status": "ok"}
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception:
+        span["status"] = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        metrics.observe("trendflow_provider_seconds", duration, help="News provider call wall time", provider=provider)
+        metrics.inc("trendflow_provider_calls_total", help="News provider calls", provider=provider, status=span["status"])
+        metrics.inc("trendflow_provider_results_total", span["results"], help="Articles returned by provider", provider=provider)
+        _record("provider", provider, duration, **span)
+
+
+def record_cache(cache: str, hit: bool):
+    """Counts a cache lookup. Used by any layer that short-circuits an upstream call."""
+    metrics.inc("trendflow_cache_lookups_total", help="Cache lookups by outcome",
+                cache=cache, result="hit" if hit else "miss")
+    run = _current_run.get()
+    if run is not None:
+        run.add_span("cache", cache, 0.0, hit=hit)
+
+
+def record_route(site: str, duration_s: float, **fields):
+    """Records one model-cascade attempt (see model_router.py)."""
+    _record("route", site, duration_s, **fields)
+
+
+def record_saved_calls(count: int, reason: str):
+    """Counts LLM calls a run skipped (local gate, revision plateau, ...)."""
+    metrics.inc("trendflow_llm_calls_saved_total", count, help="LLM calls skipped by reason", reason=reason)
+    run = _current_run.get()
+    if run is not None:
+        run.add_span("saved", reason, 0.0, count=count)
+
+
+def record_degradation(step: str, **fields):
+    """Records a step cut short to meet the run's deadline (see deadline.py)."""
+    metrics.inc("trendflow_degradations_total", help="Pipeline steps degraded to meet a deadline", step=step)
+    run = _current_run.get()
+    if run is not None:
+        run.add_span("degradation", step, 0.0, **fields)
+
+
+# --- LLM CALLBACK ---
+# LLM call in progress in this context: set by the callback when a sync call starts
+# (sync callbacks run inline), so code under the model can attribute retries to it.
+_llm_call: ContextVar[Optional[uuid.UUID]] = ContextVar("trendflow_llm_call", default=None)
+
+
+class LLMTelemetryCallback(BaseCallbackHandler):
+    """LangChain callback attached to the Gemini clients. Records latency,
+    token usage and retries for every call, including structured-output ones."""
+
+    def __init__(self):
+        self._starts: Dict[uuid.UUID, tuple] = {}
+        self._retries: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model", "unknown")
+        with self._lock:
+            self._starts[run_id] = (time.perf_counter(), model, metadata.get("langgraph_node"))
+        _llm_call.set(run_id)
+
+    def add_retry(self, run_id):
+        """Counts one more attempt of the call `run_id`; reported when it finishes."""
+        with self._lock:
+            if run_id in self._starts:
+                self._retries[run_id] = self._retries.get(run_id, 0) + 1
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        self.add_retry(run_id)
+
+    def _finish(self, run_id, status: str, response=None):
+        if _llm_call.get() == run_id:
+            _llm_call.set(None)
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+            retries = self._retries.pop(run_id, 0)
+        if started is None:
+            return
+        start, model, node = started
+        duration = time.perf_counter() - start
+        input_tokens = output_tokens = 0
+        if response is not None:
+            for generations in response.generations:
+                for gen in generations:
+                    usage = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        metrics.observe("trendflow_llm_seconds", duration, help="LLM call wall time", model=model)
+        metrics.inc("trendflow_llm_calls_total", help="LLM calls by outcome", model=model, status=status)
+        metrics.inc("trendflow_llm_tokens_total", input_tokens, help="LLM tokens", model=model, direction="input")
+        metrics.inc("trendflow_llm_tokens_total", output_tokens, help="LLM tokens", model=model, direction="output")
+        if retries:
+            metrics.inc("trendflow_llm_retries_total", retries, help="LLM call retries", model=model)
+        _record("llm", model, duration, node=node, status=status,
+                input_tokens=input_tokens, output_tokens=output_tokens, retries=retries)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "ok", response)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error")
+
+
+llm_telemetry = LLMTelemetryCallback()
+
+
+def record_llm_retry(run_manager=None):
+    """
+    Counts a retry of the LLM call in progress: the one `run_manager` belongs
+    to, else the sync call started last in this context. Provider SDK retries
+    happen below LangChain and are not visible here; ours are (llm_scheduler.py).
+    """
+    run_id = getattr(run_manager, "run_id", None) or _llm_call.get()
+    if run_id is not None:
+        llm_telemetry.add_retry(run_id)
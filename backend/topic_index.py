@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import random
+import re
+import struct
+import threading
+import time
+from typing import List, Optional
+
+try:
+    from backend.lazy import LazyObject
+    from backend.local_data import connect, data_path
+    from backend.trends import STOPWORDS
+except ImportError:
+    from lazy import LazyObject
+    from local_data import connect, data_path
+    from trends import STOPWORDS
+
+# --- CONFIGURATION ---
+TOPIC_REUSE = os.getenv("TRENDFLOW_TOPIC_REUSE", "1") == "1"
+REUSE_WINDOW_S = float(os.getenv("TRENDFLOW_TOPIC_REUSE_HOURS", "6")) * 3600  # how fresh a reused generation must be
+SIMILARITY = float(os.getenv("TRENDFLOW_TOPIC_REUSE_SIMILARITY", "0.6"))       # keyword Jaccard for a near-match
+TOPIC_DB_PATH = os.getenv("TRENDFLOW_TOPIC_DB")  # default: topics.sqlite3 in the data dir
+
+NUM_PERM = 32
+BANDS = 16                    # 16 bands x 2 rows: pairs from Jaccard ~0.25 up become candidates
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)    # fixed: signatures must be comparable across processes and restarts
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.'-][a-z0-9]+)*")
+
+
+def _stem(word: str) -> str:
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+def normalize(topic: str) -> List[str]:
+    """Sorted keyword set of a topic: lowercased, stopwords dropped, plurals folded ("AI chips" == "the AI chip")."""
+    return sorted({_stem(w) for w in WORD_RE.findall(topic.lower()) if w not in STOPWORDS})
+
+
+def _hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+def signature(keywords: List[str]) -> List[int]:
+    """MinHash signature of a keyword set."""
+    hashes = [_hash(k) for k in keywords]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(sig: List[int]) -> List[int]:
+    """One LSH bucket per band (signed 64-bit, to fit an SQLite integer)."""
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f">{ROWS}Q", *sig[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def jaccard(a: List[str], b: List[str]) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+# --- INDEX ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT,
+    post_id TEXT,
+    topic TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    research_topic TEXT,
+    research_summary TEXT,
+    search_queries TEXT,
+    researched_at REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_created ON generations (created_at);
+CREATE TABLE IF NOT EXISTS generation_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    generation_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, generation_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS generation_bands_generation ON generation_bands (generation_id);
+"""
+
+
+class TopicIndex:
+    """
+    Recent generations, looked up by topic similarity (MinHash LSH over the
+    topic's normalized keywords, then exact keyword Jaccard). A near-match
+    lets /generate-pro-blog offer the user's existing post, or seed the
+    pipeline with the research it already did. Shared by every worker on the host.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def record(self, topic: str, user_id: Optional[str], post_id: Optional[str], research_topic: Optional[str],
+               research_summary: Optional[str], search_queries: Optional[List[str]] = None,
+               researched_at: Optional[float] = None, now: Optional[float] = None) -> Optional[int]:
+        keywords = normalize(topic)
+        if not keywords:
+            return None
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._prune(now - REUSE_WINDOW_S)
+            cur = self._conn.execute(
+                "INSERT INTO generations (user_id, post_id, topic, keywords, research_topic, research_summary, "
+                "search_queries, researched_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, post_id, topic, " ".join(keywords), research_topic, research_summary,
+                 json.dumps(search_queries or []), researched_at or now, now),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO generation_bands (band, bucket, generation_id) VALUES (?, ?, ?)",
+                [(band, key, cur.lastrowid) for band, key in enumerate(band_keys(signature(keywords)))],
+            )
+        return cur.lastrowid
+
+    def find(self, topic: str, user_id: Optional[str] = None, max_age_s: float = REUSE_WINDOW_S,
+             min_similarity: float = SIMILARITY, now: Optional[float] = None) -> Optional[dict]:
+        """
+        Best recent near-match for `topic`, or None. The user's own generations
+        rank first (their post can be offered), then similarity, then recency.
+        """
+        keywords = normalize(topic)
+        if not keywords:
+            return None
+        cutoff = (time.time() if now is None else now) - max_age_s
+        clauses = " OR ".join("(b.band = ? AND b.bucket = ?)" for _ in range(BANDS))
+        params = [v for pair in enumerate(band_keys(signature(keywords))) for v in pair]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT g.* FROM generation_bands b JOIN generations g ON g.id = b.generation_id "
+                f"WHERE ({clauses}) AND g.created_at >= ?", (*params, cutoff),
+            ).fetchall()
+        best, best_rank = None, None
+        for row in rows:
+            similarity = jaccard(keywords, row["keywords"].split())
+            if similarity < min_similarity:
+                continue
+            rank = (user_id is not None and row["user_id"] == user_id, similarity, row["created_at"])
+            if best_rank is None or rank > best_rank:
+                best, best_rank = row, rank
+        if best is None:
+            return None
+        match = {
+            **{key: best[key] for key in ("user_id", "post_id", "topic", "research_topic", "research_summary",
+                                          "researched_at", "created_at")},
+            "search_queries": json.loads(best["search_queries"] or "[]"),
+            "similarity": round(best_rank[1], 3),
+            "own": best_rank[0],
+        }
+        # A post written from reused research is recent, but its research may not be
+        if match["researched_at"] < cutoff:
+            match["research_summary"] = None
+        return match
+
+    def _prune(self, cutoff: float) -> int:
+        self._conn.execute("DELETE FROM generation_bands WHERE generation_id IN "
+                           "(SELECT id FROM generations WHERE created_at < ?)", (cutoff,))
+        return self._conn.execute("DELETE FROM generations WHERE created_at < ?", (cutoff,)).rowcount
+
+    def prune(self, max_age_s: float = REUSE_WINDOW_S) -> int:
+        with self._lock, self._conn:
+            return self._prune(time.time() - max_age_s)
+
+    def stats(self) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), MIN(created_at) FROM generations").fetchone()
+        return {"path": self.path, "generations": row[0], "oldest_created_at": row[1],
+                "window_s": REUSE_WINDOW_S, "similarity": SIMILARITY}
+
+
+# Opened on first use so importing the API never touches the disk
+topic_index = LazyObject(lambda: TopicIndex(TOPIC_DB_PATH or data_path("topics.sqlite3")), label="topic_index")
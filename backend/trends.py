@@ -0,0 +1,247 @@
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from backend.articles import Article, dedupe_key
+    from backend.lazy import LazyObject, lazy_module
+    from backend.telemetry import log_event, metrics
+except ImportError:
+    from articles import Article, dedupe_key
+    from lazy import LazyObject, lazy_module
+    from telemetry import log_event, metrics
+
+np = lazy_module("numpy")  # only needed once articles flow in; keeps it off the startup path
+
+# --- CONFIGURATION ---
+BUCKET_S = int(os.getenv("TRENDFLOW_TREND_BUCKET_S", "3600"))   # one sketch slice per hour
+BUCKETS = int(os.getenv("TRENDFLOW_TREND_BUCKETS", "24"))        # sliding window = BUCKETS x BUCKET_S
+RECENT_BUCKETS = int(os.getenv("TRENDFLOW_TREND_RECENT_BUCKETS", "3"))
+SKETCH_WIDTH_BITS = int(os.getenv("TRENDFLOW_TREND_SKETCH_BITS", "14"))
+SKETCH_DEPTH = 4
+CANDIDATES = int(os.getenv("TRENDFLOW_TREND_CANDIDATES", "1024"))
+MIN_RECENT = 3                       # a term must appear this often lately to count as rising
+SEEN_ARTICLES = 20000                # articles remembered for dedupe (x2, rotated)
+
+# --- TERM EXTRACTION ---
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my new no nor not now of off
+on once only or other our out over own read said same says she should so some such than that the their
+them then there these they this those through to too under until up very via was we were what when where
+which while who whom why will with would you your full article news report reports week today year years
+""".split())
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#]*(?:[.'-][A-Za-z0-9]+)*")
+
+
+def extract_terms(text: str) -> List[Tuple[str, str]]:
+    """(key, display) pairs: unigrams, bigrams and capitalised phrases of 3+ words, stopwords removed."""
+    out: List[Tuple[str, str]] = []
+    run: List[str] = []          # current run of capitalised words, for multi-word entities
+    prev: Optional[str] = None
+    for word in WORD_RE.findall(text):
+        lower = word.lower()
+        if lower in STOPWORDS or len(lower) < 2:
+            if len(run) >= 3:
+                out.append((" ".join(w.lower() for w in run), " ".join(run)))
+            run, prev = [], None
+            continue
+        out.append((lower, word))
+        if prev is not None:
+            out.append((f"{prev.lower()} {lower}", f"{prev} {word}"))
+        prev = word
+        if word[0].isupper():
+            run.append(word)
+        else:
+            if len(run) >= 3:
+                out.append((" ".join(w.lower() for w in run), " ".join(run)))
+            run = []
+    if len(run) >= 3:
+        out.append((" ".join(w.lower() for w in run), " ".join(run)))
+    return out
+
+
+# --- ENGINE ---
+class TrendEngine:
+    """
+    Rising topics over every article the backend fetches, in bounded memory.
+
+    Term counts go into a ring of count-min sketches, one per time bucket, so
+    the window slides by zeroing the oldest slice. Heavy hitters are tracked as
+    a bounded candidate set ranked by their sketch estimate; velocity for all
+    candidates is computed in one vectorised pass (recent rate vs. the rate
+    over the rest of the window, in standard deviations of a Poisson count).
+    Memory is fixed by the sketch size and CANDIDATES, whatever the volume.
+    """
+
+    def __init__(self, bucket_s: int = BUCKET_S, buckets: int = BUCKETS, recent_buckets: int = RECENT_BUCKETS,
+                 width_bits: int = SKETCH_WIDTH_BITS, depth: int = SKETCH_DEPTH, capacity: int = CANDIDATES,
+                 seen_capacity: int = SEEN_ARTICLES, clock: Callable[[], float] = time.time):
+        if not 0 < recent_buckets < buckets:
+            raise ValueError("recent_buckets must be between 1 and buckets - 1")
+        self.bucket_s = bucket_s
+        self.buckets = buckets
+        self.recent_buckets = recent_buckets
+        self.width_bits = width_bits
+        self.depth = depth
+        self.capacity = capacity
+        self.seen_capacity = seen_capacity
+        self.clock = clock
+        self.counts = np.zeros((buckets, depth, 1 << width_bits), dtype=np.uint32)
+        rng = np.random.default_rng(0x7EED)
+        # multiply-shift hashing: odd 64-bit multipliers, one per sketch row
+        self._mul = (rng.integers(1, 2**63, size=depth, dtype=np.uint64) | np.uint64(1))[:, None]
+        self._shift = np.uint64(64 - width_bits)
+        self._candidates: Dict[str, str] = {}    # key -> latest display form
+        self._seen, self._seen_old = set(), set()
+        self._epoch: Optional[int] = None        # bucket number of the newest slice
+        self._live = 0                           # slices that have been in use (for the baseline)
+        self._lock = threading.Lock()
+        self.terms_observed = 0
+
+    # Sketch internals
+    def _rows(self, hashes) -> "np.ndarray":
+        """(depth, n) column index of each hash in each sketch row."""
+        with np.errstate(over="ignore"):
+            return (hashes[None, :] * self._mul) >> self._shift
+
+    def _advance(self, now: float) -> int:
+        """Moves the window to `now`, clearing slices that fell out of it. Returns the current slot."""
+        epoch = int(now // self.bucket_s)
+        if self._epoch is None:
+            self._epoch, self._live = epoch, 1
+        elif epoch > self._epoch:
+            for e in range(self._epoch + 1, min(epoch, self._epoch + self.buckets) + 1):
+                self.counts[e % self.buckets] = 0
+            self._live = min(self.buckets, self._live + epoch - self._epoch)
+            self._epoch = epoch
+        return self._epoch % self.buckets
+
+    @staticmethod
+    def _hashes(keys: List[str]) -> "np.ndarray":
+        return np.fromiter(map(hash, keys), dtype=np.int64, count=len(keys)).view(np.uint64)
+
+    def _estimates(self, hashes) -> "np.ndarray":
+        """(buckets, n) count estimates per slice, oldest slice first."""
+        rows = self._rows(hashes)
+        per_row = self.counts[:, np.arange(self.depth)[:, None], rows]     # (buckets, depth, n)
+        order = (self._epoch + 1 + np.arange(self.buckets)) % self.buckets
+        return per_row.min(axis=1)[order]
+
+    # Ingest
+    def observe_terms(self, terms: List[Tuple[str, str]], now: Optional[float] = None):
+        if not terms:
+            return
+        rows = self._rows(self._hashes([key for key, _ in terms]))
+        with self._lock:
+            slot = self._advance(self.clock() if now is None else now)
+            sketch = self.counts[slot]
+            if len(terms) * 8 > sketch.shape[1]:
+                width = sketch.shape[1]
+                for d in range(self.depth):
+                    sketch[d] += np.bincount(rows[d], minlength=width).astype(np.uint32)
+            else:
+                np.add.at(sketch, (np.arange(self.depth)[:, None], rows), 1)
+            # Every term of the batch becomes a candidate; pruning keeps the set bounded
+            self._candidates.update(terms)
+            if len(self._candidates) > 2 * self.capacity:
+                self._prune()
+            self.terms_observed += len(terms)
+
+    def _prune(self):
+        """Keeps the `capacity` candidates that are hottest lately (ties broken by their window total)."""
+        keys = list(self._candidates)
+        est = self._estimates(self._hashes(keys))
+        rank = est[-self.recent_buckets:].sum(axis=0) + est.sum(axis=0) / self.buckets
+        keep = np.argpartition(-rank, self.capacity)[: self.capacity]
+        self._candidates = {keys[i]: self._candidates[keys[i]] for i in keep.tolist()}
+
+    def observe(self, articles: Iterable[Article], now: Optional[float] = None) -> int:
+        """Counts the terms of articles not seen before. Returns how many articles were new."""
+        terms: List[Tuple[str, str]] = []
+        fresh = 0
+        with self._lock:
+            for article in articles:
+                key = dedupe_key(article)
+                if key in self._seen or key in self._seen_old:
+                    continue
+                self._seen.add(key)
+                if len(self._seen) > self.seen_capacity:
+                    self._seen_old, self._seen = self._seen, set()
+                fresh += 1
+                terms.extend(extract_terms(f"{article.title}. {article.summary}"))
+        self.observe_terms(terms, now)
+        return fresh
+
+    # Query
+    def rising(self, limit: int = 10, min_recent: int = MIN_RECENT, now: Optional[float] = None) -> List[dict]:
+        """Candidates whose recent rate is furthest above their rate over the rest of the window."""
+        with self._lock:
+            if not self._candidates or self._epoch is None:
+                return []
+            self._advance(self.clock() if now is None else now)
+            keys = list(self._candidates)
+            displays = list(self._candidates.values())
+            est = self._estimates(self._hashes(keys)).astype(np.float64)
+            live = self._live
+        r = self.recent_buckets
+        recent = est[-r:].sum(axis=0)
+        recent_rate = recent / r
+        older_slices = max(0, min(live, self.buckets) - r)
+        baseline_rate = est[-r - older_slices:-r].sum(axis=0) / older_slices if older_slices else np.zeros_like(recent)
+        score = (recent_rate - baseline_rate) / np.sqrt(baseline_rate + 1.0)
+        score[recent < min_recent] = -np.inf
+        # Over-fetch: parts of the same phrase ("Wafer", "Wafer Engine") collapse into one topic below
+        n = min(limit * 5, len(keys))
+        top = np.argpartition(-score, n - 1)[:n]
+        lengths = np.array([keys[i].count(" ") for i in top.tolist()])
+        top = top[np.lexsort((-lengths, -score[top]))]   # by score, longer phrase first on ties
+
+        chosen: List[int] = []
+        for i in top.tolist():
+            if not (np.isfinite(score[i]) and score[i] > 0):
+                break
+            words = set(keys[i].split())
+            parts = [j for j, c in enumerate(chosen) if set(keys[c].split()) <= words]
+            if any(words <= set(keys[c].split()) for c in chosen):
+                continue
+            if not parts:
+                chosen.append(i)
+            elif all(recent[i] >= 0.8 * recent[chosen[j]] for j in parts):
+                # The longer phrase names the same story as the pieces already picked
+                chosen[parts[0]] = i
+                chosen = [c for j, c in enumerate(chosen) if j not in parts[1:]]
+        return [{
+            "topic": displays[i],
+            "score": round(float(score[i]), 2),
+            "recent": int(recent[i]),
+            "recent_per_hour": round(float(recent_rate[i]) * 3600 / self.bucket_s, 2),
+            "baseline_per_hour": round(float(baseline_rate[i]) * 3600 / self.bucket_s, 2),
+            "kind": "entity" if displays[i][:1].isupper() else "term",
+        } for i in chosen[:limit]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window_s": self.bucket_s * self.buckets,
+                "terms_observed": self.terms_observed,
+                "candidates": len(self._candidates),
+                "sketch_bytes": int(self.counts.nbytes),
+                "seen_articles": len(self._seen) + len(self._seen_old),
+            }
+
+
+trend_engine = LazyObject(TrendEngine, label="trend_engine")
+
+
+def record_articles(articles: Iterable[Article]):
+    """Feeds fetched articles to the trend engine; never lets trend tracking break a fetch."""
+    try:
+        fresh = trend_engine.observe(articles)
+        metrics.inc("trendflow_trend_articles_total", fresh, help="Articles counted by the trend engine")
+    except Exception as e:
+        log_event("trend_ingest_failed", error=str(e)[:200])
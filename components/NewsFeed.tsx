@@ -8,24 +8,20 @@ export const NewsFeed: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [topic, setTopic] = useState('Technology');
 
-  // Initial fetch of a large batch
+  // Live feed: a large first batch (for instant "Load More"), then new items pushed by the server
   useEffect(() => {
-    loadNews();
-  }, [topic]);
-
-  const loadNews = async () => {
     setLoading(true);
-    try {
-      // Fetch a large batch (e.g., 50) to allow instant "Load More"
-      const data = await api.getNews(topic, 50);
-      setAllNews(data);
-      setVisibleCount(9); // Reset visible count on new topic
-    } catch (error) {
-      console.error("Failed to load news", error);
-    } finally {
-      setLoading(false);
-    }
-  };
+    const unsubscribe = api.subscribeNews(topic, 50, {
+      onSnapshot: (items) => {
+        setAllNews(items);
+        setVisibleCount(9); // Reset visible count on new topic
+        setLoading(false);
+      },
+      onNews: (items) => setAllNews(prev => [...items, ...prev]),
+      onError: () => setLoading(false),
+    });
+    return unsubscribe;
+  }, [topic]);
 
   const handleLoadMore = () => {
     setVisibleCount(prev => prev + 9);
@@ -65,9 +61,9 @@ export const NewsFeed: React.FC = () => {
       ) : (
         <>
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 mb-8">
-          {visibleNews.map((item, index) => (
+          {visibleNews.map((item) => (
             <a 
-              key={index} 
+              key={item.url || item.title} 
               href={item.url} 
               target="_blank" 
               rel="noopener noreferrer"
@@ -1,17 +1,21 @@
 import React, { useState, useEffect } from 'react';
 import { BlogPost } from '../types';
-import { Save, X, ArrowLeft, Wand2, Target, MessageSquare, BrainCircuit, Search, Image as ImageIcon } from 'lucide-react';
+import { api } from '../services/api';
+import { Save, X, ArrowLeft, Wand2, Target, MessageSquare, BrainCircuit, Search, RefreshCw, Image as ImageIcon } from 'lucide-react';
 
 interface PostEditorProps {
   post: BlogPost;
   onSave: (updatedPost: BlogPost) => void;
   onCancel: () => void;
+  streamingStage?: string | null; // set while the post is still being generated
 }
 
-export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }) => {
+export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel, streamingStage = null }) => {
+  const isStreaming = streamingStage !== null;
   const [editedPost, setEditedPost] = useState<BlogPost>(post);
   const [isSaving, setIsSaving] = useState(false);
   const [activeTab, setActiveTab] = useState<'content' | 'seo' | 'critique'>('content');
+  const [rerunning, setRerunning] = useState<'seo' | 'editor' | null>(null);
 
   // Reset state when post changes
   useEffect(() => {
@@ -33,6 +37,34 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
     }
   };
 
+  // Re-runs one agent on the current draft instead of regenerating the whole post
+  const handleRerun = async (stage: 'seo' | 'editor') => {
+    setRerunning(stage);
+    try {
+        // The stage runs against the saved draft, so save content edits first
+        if (editedPost.content !== post.content) {
+            await api.updatePost(post.id, { content: editedPost.content });
+        }
+        const updated = await api.rerunStage(post.id, stage);
+        setEditedPost(prev => stage === 'seo'
+            ? {
+                ...prev,
+                title: updated.title,
+                excerpt: updated.excerpt,
+                readingTimeMin: updated.readingTimeMin,
+                seoKeywords: updated.seoKeywords,
+                tags: updated.tags,
+                metaDescription: updated.metaDescription,
+                imagePrompt: updated.imagePrompt,
+              }
+            : { ...prev, critiqueNotes: updated.critiqueNotes });
+    } catch (error) {
+        console.error(`Failed to re-run ${stage}`, error);
+    } finally {
+        setRerunning(null);
+    }
+  };
+
   return (
     <div className="fixed inset-0 z-50 bg-black flex flex-col animate-fade-in">
         {/* Editor Header */}
@@ -46,7 +78,12 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
                 </button>
                 <div>
                     <h2 className="text-lg font-bold text-white flex items-center gap-2">
-                        Edit Draft 
+                        {isStreaming ? 'Generating Draft' : 'Edit Draft'}
+                        {isStreaming && (
+                            <span className="text-[10px] px-2 py-0.5 rounded border border-purple-800 text-purple-400 animate-pulse">
+                                {streamingStage}...
+                            </span>
+                        )}
                         {editedPost.sentiment && (
                             <span className={`text-[10px] px-2 py-0.5 rounded border ${editedPost.sentiment === 'Positive' ? 'border-green-800 text-green-400' : 'border-gray-700 text-gray-400'}`}>
                                 {editedPost.sentiment} Sentiment
@@ -86,7 +123,7 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
                 </button>
                 <button 
                     onClick={handleSave}
-                    disabled={isSaving}
+                    disabled={isSaving || isStreaming}
                     className="flex items-center gap-2 px-6 py-2 bg-purple-600 hover:bg-purple-700 text-white rounded-full text-sm font-bold transition-all disabled:opacity-50 disabled:cursor-not-allowed"
                 >
                     {isSaving ? 'Saving...' : <><Save size={16} /> Save & Close</>}
@@ -143,6 +180,7 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
                             <textarea 
                                 value={editedPost.content}
                                 onChange={(e) => handleChange('content', e.target.value)}
+                                readOnly={isStreaming}
                                 className="w-full h-[600px] bg-transparent text-lg text-gray-300 leading-relaxed border-none outline-none focus:ring-0 resize-none p-0 font-serif"
                                 placeholder="Start writing..."
                             />
@@ -152,7 +190,17 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
 
                 {activeTab === 'seo' && (
                     <div className="space-y-8 animate-fade-in">
-                        <h3 className="text-2xl font-bold text-white mb-6">SEO & Metadata</h3>
+                        <div className="flex items-center justify-between mb-6">
+                            <h3 className="text-2xl font-bold text-white">SEO & Metadata</h3>
+                            <button
+                                onClick={() => handleRerun('seo')}
+                                disabled={rerunning !== null || isStreaming}
+                                className="flex items-center gap-2 px-4 py-2 text-xs font-medium rounded-full border border-gray-700 text-gray-300 hover:text-white hover:border-purple-500 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+                            >
+                                <RefreshCw size={14} className={rerunning === 'seo' ? 'animate-spin' : ''} />
+                                {rerunning === 'seo' ? 'Regenerating...' : 'Regenerate Metadata'}
+                            </button>
+                        </div>
                         
                         <div className="grid grid-cols-2 gap-6">
                             <div className="bg-gray-900 p-5 rounded-xl border border-gray-800">
@@ -196,9 +244,19 @@ export const PostEditor: React.FC<PostEditorProps> = ({ post, onSave, onCancel }
                 {activeTab === 'critique' && (
                      <div className="space-y-6 animate-fade-in">
                         <div className="bg-gradient-to-br from-purple-900/20 to-blue-900/20 p-6 rounded-xl border border-purple-500/20">
-                            <h3 className="text-xl font-bold text-white mb-4 flex items-center gap-2">
-                                <BrainCircuit className="text-purple-400" /> Agent Critique & Logic
-                            </h3>
+                            <div className="flex items-center justify-between mb-4">
+                                <h3 className="text-xl font-bold text-white flex items-center gap-2">
+                                    <BrainCircuit className="text-purple-400" /> Agent Critique & Logic
+                                </h3>
+                                <button
+                                    onClick={() => handleRerun('editor')}
+                                    disabled={rerunning !== null || isStreaming}
+                                    className="flex items-center gap-2 px-4 py-2 text-xs font-medium rounded-full border border-purple-500/30 text-gray-300 hover:text-white hover:border-purple-500 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+                                >
+                                    <RefreshCw size={14} className={rerunning === 'editor' ? 'animate-spin' : ''} />
+                                    {rerunning === 'editor' ? 'Reviewing...' : 'Re-run Critique'}
+                                </button>
+                            </div>
                             <div className="prose prose-invert prose-sm max-w-none">
                                 <p className="text-gray-300 whitespace-pre-wrap leading-relaxed">
                                     {editedPost.critiqueNotes || "No critique available for this draft."}
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import { Save, Shield, Globe, Bell, Moon, Smartphone, Key, CheckCircle, AlertCircle, Loader2 } from 'lucide-react';
-import { api } from '../services/api';
+import { Save, Shield, Globe, Bell, Moon, Smartphone, Key, CheckCircle, AlertCircle, Loader2, Clock, Trash2 } from 'lucide-react';
+import { api, AutopilotSchedule } from '../services/api';
 
 export const SettingsPage: React.FC = () => {
   const [apiKeyDevTo, setApiKeyDevTo] = useState('');
@@ -17,10 +17,51 @@ export const SettingsPage: React.FC = () => {
   const [notifications, setNotifications] = useState(true);
   const [autoPublish, setAutoPublish] = useState(false);
 
+  const [schedules, setSchedules] = useState<AutopilotSchedule[]>([]);
+  const [scheduleKind, setScheduleKind] = useState<'topic' | 'trends'>('topic');
+  const [scheduleTopic, setScheduleTopic] = useState('');
+  const [scheduleEvery, setScheduleEvery] = useState(24);
+
   useEffect(() => {
     loadSettings();
+    loadSchedules();
   }, []);
 
+  const loadSchedules = async () => {
+    try {
+      setSchedules(await api.getSchedules());
+    } catch (err) {
+      console.error("Failed to load schedules", err);
+    }
+  };
+
+  const handleAddSchedule = async () => {
+    try {
+      setSaving(true);
+      const text = scheduleTopic.trim() || undefined;
+      await api.createSchedule(scheduleKind === 'topic'
+        ? { kind: 'topic', topic: text, every_hours: scheduleEvery }
+        : { kind: 'trends', match: text, every_hours: scheduleEvery });
+      setScheduleTopic('');
+      await loadSchedules();
+      setMessage({ type: 'success', text: 'Scheduled! Drafts will be waiting for review after the next off-peak run.' });
+      setTimeout(() => setMessage(null), 3000);
+    } catch (err) {
+      setMessage({ type: 'error', text: 'Failed to create schedule' });
+    } finally {
+      setSaving(false);
+    }
+  };
+
+  const handleDeleteSchedule = async (id: number) => {
+    try {
+      await api.deleteSchedule(id);
+      setSchedules(schedules.filter(s => s.id !== id));
+    } catch (err) {
+      setMessage({ type: 'error', text: 'Failed to delete schedule' });
+    }
+  };
+
   const loadSettings = async () => {
     try {
       setLoading(true);
@@ -175,6 +216,77 @@ export const SettingsPage: React.FC = () => {
             </div>
         </div>
 
+        {/* Autopilot Section */}
+        <div className="bg-gray-900/50 backdrop-blur-sm border border-gray-800 rounded-3xl overflow-hidden">
+            <div className="p-6 border-b border-gray-800 flex items-center gap-3">
+                <div className="p-2 bg-amber-500/10 rounded-lg text-amber-400">
+                    <Clock size={20} />
+                </div>
+                <h2 className="text-xl font-bold text-white">Autopilot</h2>
+            </div>
+
+            <div className="p-8 space-y-6">
+                <p className="text-sm text-gray-500">Recurring posts are generated overnight and wait in your drafts for review.</p>
+                <div className="flex gap-3">
+                    <select
+                        value={scheduleKind}
+                        onChange={(e) => setScheduleKind(e.target.value as 'topic' | 'trends')}
+                        className="bg-black/50 border border-gray-700 text-white text-sm rounded-xl px-3 outline-none"
+                    >
+                        <option value="topic">Topic</option>
+                        <option value="trends">Rising trends</option>
+                    </select>
+                    <input
+                        type="text"
+                        value={scheduleTopic}
+                        onChange={(e) => setScheduleTopic(e.target.value)}
+                        placeholder={scheduleKind === 'topic' ? "e.g. AI chips" : "Only trends containing... (optional)"}
+                        className="flex-1 bg-black/50 border border-gray-700 rounded-xl px-4 py-3 text-white focus:ring-2 focus:ring-purple-500 focus:border-transparent outline-none transition-all"
+                    />
+                    <select
+                        value={scheduleEvery}
+                        onChange={(e) => setScheduleEvery(Number(e.target.value))}
+                        className="bg-black/50 border border-gray-700 text-white text-sm rounded-xl px-3 outline-none"
+                    >
+                        <option value={24}>Daily</option>
+                        <option value={168}>Weekly</option>
+                    </select>
+                    <button
+                        onClick={handleAddSchedule}
+                        disabled={saving || (scheduleKind === 'topic' && !scheduleTopic.trim())}
+                        className="px-4 py-2 bg-gray-800 hover:bg-gray-700 text-white rounded-xl font-medium transition-colors disabled:opacity-50"
+                    >
+                        {saving ? <Loader2 className="animate-spin" size={18} /> : 'Add'}
+                    </button>
+                </div>
+
+                {schedules.length > 0 && (
+                    <div className="divide-y divide-gray-800/50">
+                        {schedules.map(schedule => (
+                            <div key={schedule.id} className="flex items-center justify-between py-3">
+                                <div>
+                                    <h3 className="text-white font-medium">
+                                        {schedule.kind === 'topic' ? schedule.topic : `Rising trends${schedule.match ? ` about "${schedule.match}"` : ''}`}
+                                    </h3>
+                                    <p className="text-sm text-gray-500">
+                                        {schedule.every_s >= 7 * 86400 ? 'Weekly' : 'Daily'}
+                                        {schedule.last_run_at ? ` · last run ${new Date(schedule.last_run_at * 1000).toLocaleString()}: ${schedule.last_status}${schedule.last_topic && schedule.kind === 'trends' ? ` (${schedule.last_topic})` : ''}` : ' · waiting for the first run'}
+                                    </p>
+                                </div>
+                                <button
+                                    onClick={() => handleDeleteSchedule(schedule.id)}
+                                    className="p-2 text-gray-500 hover:text-red-400 transition-colors"
+                                    title="Remove schedule"
+                                >
+                                    <Trash2 size={18} />
+                                </button>
+                            </div>
+                        ))}
+                    </div>
+                )}
+            </div>
+        </div>
+
         {/* Preferences Section */}
         <div className="grid grid-cols-1 md:grid-cols-2 gap-8">
             <div className="bg-gray-900/50 backdrop-blur-sm border border-gray-800 rounded-3xl overflow-hidden">
@@ -60,7 +60,58 @@ export interface NewsItem {
   image_url?: string;
 }
 
+export interface GenerationStreamHandlers {
+  onStage?: (node: string) => void;
+  onDraftStart?: (node: string) => void;
+  onToken?: (text: string) => void;
+}
+
+// How a generation treats a recent one on a near-identical topic (see backend/topic_index.py)
+export type TopicReuse = 'auto' | 'research' | 'none';
+
+export interface TopicMatch {
+  topic: string;
+  similarity: number;
+  created_at: number; // unix seconds
+}
+
+// Thrown when the user generated a near-identical topic recently and reuse is 'auto'
+export class DuplicateTopicError extends Error {
+  constructor(public post: BlogPost, public match: TopicMatch) {
+    super(`A post on "${match.topic}" was generated recently`);
+  }
+}
+
+// Recurring generation run by the backend's off-peak autopilot; drafts arrive as needs_review posts
+export interface AutopilotSchedule {
+  id: number;
+  kind: 'topic' | 'trends';
+  topic: string | null;
+  match: string | null;
+  every_s: number;
+  next_run_at: number;
+  last_status: 'running' | 'ok' | 'failed' | 'skipped' | null;
+  last_topic: string | null;
+  last_run_at: number | null;
+}
+
+export interface NewsStreamHandlers {
+  onSnapshot: (items: NewsItem[]) => void;
+  onNews: (items: NewsItem[]) => void;
+  onError?: () => void;
+}
+
 export const api = {
+  // Live feed: the current items once, then only new ones. EventSource reconnects on its own
+  // (and gets a fresh snapshot); call the returned function to unsubscribe.
+  subscribeNews: (topic: string, limit: number, handlers: NewsStreamHandlers): (() => void) => {
+    const source = new EventSource(`${API_URL}/news/stream?topic=${encodeURIComponent(topic)}&limit=${limit}`);
+    source.addEventListener('snapshot', (e) => handlers.onSnapshot(JSON.parse((e as MessageEvent).data)));
+    source.addEventListener('news', (e) => handlers.onNews(JSON.parse((e as MessageEvent).data)));
+    source.onerror = () => handlers.onError?.();
+    return () => source.close();
+  },
+
   getNews: async (topic: string = "Technology", limit: number = 5): Promise<NewsItem[]> => {
     const response = await fetch(`${API_URL}/news?topic=${encodeURIComponent(topic)}&limit=${limit}`, {
       headers: getHeaders()
@@ -78,14 +129,15 @@ export const api = {
     return data.map(mapPostFromBackend);
   },
 
-  generatePost: async (topic: string): Promise<BlogPost> => {
+  generatePost: async (topic: string, reuse: TopicReuse = 'auto'): Promise<BlogPost> => {
     const response = await fetch(`${API_URL}/generate-pro-blog`, {
       method: 'POST',
       headers: getHeaders(),
-      body: JSON.stringify({ topic }),
+      body: JSON.stringify({ topic, reuse }),
     });
     if (!response.ok) throw new Error('Failed to generate post');
     const result = await response.json();
+    if (result.status === 'duplicate') throw new DuplicateTopicError(mapPostFromBackend(result.data), result.match);
     
     // The backend returns { status: "success", data: { ...post ... }, state: ... }
     // We modified backend to return the object directly, not an array
@@ -93,6 +145,50 @@ export const api = {
     return mapPostFromBackend(newPostData);
   },
 
+  // Same pipeline as generatePost, but reads the Server-Sent Events stream so the
+  // draft can be shown while the writer/refiner are still typing.
+  generatePostStream: async (topic: string, handlers: GenerationStreamHandlers = {}, reuse: TopicReuse = 'auto'): Promise<BlogPost> => {
+    const response = await fetch(`${API_URL}/generate-pro-blog/stream`, {
+      method: 'POST',
+      headers: getHeaders(),
+      body: JSON.stringify({ topic, reuse }),
+    });
+    if (!response.ok || !response.body) throw new Error('Failed to generate post');
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; keep any partial event in the buffer
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = 'message';
+        let data = '';
+        for (const line of raw.split('\n')) {
+          if (line.startsWith('event:')) event = line.slice(6).trim();
+          else if (line.startsWith('data:')) data += line.slice(5).trim();
+        }
+        const payload = data ? JSON.parse(data) : {};
+        if (event === 'stage') handlers.onStage?.(payload.node);
+        else if (event === 'draft_start') handlers.onDraftStart?.(payload.node);
+        else if (event === 'token') handlers.onToken?.(payload.text);
+        else if (event === 'error') throw new Error(payload.detail || 'Generation failed');
+        else if (event === 'duplicate') throw new DuplicateTopicError(mapPostFromBackend(payload.data), payload.match);
+        else if (event === 'done') {
+          const newPostData = Array.isArray(payload.data) ? payload.data[0] : payload.data;
+          return mapPostFromBackend(newPostData);
+        }
+      }
+    }
+    throw new Error('Generation stream ended before the post was saved');
+  },
+
   updatePost: async (id: string, updates: Partial<BlogPost>): Promise<void> => {
     const backendUpdates = mapPostToBackend(updates);
     const response = await fetch(`${API_URL}/posts/${id}`, {
@@ -129,6 +225,44 @@ export const api = {
     return await response.json();
   },
 
+  // Re-runs one pipeline stage ('seo' or 'editor') on the saved post
+  rerunStage: async (id: string, stage: 'seo' | 'editor'): Promise<BlogPost> => {
+    const response = await fetch(`${API_URL}/posts/${id}/rerun/${stage}`, {
+      method: 'POST',
+      headers: getHeaders(),
+    });
+    if (!response.ok) throw new Error(`Failed to re-run ${stage}`);
+    const result = await response.json();
+    return mapPostFromBackend(result.data);
+  },
+
+  getSchedules: async (): Promise<AutopilotSchedule[]> => {
+    const response = await fetch(`${API_URL}/autopilot/schedules`, {
+      headers: getHeaders()
+    });
+    if (!response.ok) throw new Error('Failed to fetch schedules');
+    return await response.json();
+  },
+
+  createSchedule: async (schedule: { kind: 'topic' | 'trends'; topic?: string; match?: string; every_hours: number }): Promise<AutopilotSchedule> => {
+    const response = await fetch(`${API_URL}/autopilot/schedules`, {
+      method: 'POST',
+      headers: getHeaders(),
+      body: JSON.stringify(schedule),
+    });
+    if (!response.ok) throw new Error('Failed to create schedule');
+    const result = await response.json();
+    return result.data;
+  },
+
+  deleteSchedule: async (id: number): Promise<void> => {
+    const response = await fetch(`${API_URL}/autopilot/schedules/${id}`, {
+      method: 'DELETE',
+      headers: getHeaders(),
+    });
+    if (!response.ok) throw new Error('Failed to delete schedule');
+  },
+
   getAnalytics: async (): Promise<any> => {
     const response = await fetch(`${API_URL}/analytics`, {
       headers: getHeaders()